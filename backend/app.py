@@ -6,14 +6,21 @@ This file defines the main API endpoints for the system:
 - Fetching the latest threat score from processed sensor data
 - Scoring a custom payload of sensor data
 - A Server-Sent Events (SSE) stream for live threat updates
+- Live ingest of readings pushed by field gateways
+- Nearest-station and bounding-box threat queries
+- Threat history from pre-aggregated rollups
+- Background alert dispatch for Warning/Danger readings
+- Hot-reloadable scoring config with background rescoring
+- Short-range nowcasts from recent per-station trends
 """
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 
 # --- FIX: Import CORSMiddleware ---
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, List, Union
+from contextlib import asynccontextmanager
 import pandas as pd
 
 # --- FIX: Import UTC for modern, timezone-aware timestamps ---
@@ -21,14 +28,56 @@ from datetime import datetime, UTC
 import os
 import asyncio
 import json
+import hmac
 
 # Use relative imports to align with the project structure
-from .threat_model import calculate_threat_score
+from .scoring_config import (
+    ConfigVersionMiddleware,
+    RescoreCancelled,
+    ScoringConfig,
+    ScoringState,
+    load_scoring_config,
+    rescore_history,
+)
 from .sensor_simulator import CSVSimulatedStream
+from .config import THREAT_LABELS
+from .data_prep import (
+    PROCESSED_SCHEMA,
+    TIMESTAMP_COL,
+    RollupPyramid,
+    build_rollups,
+    load_rollups,
+    merge_rollups,
+    pick_rollup_freq,
+    rollup_dir,
+)
+from .ingest import ReadingIn, WriteBehindBuffer, LiveFeed, to_stored_timestamp
+from .spatial import StationIndex
+from .nowcast import NOWCAST_HORIZONS_H, NOWCAST_MAX_HORIZON_H, Nowcaster
+from .notify import FileSink, HttpSink, NotificationDispatcher, load_routes
+from . import store
 
 # --- Constants ---
-PROCESSED_DATA_PATH = os.path.join(
-    os.path.dirname(__file__), "data", "processed", "cleaned_weather.csv"
+# Point this at a .db/.sqlite file to use the SQLite store instead of the CSV
+PROCESSED_DATA_PATH = os.getenv(
+    "PROCESSED_DATA_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "processed", "cleaned_weather.csv"),
+)
+# Seconds between demo events when no live readings arrive
+STREAM_DELAY_S = 2
+# "rules" for the rule table, or the directory of a trained model artifact
+THREAT_MODEL = os.getenv("THREAT_MODEL", "rules")
+# Optional JSON scoring config (see scoring_config.py), watched for changes
+SCORING_CONFIG_PATH = os.getenv("SCORING_CONFIG_PATH")
+SCORING_WATCH_INTERVAL_S = 2.0
+# Admin endpoints require it in the X-Admin-Token header; with no token
+# configured they are disabled
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# JSON list of alert routes (see notify.py); no alerts are sent without it
+ALERT_ROUTES_PATH = os.getenv("ALERT_ROUTES_PATH")
+ALERT_DEAD_LETTER_PATH = os.getenv(
+    "ALERT_DEAD_LETTER_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "alerts", "dead_letters.jsonl"),
 )
 
 # --- Pydantic Models for API Data Structure ---
@@ -75,6 +124,296 @@ class ThreatScoreResponse(BaseModel):
         json_schema_extra={"example": "PORBANDAR"},
         description="Identifier for the sensor location.",
     )
+    config_version: Optional[str] = Field(
+        None, description="Version of the scoring config that produced the score."
+    )
+
+
+class IngestResponse(BaseModel):
+    accepted: int = Field(..., description="Number of readings accepted.")
+    pending: int = Field(
+        ..., description="Readings buffered in memory, not yet in the store."
+    )
+    max_score: float = Field(
+        ..., description="Highest threat score among the accepted readings."
+    )
+    max_level: str = Field(
+        ..., description="Threat level of the highest-scoring reading."
+    )
+    config_version: Optional[str] = Field(
+        None, description="Version of the scoring config that produced the score."
+    )
+
+
+class StationThreat(BaseModel):
+    location_id: str = Field(..., json_schema_extra={"example": "PORBANDAR"})
+    latitude: float
+    longitude: float
+    distance_km: Optional[float] = Field(
+        None, description="Distance from the query point (nearby queries only)."
+    )
+    score: Optional[float] = Field(
+        None, description="Latest threat score; null if the station has no reading."
+    )
+    level: Optional[str] = None
+    parameters: Dict[str, int] = Field(default_factory=dict)
+    measurement_timestamp: Optional[datetime] = None
+
+
+class ThreatBucket(BaseModel):
+    bucket: datetime = Field(..., description="Start of the bucket (UTC).")
+    count: int
+    max_score: float
+    mean_score: float
+    worst_level: str
+    parameter_maxima: Dict[str, Optional[float]]
+
+
+class ThreatHistoryResponse(BaseModel):
+    location_id: Optional[str] = None
+    resolution: str = Field(..., description="Bucket width of the response.")
+    rollup: str = Field(..., description="Pyramid level the buckets came from.")
+    buckets: List[ThreatBucket]
+    config_version: Optional[str] = Field(
+        None, description="Version of the scoring config that produced the score."
+    )
+
+
+class NowcastPoint(BaseModel):
+    horizon_h: float = Field(..., json_schema_extra={"example": 1.0})
+    valid_at: datetime = Field(..., description="Time the forecast is for (UTC).")
+    score: float
+    level: str
+    parameters: Dict[str, int]
+    projected: Dict[str, Optional[float]] = Field(
+        ..., description="Extrapolated parameter values that were scored."
+    )
+
+
+class NowcastResponse(BaseModel):
+    location_id: str
+    as_of: datetime = Field(..., description="Time of the station's newest reading.")
+    window_points: int = Field(..., description="Readings in the trend window.")
+    trends: Dict[str, Optional[float]] = Field(
+        ..., description="Fitted change per hour; null with too few points."
+    )
+    forecasts: List[NowcastPoint]
+    config_version: Optional[str] = Field(
+        None, description="Version of the scoring config that produced the score."
+    )
+
+
+class ScoringConfigStatus(BaseModel):
+    active: ScoringConfig
+    rescore: Optional[Dict[str, Any]] = Field(
+        None, description="Latest background rescore and its progress."
+    )
+
+
+# --- Scoring Config ---
+def _initial_scoring_config() -> ScoringConfig:
+    if SCORING_CONFIG_PATH and os.path.exists(SCORING_CONFIG_PATH):
+        return load_scoring_config(SCORING_CONFIG_PATH)
+    return ScoringConfig(model=THREAT_MODEL)
+
+
+scoring = ScoringState(_initial_scoring_config())
+
+
+# --- Live Ingest State ---
+def _persist_readings(df: pd.DataFrame) -> None:
+    store.append_readings(df, PROCESSED_DATA_PATH)
+    # The rows are stored; a rollup failure must not make the buffer retry them
+    try:
+        with scoring.lock:
+            rollups.update(df, scoring.model.score_batch(df))
+            job = scoring.job
+            if job is not None and job.state == "running":
+                job.late_batches.append(df)
+    except Exception as e:
+        print(f"❌ Failed to update threat rollups: {e}")
+
+
+ingest_buffer = WriteBehindBuffer(write=_persist_readings)
+live_feed = LiveFeed()
+station_index = StationIndex()
+rollups = RollupPyramid()
+nowcaster = Nowcaster()
+
+
+def _build_dispatcher() -> NotificationDispatcher:
+    routes = load_routes(ALERT_ROUTES_PATH) if ALERT_ROUTES_PATH else []
+    sinks = {"file": FileSink()}
+    if any(route["sink"] == "http" for route in routes):
+        sinks["http"] = HttpSink()
+    return NotificationDispatcher(routes, sinks, ALERT_DEAD_LETTER_PATH)
+
+
+dispatcher = _build_dispatcher()
+_simulator: Optional[CSVSimulatedStream] = None
+
+
+def get_simulator() -> CSVSimulatedStream:
+    """Demo sequence shared by all stream subscribers (loaded once)."""
+    global _simulator
+    if _simulator is None or _simulator.path != PROCESSED_DATA_PATH:
+        _simulator = CSVSimulatedStream(PROCESSED_DATA_PATH, delay_s=STREAM_DELAY_S)
+    return _simulator
+
+
+def _load_stored_stations() -> list:
+    """Latest stored reading per station, scored (runs on a worker thread)."""
+    try:
+        latest = store.latest_per_location(PROCESSED_DATA_PATH)
+    except FileNotFoundError:
+        return []
+    events = []
+    for _, row in latest.iterrows():
+        reading = store.to_record(row)
+        events.append(
+            (reading["location_id"], reading, scoring.model.score(reading))
+        )
+    return events
+
+
+def _load_history() -> Optional[pd.DataFrame]:
+    """
+    Load the rollup pyramid from the stored history and return the history
+    (worker thread, before requests are served).
+
+    Rollups persisted by data_prep are reused when they were scored under
+    the active config; only readings appended after them are rolled in.
+    """
+    rollups.levels = {}
+    try:
+        history = store.load_readings(PROCESSED_DATA_PATH)
+    except FileNotFoundError:
+        return None
+    persisted = load_rollups(rollup_dir(PROCESSED_DATA_PATH), scoring.version)
+    fresh = history
+    # More rows covered than stored means the store was replaced since
+    if persisted is not None and persisted[1] <= len(history):
+        rollups.levels, covered = persisted
+        fresh = store.readings_appended_after(covered, PROCESSED_DATA_PATH)
+    rollups.update(fresh, scoring.model.score_batch(fresh))
+    return history
+
+
+def _register_station(reading: Dict[str, Any]) -> None:
+    lat, lon = reading.get("latitude"), reading.get("longitude")
+    if lat is not None and lon is not None and not (pd.isna(lat) or pd.isna(lon)):
+        station_index.add(reading["location_id"], lat, lon)
+
+
+def _rescore_and_swap(job) -> None:
+    """
+    Rescore the stored history under `job.config`, then swap it in
+    (runs on a worker thread; the old config serves until the swap).
+    """
+    model = job.config.build_model()
+    # Flushes wait while the snapshot is read; later ones are captured on
+    # the job, so every stored row ends up in the new rollups exactly once
+    with ingest_buffer.paused():
+        try:
+            history = store.load_readings(PROCESSED_DATA_PATH)
+        except FileNotFoundError:
+            history = pd.DataFrame(columns=store.PROCESSED_COLUMNS)
+        job.state = "running"
+
+    scores = rescore_history(history, model, job)
+    levels = build_rollups(history, scores)
+    with scoring.lock:
+        if job.cancelled:
+            raise RescoreCancelled()
+        for batch in job.late_batches:
+            late = build_rollups(batch, model.score_batch(batch))
+            levels = merge_rollups(levels, late)
+        rollups.levels = levels
+        for location_id, (reading, _) in list(live_feed.latest.items()):
+            live_feed.latest[location_id] = (reading, model.score(reading))
+        scoring.swap(job.config, model)
+        job.finish("complete")
+    print(
+        f"✅ Scoring config {job.config.version} is live "
+        f"({job.total_rows} rows rescored)"
+    )
+
+
+_rescore_tasks: set = set()
+
+
+async def _run_rescore(job) -> None:
+    try:
+        await asyncio.to_thread(_rescore_and_swap, job)
+    except RescoreCancelled:
+        job.finish("cancelled")
+    except Exception as e:
+        job.finish("failed", str(e))
+        print(f"❌ Rescoring for config {job.config.version} failed: {e}")
+
+
+def apply_scoring_config(config: ScoringConfig):
+    """Start moving to `config`; must be called from the event loop."""
+    job = scoring.start_job(config)
+    task = asyncio.create_task(_run_rescore(job))
+    _rescore_tasks.add(task)
+    task.add_done_callback(_rescore_tasks.discard)
+    return job
+
+
+async def _watch_scoring_config() -> None:
+    """Poll SCORING_CONFIG_PATH and apply valid changes."""
+    if not SCORING_CONFIG_PATH:
+        return
+    last_mtime = None
+    while True:
+        try:
+            mtime = os.stat(SCORING_CONFIG_PATH).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime is not None and last_mtime is not None and mtime != last_mtime:
+            try:
+                config = load_scoring_config(SCORING_CONFIG_PATH)
+            except Exception as e:
+                print(f"❌ Ignoring invalid scoring config {SCORING_CONFIG_PATH}: {e}")
+            else:
+                pending = scoring.job.config.version if scoring.job else None
+                if config.version not in (scoring.version, pending):
+                    print(
+                        f"🔄 Scoring config changed, rescoring for {config.version}"
+                    )
+                    apply_scoring_config(config)
+        last_mtime = mtime
+        await asyncio.sleep(SCORING_WATCH_INTERVAL_S)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    stored = await asyncio.to_thread(_load_stored_stations)
+    live_feed.seed(stored)
+    for _, reading, _ in stored:
+        _register_station(reading)
+    # Built before the flusher starts, so no flushed batch is counted twice
+    history = await asyncio.to_thread(_load_history)
+    # The nowcaster is not thread-safe, so it is seeded here on the loop
+    nowcaster.clear()
+    if history is not None:
+        nowcaster.seed(history)
+
+    flusher = asyncio.create_task(ingest_buffer.run())
+    alerts = asyncio.create_task(dispatcher.run())
+    watcher = asyncio.create_task(_watch_scoring_config())
+    yield
+    if scoring.job is not None:
+        scoring.job.cancelled = True
+    for task in (flusher, alerts, watcher, *_rescore_tasks):
+        task.cancel()
+    await asyncio.gather(
+        flusher, alerts, watcher, *_rescore_tasks, return_exceptions=True
+    )
+    await dispatcher.close()
+    # Persist whatever arrived since the last flush
+    await asyncio.to_thread(ingest_buffer.flush)
 
 
 # --- FastAPI Application Instance ---
@@ -82,6 +421,7 @@ app = FastAPI(
     title="Coastal Threat Alert System API",
     description="API for detecting and alerting on coastal environmental threats.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # --- FIX: Add CORS Middleware ---
@@ -91,6 +431,7 @@ origins = [
     "http://localhost:5173",  # The default Vite dev server port
 ]
 
+app.add_middleware(ConfigVersionMiddleware, get_version=lambda: scoring.version)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -102,26 +443,37 @@ app.add_middleware(
 
 # --- SSE Stream Logic ---
 async def threat_event_generator(request: Request):
-    simulator = CSVSimulatedStream(PROCESSED_DATA_PATH, delay_s=2)
-    for reading_dict in simulator.stream():
-        if await request.is_disconnected():
-            print("🛑 Client disconnected. Stopping stream.")
-            break
+    # Live readings are pushed as soon as they are ingested; the demo
+    # sequence fills in whenever nothing arrives for STREAM_DELAY_S.
+    demo_readings = get_simulator().readings()
+    with live_feed.subscribe() as live_events:
+        while True:
+            if await request.is_disconnected():
+                print("🛑 Client disconnected. Stopping stream.")
+                break
 
-        reading_series = pd.Series(reading_dict)
-        threat_result = calculate_threat_score(reading_series)
+            try:
+                location_id, reading_dict, threat_result = await asyncio.wait_for(
+                    live_events.get(), timeout=STREAM_DELAY_S
+                )
+            except asyncio.TimeoutError:
+                reading_dict = next(demo_readings, None)
+                if reading_dict is None:
+                    continue
+                threat_result = scoring.model.score(reading_dict)
+                location_id = "PORBANDAR_STREAM"
 
-        response_data = ThreatScoreResponse(
-            score=threat_result["score"],
-            level=threat_result["level"],
-            parameters=threat_result["parameters"],
-            raw=reading_dict,
-            # --- FIX: Replaced deprecated utcnow() ---
-            timestamp=datetime.now(UTC),
-            location_id="PORBANDAR_STREAM",
-        )
-        yield f"data: {response_data.model_dump_json()}\n\n"
-        await asyncio.sleep(simulator.delay_s)
+            response_data = ThreatScoreResponse(
+                score=threat_result["score"],
+                level=threat_result["level"],
+                parameters=threat_result["parameters"],
+                raw=reading_dict,
+                # --- FIX: Replaced deprecated utcnow() ---
+                timestamp=datetime.now(UTC),
+                location_id=location_id,
+                config_version=scoring.version,
+            )
+            yield f"data: {response_data.model_dump_json()}\n\n"
 
 
 @app.get("/threat/stream", tags=["Threat Assessment"])
@@ -137,18 +489,52 @@ def get_health_status():
     return {"status": "ok"}
 
 
+@app.get("/alerts/status", tags=["Status"])
+def get_alert_status():
+    """Alert dispatcher counters and per-route backlog."""
+    return {
+        "routes": len(dispatcher.destinations),
+        "pending": {
+            route_id: len(dest.pending)
+            for route_id, dest in dispatcher.destinations.items()
+            if dest.pending
+        },
+        "stats": dict(dispatcher.stats),
+    }
+
+
 @app.get(
     "/threat/latest", response_model=ThreatScoreResponse, tags=["Threat Assessment"]
 )
-def get_latest_threat():
+def get_latest_threat(location_id: Optional[str] = None):
+    # Readings ingested live are newer than anything in the processed store
+    live = live_feed.get_latest(location_id)
+    if live is not None:
+        location_id, raw_values, threat_result = live
+        return ThreatScoreResponse(
+            score=threat_result["score"],
+            level=threat_result["level"],
+            parameters=threat_result["parameters"],
+            raw=raw_values,
+            timestamp=datetime.now(UTC),
+            location_id=location_id,
+            config_version=scoring.version,
+        )
+
     try:
-        df = pd.read_csv(PROCESSED_DATA_PATH)
-        if df.empty:
+        try:
+            raw_values = store.latest_reading(PROCESSED_DATA_PATH, location_id)
+        except FileNotFoundError:
+            # Nothing processed or flushed yet: same as an empty store
+            raw_values = None
+        if raw_values is None and location_id is not None:
+            raise HTTPException(
+                status_code=404, detail=f"No readings for location '{location_id}'."
+            )
+        if raw_values is None:
             raise HTTPException(status_code=404, detail="Processed data file is empty.")
 
-        latest_reading_series = df.iloc[-1]
-        threat_result = calculate_threat_score(latest_reading_series)
-        raw_values = latest_reading_series.to_dict()
+        threat_result = scoring.model.score(raw_values)
 
         response = ThreatScoreResponse(
             score=threat_result["score"],
@@ -157,14 +543,12 @@ def get_latest_threat():
             raw=raw_values,
             # --- FIX: Replaced deprecated utcnow() ---
             timestamp=datetime.now(UTC),
-            location_id="PORBANDAR_MAIN",
+            location_id=location_id or "PORBANDAR_MAIN",
+            config_version=scoring.version,
         )
         return response
-    except FileNotFoundError:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Processed data file not found at {PROCESSED_DATA_PATH}",
-        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
@@ -175,7 +559,7 @@ def get_latest_threat():
 def score_custom_threat(payload: ThreatScoreInput):
     payload_dict = payload.model_dump()
     custom_reading_series = pd.Series(payload_dict)
-    threat_result = calculate_threat_score(custom_reading_series)
+    threat_result = scoring.model.score(custom_reading_series)
 
     """
     Example curl command to test this endpoint:
@@ -196,5 +580,274 @@ def score_custom_threat(payload: ThreatScoreInput):
         # --- FIX: Replaced deprecated utcnow() ---
         timestamp=datetime.now(UTC),
         location_id="CUSTOM_INPUT",
+        config_version=scoring.version,
     )
     return response
+
+
+@app.post("/readings", response_model=IngestResponse, tags=["Ingest"])
+async def ingest_readings(payload: Union[ReadingIn, List[ReadingIn]]):
+    """
+    Accept a single reading or a batch from a field gateway.
+
+    Readings are scored on arrival, become visible to /threat/latest and the
+    stream immediately, and are written to the processed store in the
+    background by the write-behind buffer.
+    """
+    readings = payload if isinstance(payload, list) else [payload]
+    if not readings:
+        raise HTTPException(status_code=422, detail="No readings in request.")
+    if not ingest_buffer.has_room(len(readings)):
+        raise HTTPException(
+            status_code=503, detail="Ingest buffer is full; retry later."
+        )
+
+    arrived = datetime.now(UTC)
+    rows = []
+    scored = []
+    worst = None
+    for item in readings:
+        row = item.model_dump()
+        row[TIMESTAMP_COL] = to_stored_timestamp(row[TIMESTAMP_COL], arrived)
+        threat_result = scoring.model.score(row)
+        rows.append(row)
+        scored.append((row["location_id"], row, threat_result))
+        _register_station(row)
+        nowcaster.update(row["location_id"], row)
+        if worst is None or threat_result["score"] > worst["score"]:
+            worst = threat_result
+
+    live_feed.publish_batch(scored)
+    dispatcher.submit(scored)
+    ingest_buffer.add(rows)
+
+    return IngestResponse(
+        accepted=len(rows),
+        pending=ingest_buffer.pending,
+        max_score=worst["score"],
+        max_level=worst["level"],
+        config_version=scoring.version,
+    )
+
+
+# --- Spatial Queries ---
+def _station_threat(location_id: str, distance_km: Optional[float] = None):
+    lat, lon = station_index.stations[location_id]
+    station = StationThreat(
+        location_id=location_id, latitude=lat, longitude=lon, distance_km=distance_km
+    )
+    latest = live_feed.latest.get(location_id)
+    if latest is not None:
+        reading, threat_result = latest
+        station.score = threat_result["score"]
+        station.level = threat_result["level"]
+        station.parameters = threat_result["parameters"]
+        station.measurement_timestamp = reading.get(TIMESTAMP_COL)
+    return station
+
+
+@app.get(
+    "/threat/nearby", response_model=List[StationThreat], tags=["Threat Assessment"]
+)
+async def get_nearby_threats(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(50.0, gt=0, le=20000, description="Radius in km."),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """Latest threat of every station within `radius` km, nearest first."""
+    return [
+        _station_threat(location_id, round(distance, 3))
+        for location_id, distance in station_index.nearby(lat, lon, radius, limit)
+    ]
+
+
+@app.get(
+    "/threat/bbox", response_model=List[StationThreat], tags=["Threat Assessment"]
+)
+async def get_bbox_threats(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+):
+    """Latest threat of every station inside the bounding box."""
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(
+            status_code=422, detail="min_lat/min_lon must not exceed max_lat/max_lon."
+        )
+    return [
+        _station_threat(location_id)
+        for location_id in station_index.within_bbox(min_lat, min_lon, max_lat, max_lon)
+    ]
+
+
+# --- Nowcast ---
+@app.get(
+    "/threat/nowcast", response_model=NowcastResponse, tags=["Threat Assessment"]
+)
+async def get_threat_nowcast(
+    location_id: Optional[str] = None,
+    horizon: List[float] = Query(
+        list(NOWCAST_HORIZONS_H), description="Hours ahead; repeat for several."
+    ),
+):
+    """
+    Expected threat 1-3 hours ahead, from the station's recent trend.
+
+    Each parameter's least-squares trend over the last few hours is
+    extrapolated and the projected reading is scored with the active model.
+    """
+    if not all(0 < h <= NOWCAST_MAX_HORIZON_H for h in horizon):
+        raise HTTPException(
+            status_code=422,
+            detail=f"Horizons must be in (0, {NOWCAST_MAX_HORIZON_H:g}] hours.",
+        )
+    location_id = location_id or live_feed.last_location
+    nowcast = nowcaster.project(location_id, horizon) if location_id else None
+    if nowcast is None:
+        raise HTTPException(
+            status_code=404, detail=f"No recent readings for location '{location_id}'."
+        )
+
+    model = scoring.model
+    forecasts = []
+    for horizon_h, valid_at, projected in nowcast["projections"]:
+        threat_result = model.score(projected)
+        forecasts.append(
+            NowcastPoint(
+                horizon_h=horizon_h,
+                valid_at=valid_at,
+                score=threat_result["score"],
+                level=threat_result["level"],
+                parameters=threat_result["parameters"],
+                projected={
+                    param: None if value is None else round(value, 2)
+                    for param, value in projected.items()
+                },
+            )
+        )
+    return NowcastResponse(
+        location_id=location_id,
+        as_of=nowcast["as_of"],
+        window_points=nowcast["points"],
+        trends=nowcast["trends"],
+        forecasts=forecasts,
+        config_version=scoring.version,
+    )
+
+
+# --- Threat History ---
+@app.get(
+    "/threat/history", response_model=ThreatHistoryResponse, tags=["Threat Assessment"]
+)
+def get_threat_history(
+    start: datetime,
+    end: datetime,
+    resolution: str = Query("1h", description="Bucket width, e.g. 10min, 1h, 1D."),
+    location_id: Optional[str] = None,
+):
+    """Threat score history for charts, served from the rollup pyramid."""
+    try:
+        width = pd.Timedelta(resolution)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Bad resolution '{resolution}'.")
+    if width <= pd.Timedelta(0):
+        raise HTTPException(status_code=422, detail="Resolution must be positive.")
+    try:
+        rollup_freq = pick_rollup_freq(width)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    start, end = to_stored_timestamp(start), to_stored_timestamp(end)
+    rows = rollups.query(start, end, width, location_id)
+    buckets = [
+        ThreatBucket(
+            bucket=row["bucket"],
+            count=row["count"],
+            max_score=row["score_max"],
+            mean_score=round(row["mean_score"], 2),
+            worst_level=THREAT_LABELS[int(row["level_max"])],
+            parameter_maxima={
+                col: None if pd.isna(row[f"{col}_max"]) else round(row[f"{col}_max"], 2)
+                for col in PROCESSED_SCHEMA
+            },
+        )
+        for row in rows.to_dict("records")
+    ]
+    return ThreatHistoryResponse(
+        location_id=location_id,
+        resolution=resolution,
+        rollup=rollup_freq,
+        buckets=buckets,
+        config_version=scoring.version,
+    )
+
+
+# --- Admin: Scoring Config ---
+def _check_admin(token: Optional[str]) -> None:
+    # Fail closed: an unset token must not leave scoring open to anyone
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=403,
+            detail="Admin endpoints are disabled: ADMIN_TOKEN is not set.",
+        )
+    if not hmac.compare_digest(token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required.")
+
+
+def _config_status() -> ScoringConfigStatus:
+    job = scoring.job
+    return ScoringConfigStatus(
+        active=scoring.config, rescore=job.as_dict() if job is not None else None
+    )
+
+
+@app.get("/admin/scoring-config", response_model=ScoringConfigStatus, tags=["Admin"])
+def get_scoring_config(x_admin_token: Optional[str] = Header(None)):
+    _check_admin(x_admin_token)
+    return _config_status()
+
+
+@app.put(
+    "/admin/scoring-config",
+    response_model=ScoringConfigStatus,
+    status_code=202,
+    tags=["Admin"],
+)
+async def put_scoring_config(
+    config: ScoringConfig, x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Validate a new scoring config and start rescoring history with it.
+
+    The current config keeps serving until the rescore completes; poll
+    GET /admin/scoring-config for progress.
+    """
+    _check_admin(x_admin_token)
+    try:
+        config.build_model()
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Cannot load model: {e}")
+    apply_scoring_config(config)
+    return _config_status()
+
+
+@app.post(
+    "/admin/scoring-config/reload",
+    response_model=ScoringConfigStatus,
+    status_code=202,
+    tags=["Admin"],
+)
+async def reload_scoring_config(x_admin_token: Optional[str] = Header(None)):
+    """Re-read SCORING_CONFIG_PATH and apply it."""
+    _check_admin(x_admin_token)
+    if not SCORING_CONFIG_PATH:
+        raise HTTPException(status_code=409, detail="SCORING_CONFIG_PATH is not set.")
+    try:
+        config = load_scoring_config(SCORING_CONFIG_PATH)
+        config.build_model()
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Invalid scoring config: {e}")
+    apply_scoring_config(config)
+    return _config_status()
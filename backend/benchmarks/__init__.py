@@ -0,0 +1 @@
+# Standalone performance scripts, run with `python -m backend.benchmarks.<name>`.
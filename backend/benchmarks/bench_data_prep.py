@@ -0,0 +1,167 @@
+"""
+Benchmark the raw -> processed ingestion path.
+
+Compares the original pipeline (inferred dtypes, `None`-filled columns,
+format-less datetime parsing) against the typed schema in `data_prep` on a
+synthetic Beach Weather Stations export.
+
+Usage:
+------
+    python -m backend.benchmarks.bench_data_prep --rows 2000000
+"""
+
+import argparse
+import json
+import multiprocessing
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .. import data_prep
+
+RAW_COLUMNS = [
+    "Station Name",
+    "Measurement Timestamp",
+    "Air Temperature",
+    "Wet Bulb Temperature",
+    "Humidity",
+    "Rain Intensity",
+    "Interval Rain",
+    "Total Rain",
+    "Precipitation Type",
+    "Wind Direction",
+    "Wind Speed",
+    "Maximum Wind Speed",
+    "Barometric Pressure",
+    "Solar Radiation",
+    "Heading",
+    "Battery Life",
+    "Measurement Timestamp Label",
+    "Measurement ID",
+]
+
+
+def write_synthetic_raw(path: Path, rows: int, seed: int = 0) -> None:
+    """Write a raw-format CSV with `rows` one-minute readings."""
+    rng = np.random.default_rng(seed)
+    stamps = pd.date_range("2015-05-22", periods=rows, freq="min")
+    stamp_text = stamps.strftime(data_prep.RAW_TIMESTAMP_FORMAT)
+    humidity = rng.uniform(40, 100, rows).round(0)
+    # Sprinkle missing readings like the real export has
+    humidity[rng.random(rows) < 0.01] = np.nan
+    df = pd.DataFrame(
+        {
+            "Station Name": rng.choice(
+                ["63rd Street Weather Station", "Oak Street Weather Station"], rows
+            ),
+            "Measurement Timestamp": stamp_text,
+            "Air Temperature": rng.normal(18, 8, rows).round(1),
+            "Wet Bulb Temperature": rng.normal(15, 6, rows).round(1),
+            "Humidity": humidity,
+            "Rain Intensity": rng.exponential(1.5, rows).round(1),
+            "Interval Rain": rng.exponential(0.2, rows).round(1),
+            "Total Rain": rng.uniform(0, 300, rows).round(1),
+            "Precipitation Type": rng.choice([0, 60, 70], rows),
+            "Wind Direction": rng.integers(0, 360, rows),
+            "Wind Speed": rng.gamma(2.0, 3.0, rows).round(1),
+            "Maximum Wind Speed": rng.gamma(2.5, 4.0, rows).round(1),
+            "Barometric Pressure": rng.normal(1000, 8, rows).round(1),
+            "Solar Radiation": rng.integers(0, 900, rows),
+            "Heading": rng.integers(0, 360, rows),
+            "Battery Life": rng.uniform(11, 15, rows).round(1),
+            "Measurement Timestamp Label": stamp_text,
+            "Measurement ID": np.arange(rows).astype(str),
+        },
+        columns=RAW_COLUMNS,
+    )
+    df.to_csv(path, index=False)
+
+
+def legacy_pipeline(path: Path) -> pd.DataFrame:
+    """The pipeline as it was before the typed schema (kept for comparison)."""
+    df = data_prep.clean_column_names(pd.read_csv(path))
+    keep_cols = [data_prep.TIMESTAMP_COL, *data_prep.PROCESSED_SCHEMA]
+    for col in keep_cols:
+        if col not in df.columns:
+            df[col] = None
+    df = df[keep_cols].copy()
+    with warnings.catch_warnings():
+        # pandas warns that it is falling back to dateutil; that is the point
+        warnings.simplefilter("ignore", UserWarning)
+        df["measurement_timestamp"] = pd.to_datetime(
+            df["measurement_timestamp"], errors="coerce"
+        )
+    df = df.dropna(subset=data_prep.SCORING_COLS)
+    return df.sort_values("measurement_timestamp").reset_index(drop=True)
+
+
+def typed_pipeline(path: Path) -> pd.DataFrame:
+    return data_prep.process_data(data_prep.load_raw(path))
+
+
+def _peak_rss_bytes() -> int:
+    """High-water RSS of this process (Linux), reset on exec unlike ru_maxrss."""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _run(fn, path: Path, results) -> None:
+    start = time.perf_counter()
+    df = fn(path)
+    elapsed = time.perf_counter() - start
+    peak = _peak_rss_bytes()
+    results.put(
+        {
+            "seconds": round(elapsed, 3),
+            "rows": len(df),
+            "frame_mb": round(float(df.memory_usage(deep=True).sum()) / 1e6, 1),
+            "peak_rss_mb": round(peak / 1e6, 1),
+        }
+    )
+
+
+def measure(fn, path: Path) -> dict:
+    """Run one pipeline in a fresh process so peak RSS is not shared."""
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(target=_run, args=(fn, path, results))
+    proc.start()
+    result = results.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--json", help="Write the results to this file as JSON.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "beach_weather.csv"
+        print(f"🔧 Writing {args.rows:,} synthetic raw rows...")
+        write_synthetic_raw(path, args.rows)
+
+        results = {"rows": args.rows}
+        for name, fn in [("legacy", legacy_pipeline), ("typed", typed_pipeline)]:
+            results[name] = measure(fn, path)
+            print(f"{name:>7}: {results[name]}")
+
+    print(
+        f"⏱️ speedup {results['legacy']['seconds'] / results['typed']['seconds']:.1f}x, "
+        f"frame {results['legacy']['frame_mb'] / results['typed']['frame_mb']:.1f}x "
+        f"smaller, peak {results['legacy']['peak_rss_mb'] / results['typed']['peak_rss_mb']:.1f}x lower"
+    )
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
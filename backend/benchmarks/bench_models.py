@@ -0,0 +1,93 @@
+"""
+Micro-benchmark the threat models: single-reading and batch latency.
+
+Trains the logistic model on a synthetic storm history (or loads a trained
+artifact with --model), then times, for each model:
+- `score()` on one reading, as the API calls it per request
+- `score_batch()` on --batch rows (1e6 by default)
+- the old row-wise `df.apply(calculate_threat_score)` on a sample, for scale
+
+Usage:
+------
+    python -m backend.benchmarks.bench_models --batch 1000000
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from .. import learned_model
+from ..threat_model import RuleThreatModel, calculate_threat_score
+from .datasets import synthetic_storm_history
+
+
+def median_us(fn, calls: int) -> float:
+    """Median wall time of `fn()` in microseconds, over `calls` calls."""
+    times = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1e6, 2)
+
+
+def bench_model(model, single: dict, batch: pd.DataFrame, repeat: int) -> dict:
+    model.score(single)  # warm-up
+    batch_ms = median_us(lambda: model.score_batch(batch), repeat) / 1000
+    return {
+        "single_us": median_us(lambda: model.score(single), 10_000),
+        "batch_ms": round(batch_ms, 2),
+        "batch_rows_per_s": round(len(batch) / batch_ms * 1000),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch", type=int, default=1_000_000)
+    parser.add_argument("--train-rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--model", help="Trained artifact directory to benchmark.")
+    parser.add_argument("--json", help="Write the results to this file as JSON.")
+    args = parser.parse_args()
+
+    batch = synthetic_storm_history(args.batch, seed=1)
+    single = batch.iloc[len(batch) // 2].to_dict()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = args.model
+        if model_dir is None:
+            print("🔧 Training logistic model on synthetic history...")
+            history = synthetic_storm_history(args.train_rows)
+            labels = learned_model.label_storm_episodes(history)
+            model_dir = learned_model.train_logistic(history, labels).save(
+                Path(tmp) / "storm_logistic"
+            )
+
+        start = time.perf_counter()
+        logistic = learned_model.load_model(str(model_dir))
+        load_ms = (time.perf_counter() - start) * 1000
+
+        results = {"batch_rows": args.batch, "logistic_load_ms": round(load_ms, 3)}
+        for model in (RuleThreatModel(), logistic):
+            print(f"🔧 Benchmarking {model.name} model...")
+            results[model.name] = bench_model(model, single, batch, args.repeat)
+            print(json.dumps(results[model.name], indent=2))
+
+    sample = batch.iloc[:20_000]
+    start = time.perf_counter()
+    sample.apply(calculate_threat_score, axis=1)
+    elapsed = time.perf_counter() - start
+    results["rowwise_apply_rows_per_s"] = round(len(sample) / elapsed)
+    print(f"Row-wise apply baseline: {results['rowwise_apply_rows_per_s']} rows/s")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
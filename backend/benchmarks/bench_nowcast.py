@@ -0,0 +1,81 @@
+"""
+Benchmark the nowcaster: online update/projection cost and backtest speed.
+
+For each window length, feeds one-minute readings to a `Nowcaster` and
+times `update()` (one reading) and `project()` (the 1/2/3 h nowcast an
+API request makes). Both should stay flat as the window grows. Then runs
+the vectorized backtest over a synthetic multi-station history.
+
+Usage:
+------
+    python -m backend.benchmarks.bench_nowcast --stations 100 --rows 10000
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from ..data_prep import TIMESTAMP_COL
+from ..nowcast import Nowcaster, backtest
+from .bench_models import median_us
+from .datasets import synthetic_storm_history
+
+WINDOWS_H = (0.5, 3.0, 12.0, 48.0)
+
+
+def bench_online(window_h: float, calls: int) -> dict:
+    # One reading a minute, so the window holds 60 * window_h points
+    points = int(window_h * 60)
+    readings = synthetic_storm_history(points + calls)
+    readings[TIMESTAMP_COL] = pd.date_range(
+        "2024-01-01", periods=len(readings), freq="1min"
+    )
+    records = readings.to_dict("records")
+    nowcaster = Nowcaster(window_h=window_h, max_points=points)
+    for record in records[:points]:
+        nowcaster.update("S0", record)
+
+    feed = iter(records[points:])
+    return {
+        "window_points": points,
+        "update_us": median_us(lambda: nowcaster.update("S0", next(feed)), calls),
+        "project_us": median_us(lambda: nowcaster.project("S0"), calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--stations", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows per station.")
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--json", help="Write the results to this file as JSON.")
+    args = parser.parse_args()
+
+    results = {"online": {}}
+    for window_h in WINDOWS_H:
+        print(f"🔧 Online nowcast, {window_h:g} h window...")
+        results["online"][f"{window_h:g}h"] = bench_online(window_h, args.calls)
+        print(json.dumps(results["online"][f"{window_h:g}h"]))
+
+    history = pd.concat(
+        [
+            synthetic_storm_history(args.rows, seed=i).assign(location_id=f"S{i}")
+            for i in range(args.stations)
+        ],
+        ignore_index=True,
+    )
+    print(f"🔧 Backtesting over {len(history)} readings...")
+    start = time.perf_counter()
+    results["backtest"] = backtest(history)
+    results["backtest"]["total_s"] = round(time.perf_counter() - start, 2)
+    print(json.dumps(results["backtest"], indent=2))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark the synthetic station network: readings generated per second.
+
+For each station count, times `SyntheticStationNetwork.generate()` on one
+batch of --rows readings. Generation is vectorized, so throughput should
+be in the millions of readings per second and barely depend on the
+number of stations.
+
+Usage:
+------
+    python -m backend.benchmarks.bench_simulator --rows 1000000 --stations 500
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from ..sensor_simulator import SyntheticStationNetwork
+
+
+def bench_generate(stations: int, rows: int, repeat: int) -> dict:
+    network = SyntheticStationNetwork(stations=stations, rate=1000, start="2025-08-30")
+    network.generate(1000)  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        network.generate(rows)
+        best = min(best, time.perf_counter() - start)
+    return {
+        "stations": stations,
+        "rows": rows,
+        "generate_ms": round(best * 1000, 1),
+        "rows_per_s": round(rows / best),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--stations", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Write the results to this file as JSON.")
+    args = parser.parse_args()
+
+    results = []
+    for stations in args.stations:
+        print(f"🔧 Generating {args.rows} readings over {stations} stations...")
+        results.append(bench_generate(stations, args.rows, args.repeat))
+        print(json.dumps(results[-1]))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark the station spatial index: nearby-query latency vs station count.
+
+For each station count, scatters stations uniformly between 60°S and 60°N
+and times `StationIndex.nearby()` at random points. The grid keeps the cost
+tied to how many stations are in range, so a 50 km query should stay well
+under a millisecond even at 100k stations.
+
+Usage:
+------
+    python -m backend.benchmarks.bench_spatial --stations 10000 100000
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+
+from ..spatial import StationIndex
+from .bench_models import median_us
+
+
+def bench_nearby(stations: int, radius_km: float, calls: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    index = StationIndex()
+    for i in range(stations):
+        index.add(f"S{i}", rng.uniform(-60, 60), rng.uniform(-180, 180))
+    return {
+        "stations": stations,
+        "radius_km": radius_km,
+        "nearby_us": median_us(
+            lambda: index.nearby(
+                rng.uniform(-60, 60), rng.uniform(-180, 180), radius_km
+            ),
+            calls,
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--stations", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--radius", type=float, default=50.0)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--json", help="Write the results to this file as JSON.")
+    args = parser.parse_args()
+
+    results = []
+    for stations in args.stations:
+        print(f"🔧 Nearby queries over {stations} stations...")
+        results.append(bench_nearby(stations, args.radius, args.calls))
+        print(json.dumps(results[-1]))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
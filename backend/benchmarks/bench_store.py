@@ -0,0 +1,150 @@
+"""
+Benchmark the processed-data store: flat CSV vs SQLite.
+
+Loads the same synthetic multi-station history into both backends, then
+times the data-access functions used by the API (latest row, time range,
+aggregate, append) and a concurrent read/append mix.
+
+Usage:
+------
+    python -m backend.benchmarks.bench_store --rows 1000000 --stations 50
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .. import store
+
+
+def synthetic_readings(rows: int, stations: int, seed: int = 0) -> pd.DataFrame:
+    """`rows` readings spread round-robin over `stations`, ten minutes apart."""
+    rng = np.random.default_rng(seed)
+    per_station = -(-rows // stations)
+    stamps = pd.date_range("2024-01-01", periods=per_station, freq="10min")
+    df = pd.DataFrame(
+        {
+            "location_id": np.tile(
+                [f"ST{i:03d}" for i in range(stations)], per_station
+            )[:rows],
+            "measurement_timestamp": np.repeat(stamps, stations)[:rows],
+            "air_temperature": rng.normal(28, 3, rows),
+            "humidity": rng.uniform(50, 100, rows),
+            "rain_intensity": rng.exponential(2, rows),
+            "wind_speed": rng.gamma(2, 4, rows),
+            "maximum_wind_speed": rng.gamma(2.5, 5, rows),
+            "barometric_pressure": rng.normal(1005, 6, rows),
+        }
+    )
+    return df.astype(store.PROCESSED_SCHEMA)
+
+
+def timed(fn, repeat: int) -> float:
+    """Median wall time of `fn` in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 3)
+
+
+def concurrent_mix(path, location_id: str, append_df, seconds: float, readers: int):
+    """Reader threads poll the latest row while one thread keeps appending."""
+    stop = threading.Event()
+    counts = {"reads": 0, "appends": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def reader():
+        while not stop.is_set():
+            try:
+                store.latest_reading(path, location_id)
+                with lock:
+                    counts["reads"] += 1
+            except Exception:
+                with lock:
+                    counts["errors"] += 1
+
+    def writer():
+        while not stop.is_set():
+            store.append_readings(append_df, path)
+            counts["appends"] += 1
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return {
+        "reads_per_s": round(counts["reads"] / seconds, 1),
+        "appends_per_s": round(counts["appends"] / seconds, 1),
+        "errors": counts["errors"],
+    }
+
+
+def bench_backend(path, df: pd.DataFrame, repeat: int, mix_seconds: float) -> dict:
+    start = time.perf_counter()
+    store.append_readings(df, path)
+    load_s = time.perf_counter() - start
+
+    location_id = df["location_id"].iloc[0]
+    last = df["measurement_timestamp"].max()
+    day = (last - pd.Timedelta("1D"), last)
+    week = (last - pd.Timedelta("7D"), last)
+    append_df = df.iloc[:1000].assign(measurement_timestamp=last + pd.Timedelta("1D"))
+
+    results = {
+        "initial_load_s": round(load_s, 2),
+        "latest_ms": timed(lambda: store.latest_reading(path), repeat),
+        "latest_by_location_ms": timed(
+            lambda: store.latest_reading(path, location_id), repeat
+        ),
+        "range_1d_by_location_ms": timed(
+            lambda: store.readings_between(*day, path, location_id), repeat
+        ),
+        "aggregate_7d_by_location_ms": timed(
+            lambda: store.aggregate_readings(*week, path, location_id), repeat
+        ),
+        "append_1000_ms": timed(lambda: store.append_readings(append_df, path), repeat),
+    }
+    results["concurrent"] = concurrent_mix(
+        path, location_id, append_df, mix_seconds, readers=4
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--stations", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mix-seconds", type=float, default=5.0)
+    parser.add_argument("--json", help="Write the results to this file as JSON.")
+    args = parser.parse_args()
+
+    df = synthetic_readings(args.rows, args.stations)
+    results = {"rows": args.rows, "stations": args.stations}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, filename in [("csv", "processed.csv"), ("sqlite", "processed.db")]:
+            print(f"🔧 Benchmarking {name} store...")
+            results[name] = bench_backend(
+                Path(tmp) / filename, df, args.repeat, args.mix_seconds
+            )
+            print(json.dumps(results[name], indent=2))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
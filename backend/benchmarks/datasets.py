@@ -0,0 +1,33 @@
+"""
+Synthetic datasets shared by the benchmarks and the model/nowcast tests.
+
+Not part of the service: nothing outside benchmarks/ and tests/ imports
+this module.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ..data_prep import PROCESSED_SCHEMA, TIMESTAMP_COL
+
+
+def synthetic_storm_history(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Ten-minute readings with a storm passing roughly every five days."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(rows)
+    # Storm intensity 0..1: a smooth bump per cycle, centred mid-cycle
+    phase = (t % 720) / 720
+    storm = np.clip(1 - np.abs(phase - 0.5) / 0.08, 0, 1) ** 2
+    storm *= rng.uniform(0.6, 1.3, rows // 720 + 1)[t // 720]
+    df = pd.DataFrame(
+        {
+            TIMESTAMP_COL: pd.date_range("2024-01-01", periods=rows, freq="10min"),
+            "air_temperature": rng.normal(28, 2, rows) - 3 * storm,
+            "humidity": np.clip(rng.normal(75, 6, rows) + 25 * storm, 0, 100),
+            "rain_intensity": rng.exponential(0.5, rows) + 25 * storm,
+            "wind_speed": rng.gamma(2, 3, rows) + 30 * storm,
+            "maximum_wind_speed": rng.gamma(2.5, 4, rows) + 40 * storm,
+            "barometric_pressure": rng.normal(1010, 2, rows) - 30 * storm,
+        }
+    )
+    return df.astype(PROCESSED_SCHEMA)
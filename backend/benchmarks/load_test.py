@@ -0,0 +1,435 @@
+"""
+Load-test harness for the SSE stream and REST endpoints.
+
+Opens many concurrent `/threat/stream` subscribers plus an open-loop mix of
+REST traffic (`POST /threat/score`, `GET /threat/latest`, `GET /health`),
+and records request latency, SSE delivery lag, throughput, and the server's
+CPU and RSS over time. Results are written as a JSON report; passing a
+previous report as `--baseline` fails the run on capacity regressions.
+
+By default the app is served in-process by uvicorn on a free local port,
+backed by a synthetic processed CSV (CPU/RSS then include the load
+generator itself). Use `--url` (and `--pid` for resource sampling) to
+target a separately started server instead.
+
+Usage:
+------
+    python -m backend.benchmarks.load_test --subscribers 2000 --rps 500
+    python -m backend.benchmarks.load_test --url http://127.0.0.1:7777 --pid 4242
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from .. import data_prep
+
+# Share of REST requests per endpoint
+REST_MIX = [
+    ("POST", "/threat/score", 0.6),
+    ("GET", "/threat/latest", 0.3),
+    ("GET", "/health", 0.1),
+]
+# Metrics compared against a baseline report, and which direction is worse
+REGRESSION_METRICS = {
+    "rest.p99_ms": "higher",
+    "rest.throughput_rps": "lower",
+    "sse.lag_p99_ms": "higher",
+    "sse.events_per_s": "lower",
+}
+# How long the in-process API server may take to come up
+STARTUP_TIMEOUT_S = 30.0
+
+
+# --- Target Server ---
+def write_synthetic_processed(path: Path, rows: int = 500, seed: int = 0) -> None:
+    """Write a small processed CSV so the in-process app has data to serve."""
+    rng = np.random.default_rng(seed)
+    storm = np.sin(np.linspace(0, np.pi, rows)) ** 4
+    df = pd.DataFrame(
+        {
+            data_prep.TIMESTAMP_COL: pd.date_range(
+                "2025-08-30", periods=rows, freq="h"
+            ),
+            "air_temperature": rng.normal(28, 2, rows),
+            "humidity": 70 + 28 * storm,
+            "rain_intensity": 20 * storm,
+            "wind_speed": 5 + 35 * storm,
+            "maximum_wind_speed": 8 + 45 * storm,
+            "barometric_pressure": 1012 - 30 * storm,
+        }
+    ).astype(data_prep.PROCESSED_SCHEMA)
+    df.to_csv(path, index=False, date_format=data_prep.PROCESSED_TIMESTAMP_FORMAT)
+
+
+class InProcessServer:
+    """Runs the FastAPI app under uvicorn on a background thread."""
+
+    def __init__(self, data_path: Path):
+        import uvicorn
+        from .. import app as app_module
+
+        app_module.PROCESSED_DATA_PATH = str(data_path)
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        config = uvicorn.Config(
+            app_module.app,
+            host="127.0.0.1",
+            port=self.port,
+            log_level="warning",
+            backlog=8192,
+        )
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.error: Optional[BaseException] = None
+
+    def _run(self) -> None:
+        try:
+            self.server.run()
+        except BaseException as exc:  # uvicorn calls sys.exit() on bind errors
+            self.error = exc
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        deadline = time.monotonic() + STARTUP_TIMEOUT_S
+        while not self.server.started:
+            if not self.thread.is_alive():
+                # Lifespan errors are logged by uvicorn rather than raised
+                detail = repr(self.error) if self.error else "see the log above"
+                raise RuntimeError(
+                    f"API server failed to start ({detail})"
+                ) from self.error
+            if time.monotonic() > deadline:
+                self.server.should_exit = True
+                raise TimeoutError(
+                    f"API server did not start within {STARTUP_TIMEOUT_S} s"
+                )
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+# --- Resource Sampling ---
+class ProcessSampler:
+    """Samples CPU% and RSS of a process from /proc (Linux)."""
+
+    def __init__(self, pid: int, interval_s: float):
+        self.pid = pid
+        self.interval_s = interval_s
+        self.ticks_per_s = os.sysconf("SC_CLK_TCK")
+        self.samples = []
+
+    def _cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            # Skip past the parenthesised command name, which may contain spaces
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self.ticks_per_s
+
+    def _rss_bytes(self) -> int:
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    async def run(self, started: float):
+        last_cpu, last_t = self._cpu_seconds(), time.perf_counter()
+        while True:
+            await asyncio.sleep(self.interval_s)
+            cpu, now = self._cpu_seconds(), time.perf_counter()
+            self.samples.append(
+                {
+                    "t_s": round(now - started, 2),
+                    "cpu_percent": round(100 * (cpu - last_cpu) / (now - last_t), 1),
+                    "rss_mb": round(self._rss_bytes() / 1e6, 1),
+                }
+            )
+            last_cpu, last_t = cpu, now
+
+
+# --- Load Generators ---
+class Recorder:
+    def __init__(self):
+        self.sent = defaultdict(int)
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_kinds = defaultdict(int)
+        self.sse_lags = []
+        self.sse_connected = 0
+        self.sse_failed = 0
+
+
+def random_reading() -> dict:
+    return {
+        "wind_speed": round(random.uniform(0, 45), 1),
+        "maximum_wind_speed": round(random.uniform(0, 60), 1),
+        "humidity": round(random.uniform(40, 100), 1),
+        "rain_intensity": round(random.uniform(0, 20), 1),
+        "barometric_pressure": round(random.uniform(975, 1020), 1),
+    }
+
+
+async def sse_subscriber(client: httpx.AsyncClient, rec: Recorder):
+    try:
+        # Events may be seconds apart, so only connecting is time-limited
+        timeout = httpx.Timeout(client.timeout.connect, read=None)
+        async with client.stream("GET", "/threat/stream", timeout=timeout) as response:
+            if response.status_code != 200:
+                rec.sse_failed += 1
+                return
+            rec.sse_connected += 1
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                sent = datetime.fromisoformat(json.loads(line[6:])["timestamp"])
+                rec.sse_lags.append((datetime.now(UTC) - sent).total_seconds())
+    except (httpx.HTTPError, OSError):
+        rec.sse_failed += 1
+
+
+async def rest_request(
+    client: httpx.AsyncClient, method: str, path: str, rec: Recorder
+):
+    key = f"{method} {path}"
+    rec.sent[key] += 1
+    start = time.perf_counter()
+    try:
+        if method == "POST":
+            response = await client.post(path, json=random_reading())
+        else:
+            response = await client.get(path)
+        if response.status_code != 200:
+            rec.errors[key] += 1
+            rec.error_kinds[f"HTTP {response.status_code}"] += 1
+            return
+    except (httpx.HTTPError, OSError) as e:
+        rec.errors[key] += 1
+        rec.error_kinds[type(e).__name__] += 1
+        return
+    rec.latencies[key].append(time.perf_counter() - start)
+
+
+async def rest_traffic(client: httpx.AsyncClient, rps: float, rec: Recorder):
+    """Open-loop request scheduler: send times don't wait on responses."""
+    if rps <= 0:
+        return
+    endpoints = [(m, p) for m, p, _ in REST_MIX]
+    weights = [w for _, _, w in REST_MIX]
+    pending = set()
+    next_at = time.perf_counter()
+    try:
+        while True:
+            method, path = random.choices(endpoints, weights)[0]
+            task = asyncio.create_task(rest_request(client, method, path, rec))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            next_at += 1 / rps
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+    finally:
+        # Requests still in flight at the deadline are neither done nor failed
+        for task in pending:
+            task.cancel()
+
+
+# --- Report ---
+def _percentiles_ms(values, prefix: str = "") -> dict:
+    if not values:
+        return {
+            f"{prefix}p50_ms": None,
+            f"{prefix}p95_ms": None,
+            f"{prefix}p99_ms": None,
+        }
+    p50, p95, p99 = np.percentile(np.asarray(values) * 1000, [50, 95, 99])
+    return {
+        f"{prefix}p50_ms": round(float(p50), 2),
+        f"{prefix}p95_ms": round(float(p95), 2),
+        f"{prefix}p99_ms": round(float(p99), 2),
+    }
+
+
+def build_report(args, rec: Recorder, elapsed: float, samples: list) -> dict:
+    endpoints = {}
+    for key in sorted(set(rec.latencies) | set(rec.errors)):
+        done = rec.latencies[key]
+        endpoints[key] = {
+            "sent": rec.sent[key],
+            "requests": len(done),
+            "errors": rec.errors[key],
+            "throughput_rps": round(len(done) / elapsed, 1),
+            **_percentiles_ms(done),
+        }
+    all_rest = [v for values in rec.latencies.values() for v in values]
+    return {
+        "generated_at": datetime.now(UTC).isoformat(),
+        "target": args.url or "in-process",
+        "config": {
+            "duration_s": args.duration,
+            "subscribers": args.subscribers,
+            "rps": args.rps,
+            "ramp_s": args.ramp,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "rest": {
+            "sent": sum(rec.sent.values()),
+            "requests": len(all_rest),
+            # Still waiting for a response when the run ended
+            "unfinished": sum(rec.sent.values())
+            - len(all_rest)
+            - sum(rec.errors.values()),
+            "errors": sum(rec.errors.values()),
+            "error_kinds": dict(rec.error_kinds),
+            "throughput_rps": round(len(all_rest) / elapsed, 1),
+            **_percentiles_ms(all_rest),
+            "endpoints": endpoints,
+        },
+        "sse": {
+            "connected": rec.sse_connected,
+            "failed": rec.sse_failed,
+            "events": len(rec.sse_lags),
+            "events_per_s": round(len(rec.sse_lags) / elapsed, 1),
+            **_percentiles_ms(rec.sse_lags, prefix="lag_"),
+        },
+        "resources": {
+            "peak_rss_mb": max((s["rss_mb"] for s in samples), default=None),
+            "mean_cpu_percent": (
+                round(sum(s["cpu_percent"] for s in samples) / len(samples), 1)
+                if samples
+                else None
+            ),
+            "samples": samples,
+        },
+    }
+
+
+def find_regressions(report: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics that got worse than the baseline by more than `tolerance`."""
+    regressions = []
+    for metric, worse in REGRESSION_METRICS.items():
+        section, name = metric.split(".")
+        new, old = report[section].get(name), baseline[section].get(name)
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        if (worse == "higher" and change > tolerance) or (
+            worse == "lower" and -change > tolerance
+        ):
+            regressions.append(f"{metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+# --- Runner ---
+async def run_load(args, base_url: str, pid: int) -> dict:
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        started = time.perf_counter()
+        sampler = ProcessSampler(pid, args.sample_interval)
+        tasks = [
+            asyncio.create_task(sampler.run(started)),
+            asyncio.create_task(rest_traffic(client, args.rps, rec)),
+        ]
+        for _ in range(args.subscribers):
+            tasks.append(asyncio.create_task(sse_subscriber(client, rec)))
+            if args.ramp > 0:
+                await asyncio.sleep(args.ramp / args.subscribers)
+
+        await asyncio.sleep(max(0.0, args.duration - (time.perf_counter() - started)))
+        elapsed = time.perf_counter() - started
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return build_report(args, rec, elapsed, sampler.samples)
+
+
+def _raise_fd_limit():
+    """Thousands of sockets need more than the default 1024 descriptors."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="Target a running server instead of in-process.")
+    parser.add_argument("--pid", type=int, help="Server PID to sample (with --url).")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds.")
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--rps", type=float, default=200.0, help="REST requests/s.")
+    parser.add_argument(
+        "--ramp", type=float, default=5.0, help="Subscriber ramp-up (s)."
+    )
+    parser.add_argument("--timeout", type=float, default=10.0, help="REST timeout (s).")
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--out", default="load_report.json")
+    parser.add_argument("--baseline", help="Previous report to compare against.")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Allowed relative regression vs the baseline (0.2 = 20%%).",
+    )
+    args = parser.parse_args()
+    _raise_fd_limit()
+
+    if args.url:
+        report = asyncio.run(run_load(args, args.url, args.pid or os.getpid()))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp) / "cleaned_weather.csv"
+            write_synthetic_processed(data_path)
+            with InProcessServer(data_path) as server:
+                report = asyncio.run(run_load(args, server.url, os.getpid()))
+
+    Path(args.out).write_text(json.dumps(report, indent=2))
+    rest, sse = report["rest"], report["sse"]
+    print(
+        f"📈 REST {rest['throughput_rps']} req/s p50/p95/p99 "
+        f"{rest['p50_ms']}/{rest['p95_ms']}/{rest['p99_ms']} ms, "
+        f"{rest['errors']} errors, {rest['unfinished']} unfinished"
+    )
+    print(
+        f"📡 SSE {sse['connected']} connected, {sse['events_per_s']} events/s, "
+        f"lag p50/p99 {sse['lag_p50_ms']}/{sse['lag_p99_ms']} ms"
+    )
+    print(f"✅ Report written to {args.out}")
+
+    if args.baseline:
+        regressions = find_regressions(
+            report, json.loads(Path(args.baseline).read_text()), args.max_regression
+        )
+        if regressions:
+            print("❌ Capacity regressions vs baseline:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -78,80 +78,753 @@ Steps:
 
 Usage:
 ------
-Run this script directly to clean the dataset:
-    python data_prep.py
+Run the module from the repository root to clean the dataset:
+    python -m backend.data_prep
+
+To combine several feeds (weather station, tide gauge, buoy) onto one
+fixed-cadence timeline:
+    preprocess_sources({"weather": ..., "tide": ...}, out_path, freq="10min")
+
+Threat history rollups (1-min -> 10-min -> hourly -> daily) are built with
+`build_rollups` and kept up to date by `RollupPyramid`. Running this script
+also saves them next to the processed file (`save_rollups`), so the API
+loads them at startup instead of rebuilding them from the full history.
 """
 """
 Data preprocessing pipeline for the Beach Weather Stations dataset.
 """
+import json
+import threading
+import warnings
+
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from .threat_model import RuleThreatModel, level_indices
 
 # --- File Paths ---
 BASE_DIR = Path(__file__).parent
 RAW_DATA_PATH = BASE_DIR / "data" / "raw" / "beach_weather.csv"
 PROCESSED_DATA_PATH = BASE_DIR / "data" / "processed" / "cleaned_weather.csv"
 
+# --- Processed Dataset Schema ---
+TIMESTAMP_COL = "measurement_timestamp"
+# Raw export format, e.g. "05/22/2015 03:00:00 PM"
+RAW_TIMESTAMP_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+# Format written by `to_csv` (and SQLite) for the processed store; keeps
+# microseconds so sub-second readings of one station stay distinct
+PROCESSED_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+# Parses that format and stores written before it had microseconds,
+# still in a single vectorized pass
+PROCESSED_TIMESTAMP_PARSE = "ISO8601"
 
-def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
-    df.columns = (
-        df.columns.str.strip()
+# Measurements are stored as float32: sensor precision is far below what
+# float64 carries, and it halves the in-memory footprint.
+PROCESSED_SCHEMA = {
+    "air_temperature": "float32",
+    "humidity": "float32",
+    "rain_intensity": "float32",
+    "wind_speed": "float32",
+    "maximum_wind_speed": "float32",
+    "barometric_pressure": "float32",
+}
+# Station identity and position, so readings can be placed on a map
+STATION_SCHEMA = {
+    "location_id": "object",
+    "latitude": "float64",
+    "longitude": "float64",
+}
+# Station id of readings that carry none; both store backends read a
+# missing id back as this
+UNKNOWN_LOCATION = "UNKNOWN"
+# Raw column names that carry station fields under another name
+STATION_ALIASES = {
+    "station_name": "location_id",
+    "lat": "latitude",
+    "lon": "longitude",
+    "lng": "longitude",
+}
+PROCESSED_DTYPES = {**STATION_SCHEMA, **PROCESSED_SCHEMA}
+PROCESSED_COLUMNS = [TIMESTAMP_COL, *PROCESSED_DTYPES]
+# Rows per chunk when streaming raw feeds
+RAW_CHUNK_ROWS = 250_000
+
+# Key scoring columns; rows missing any of these are dropped
+SCORING_COLS = [
+    "wind_speed",
+    "maximum_wind_speed",
+    "humidity",
+    "rain_intensity",
+    "barometric_pressure",
+]
+
+
+def _clean_names(columns: pd.Index) -> pd.Index:
+    return (
+        columns.str.strip()
         .str.lower()
         .str.replace(r"[^a-z0-9_]+", "_", regex=True)
         .str.replace(r"_+", "_", regex=True)
     )
+
+
+def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = _clean_names(df.columns)
     return df
 
 
-def process_data(df: pd.DataFrame) -> pd.DataFrame:
-    # Relevant columns for threat scoring
-    keep_cols = [
-        "measurement_timestamp",
-        "air_temperature",
-        "humidity",
-        "rain_intensity",
-        "wind_speed",
-        "maximum_wind_speed",
-        "barometric_pressure",
-    ]
-    # Ensure all required columns exist, fill missing ones with None
-    for col in keep_cols:
-        if col not in df.columns:
-            df[col] = None
-
-    df = df[keep_cols]
-    df["measurement_timestamp"] = pd.to_datetime(
-        df["measurement_timestamp"], errors="coerce"
+def _parse_raw_fixed_width(values: pd.Series) -> pd.Series:
+    """
+    Vectorized parse of raw "MM/DD/YYYY HH:MM:SS AM" timestamps.
+
+    pandas handles "%p" one element at a time. The raw export is fixed
+    width, so the fields are sliced out of a code-point matrix instead.
+    Rows that don't fit the layout come back as NaT.
+    """
+    width = 22
+    text = values.astype(str).to_numpy().astype(f"U{width + 1}")
+    chars = text.view(np.uint32).reshape(len(text), width + 1)
+
+    def char(i: int) -> np.ndarray:
+        return chars[:, i].astype(np.int64)
+
+    def field(start: int, end: int) -> np.ndarray:
+        out = np.zeros(len(text), dtype=np.int64)
+        for i in range(start, end):
+            out = out * 10 + char(i) - ord("0")
+        return out
+
+    ok = np.ones(len(text), dtype=bool)
+    for i in [0, 1, 3, 4, 6, 7, 8, 9, 11, 12, 14, 15, 17, 18]:
+        ok &= (chars[:, i] >= ord("0")) & (chars[:, i] <= ord("9"))
+    for i, sep in [(2, "/"), (5, "/"), (10, " "), (13, ":"), (16, ":"), (19, " ")]:
+        ok &= chars[:, i] == ord(sep)
+    is_pm = chars[:, 20] == ord("P")
+    ok &= (is_pm | (chars[:, 20] == ord("A"))) & (chars[:, 21] == ord("M"))
+    ok &= chars[:, width] == 0
+
+    month, day, year = field(0, 2), field(3, 5), field(6, 10)
+    hour, minute, second = field(11, 13), field(14, 16), field(17, 19)
+    del text, chars
+    ok &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    ok &= (hour >= 1) & (hour <= 12) & (minute < 60) & (second < 60)
+
+    months = np.where(ok, (year - 1970) * 12 + month - 1, 0).astype("datetime64[M]")
+    days = months.astype("datetime64[D]") + np.where(ok, day - 1, 0)
+    # Reject dates like 02/30 that rolled over into the next month
+    ok &= days.astype("datetime64[M]") == months
+    seconds = (hour % 12 + 12 * is_pm) * 3600 + minute * 60 + second
+    stamps = days.astype("datetime64[s]") + seconds.astype("timedelta64[s]")
+    stamps[~ok] = np.datetime64("NaT")
+    return pd.Series(stamps.astype("datetime64[ns]"), index=values.index)
+
+
+def _to_naive_utc(values: pd.Series, **kwargs) -> pd.Series:
+    """`pd.to_datetime` that always returns naive UTC datetime64[ns]."""
+    parsed = pd.to_datetime(values, utc=True, errors="coerce", cache=True, **kwargs)
+    return parsed.dt.tz_convert(None).astype("datetime64[ns]")
+
+
+def parse_timestamps(values: pd.Series, fmt: str = RAW_TIMESTAMP_FORMAT) -> pd.Series:
+    """
+    Parse timestamp strings using an explicit format.
+
+    The explicit format keeps pandas (or the fixed-width raw parser) on a
+    vectorized path. Rows it rejects are retried with one format inferred
+    from the first of them (still vectorized, so a feed in another format
+    costs a single extra pass), and only what is left after that goes
+    through per-element "mixed" parsing. Strings with a UTC offset are
+    converted to UTC; the result is always naive datetime64[ns].
+    """
+    if fmt == RAW_TIMESTAMP_FORMAT:
+        parsed = _parse_raw_fixed_width(values)
+    else:
+        parsed = _to_naive_utc(values, format=fmt)
+    missed = parsed.isna() & values.notna()
+    if not missed.any():
+        return parsed
+    with warnings.catch_warnings():
+        # Raised when no single format fits; "mixed" below handles that
+        warnings.simplefilter("ignore", UserWarning)
+        parsed[missed] = _to_naive_utc(values[missed])
+    missed = parsed.isna() & values.notna()
+    if missed.any():
+        parsed[missed] = _to_naive_utc(values[missed], format="mixed")
+    return parsed
+
+
+def _raw_schema(path) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Raw -> schema column names of a raw CSV, and the dtypes to read them as."""
+    header = pd.read_csv(path, nrows=0).columns
+    wanted = {}
+    for raw, clean in zip(header, _clean_names(header)):
+        target = STATION_ALIASES.get(clean, clean)
+        if target in PROCESSED_COLUMNS and target not in wanted.values():
+            wanted[raw] = target
+    dtype = {
+        raw: PROCESSED_DTYPES[target]
+        for raw, target in wanted.items()
+        if target in PROCESSED_DTYPES
+    }
+    return wanted, dtype
+
+
+def load_raw(path) -> pd.DataFrame:
+    """
+    Read only the schema columns of a raw CSV, already typed.
+
+    Skipping unused columns and declaring dtypes up front avoids building
+    (and then discarding) float64/object columns for the whole file.
+    """
+    wanted, dtype = _raw_schema(path)
+    df = pd.read_csv(path, usecols=list(wanted), dtype=dtype)
+    return df.rename(columns=wanted)
+
+
+def iter_raw(path, chunk_rows: int = RAW_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """`load_raw` in chunks of `chunk_rows`, for files too big to read whole."""
+    wanted, dtype = _raw_schema(path)
+    with pd.read_csv(
+        path, usecols=list(wanted), dtype=dtype, chunksize=chunk_rows
+    ) as reader:
+        for chunk in reader:
+            yield chunk.rename(columns=wanted)
+
+
+def process_data(
+    df: pd.DataFrame, timestamp_format: str = RAW_TIMESTAMP_FORMAT
+) -> pd.DataFrame:
+    df = df.rename(
+        columns={
+            alias: col
+            for alias, col in STATION_ALIASES.items()
+            if alias in df.columns and col not in df.columns
+        }
     )
 
+    # Ensure all schema columns exist; missing values are NaN (not None)
+    # so every column keeps its declared dtype.
+    out = pd.DataFrame(index=df.index)
+    if "location_id" in df.columns:
+        ids = df["location_id"]
+        out["location_id"] = ids.where(ids.isna(), ids.astype(str)).astype(object)
+    else:
+        out["location_id"] = pd.Series(np.nan, index=df.index, dtype=object)
+    for col in ("latitude", "longitude"):
+        if col in df.columns:
+            out[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        else:
+            out[col] = np.full(len(df), np.nan)
+    for col, dtype in PROCESSED_SCHEMA.items():
+        if col in df.columns:
+            out[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+        else:
+            out[col] = np.full(len(df), np.nan, dtype=dtype)
+
+    if TIMESTAMP_COL not in df.columns:
+        timestamps = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    elif pd.api.types.is_datetime64_any_dtype(df[TIMESTAMP_COL]):
+        timestamps = df[TIMESTAMP_COL]
+    else:
+        timestamps = parse_timestamps(df[TIMESTAMP_COL], timestamp_format)
+    out.insert(0, TIMESTAMP_COL, timestamps)
+
     # --- FIX: Drop rows with any missing values in the key scoring columns ---
     # This is the most important step to guarantee data quality.
-    scoring_cols = [
-        "wind_speed",
-        "maximum_wind_speed",
-        "humidity",
-        "rain_intensity",
-        "barometric_pressure",
-    ]
-    df = df.dropna(subset=scoring_cols)
-
-    df = df.sort_values("measurement_timestamp").reset_index(drop=True)
+    out = out.dropna(subset=SCORING_COLS)
+
+    out = out.sort_values(TIMESTAMP_COL).reset_index(drop=True)
+    return out
+
+
+def read_processed(path=PROCESSED_DATA_PATH, skip_rows: int = 0) -> pd.DataFrame:
+    """Load the processed CSV back with its declared schema."""
+    if skip_rows:
+        # Skipped lines are not parsed; the header is read separately
+        names = pd.read_csv(path, nrows=0).columns
+        df = pd.read_csv(
+            path,
+            dtype=PROCESSED_DTYPES,
+            skiprows=skip_rows + 1,
+            header=None,
+            names=names,
+        )
+    else:
+        df = pd.read_csv(path, dtype=PROCESSED_DTYPES)
+    if TIMESTAMP_COL in df.columns:
+        df[TIMESTAMP_COL] = parse_timestamps(
+            df[TIMESTAMP_COL], PROCESSED_TIMESTAMP_PARSE
+        )
     return df
 
 
+# --- Multi-Source Merge & Resample ---
+
+
+def _bounded_interpolate(df: pd.DataFrame, max_steps: int) -> pd.DataFrame:
+    """
+    Time-interpolate interior gaps of at most `max_steps` missing samples.
+
+    Unlike `interpolate(limit=...)`, longer gaps are left entirely empty
+    instead of being partially filled from one side.
+    """
+    filled = df.interpolate(method="time", limit_area="inside")
+    for col in df.columns:
+        missing = df[col].isna()
+        if not missing.any():
+            continue
+        run_id = (~missing).cumsum()
+        run_len = missing.groupby(run_id).transform("sum")
+        filled.loc[missing & (run_len > max_steps), col] = np.nan
+    return filled.astype(df.dtypes.to_dict())
+
+
+def _source_columns(sources: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, str]]:
+    """Output column names per source; clashing names get a `_<source>` suffix."""
+    seen = set()
+    renames = {}
+    for name, df in sources.items():
+        renames[name] = {}
+        for col in df.columns:
+            if col == TIMESTAMP_COL:
+                continue
+            out = col if col not in seen else f"{col}_{name}"
+            renames[name][col] = out
+            seen.add(out)
+    return renames
+
+
+def iter_merged_chunks(
+    sources: Dict[str, pd.DataFrame],
+    freq: str = "10min",
+    tolerance: str = "15min",
+    max_gap: str = "1h",
+    chunk: str = "7D",
+) -> Iterator[pd.DataFrame]:
+    """
+    Merge several sensor feeds onto one fixed-cadence timeline, chunk by chunk.
+
+    Each chunk of the `freq` grid takes, per source, the nearest reading
+    within `tolerance` (`merge_asof`), then fills interior gaps no longer
+    than `max_gap` by time interpolation. Sources are sliced per chunk with
+    a binary search, so the total cost is linear in the history length and
+    peak memory is bounded by the chunk size.
+
+    Parameters
+    ----------
+    sources : dict
+        Source name -> DataFrame with a `measurement_timestamp` column,
+        e.g. {"weather": ..., "tide": ..., "buoy": ...}.
+    freq : str
+        Output cadence.
+    tolerance : str
+        Maximum distance between a grid point and the reading used for it.
+    max_gap : str
+        Longest run of missing grid points that will be interpolated.
+    chunk : str
+        Time span merged per step.
+    """
+    if not sources:
+        return
+    freq_td = pd.Timedelta(freq)
+    tolerance_td = pd.Timedelta(tolerance)
+    max_steps = int(pd.Timedelta(max_gap) // freq_td)
+    chunk_steps = max(1, int(pd.Timedelta(chunk) // freq_td))
+    # Interpolation context on each side: a gap reaching past it is too long
+    pad = max_steps + 1
+
+    renames = _source_columns(sources)
+    feeds = {}
+    for name, df in sources.items():
+        df = df.dropna(subset=[TIMESTAMP_COL]).sort_values(TIMESTAMP_COL)
+        # merge_asof needs identical key dtypes across all feeds
+        df[TIMESTAMP_COL] = df[TIMESTAMP_COL].astype("datetime64[ns]")
+        feeds[name] = df.rename(columns=renames[name]).reset_index(drop=True)
+
+    non_empty = [df for df in feeds.values() if not df.empty]
+    if not non_empty:
+        return
+    start = min(df[TIMESTAMP_COL].iloc[0] for df in non_empty).floor(freq_td)
+    end = max(df[TIMESTAMP_COL].iloc[-1] for df in non_empty).ceil(freq_td)
+    total_steps = int((end - start) // freq_td) + 1
+
+    for first in range(0, total_steps, chunk_steps):
+        last = min(first + chunk_steps, total_steps)
+        lo, hi = max(0, first - pad), min(total_steps, last + pad)
+        grid = pd.DataFrame(
+            {
+                TIMESTAMP_COL: pd.date_range(
+                    start + lo * freq_td, periods=hi - lo, freq=freq_td
+                )
+            }
+        )
+        window_start = grid[TIMESTAMP_COL].iloc[0] - tolerance_td
+        window_end = grid[TIMESTAMP_COL].iloc[-1] + tolerance_td
+
+        merged = grid
+        for df in feeds.values():
+            stamps = df[TIMESTAMP_COL]
+            i = stamps.searchsorted(window_start, side="left")
+            j = stamps.searchsorted(window_end, side="right")
+            merged = pd.merge_asof(
+                merged,
+                df.iloc[i:j],
+                on=TIMESTAMP_COL,
+                direction="nearest",
+                tolerance=tolerance_td,
+            )
+
+        merged = _bounded_interpolate(merged.set_index(TIMESTAMP_COL), max_steps)
+        yield merged.iloc[first - lo : first - lo + (last - first)].reset_index()
+
+
+def merge_sources(sources: Dict[str, pd.DataFrame], **kwargs) -> pd.DataFrame:
+    """Merge sensor feeds in one go; see `iter_merged_chunks` for options."""
+    chunks = list(iter_merged_chunks(sources, **kwargs))
+    if not chunks:
+        return pd.DataFrame(columns=[TIMESTAMP_COL])
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _load_source(
+    path, fmt: str, station: dict, chunk_rows: int = RAW_CHUNK_ROWS
+) -> pd.DataFrame:
+    """
+    Timestamps and measurements of one raw feed, read in typed chunks.
+
+    Station fields are not merged; the first value seen for each one that
+    is still unset in `station` is recorded there instead.
+    """
+    parts = []
+    for chunk in iter_raw(path, chunk_rows):
+        for col in STATION_SCHEMA:
+            if col in chunk.columns:
+                if station.get(col) is None and chunk[col].notna().any():
+                    station[col] = chunk[col].dropna().iloc[0]
+                del chunk[col]
+        chunk[TIMESTAMP_COL] = parse_timestamps(chunk[TIMESTAMP_COL], fmt)
+        parts.append(chunk)
+    return pd.concat(parts, ignore_index=True)
+
+
+def preprocess_sources(
+    raw_paths: Dict[str, Path],
+    out_path: Path,
+    location_id: Optional[str] = None,
+    timestamp_formats: Optional[Dict[str, str]] = None,
+    chunk_rows: int = RAW_CHUNK_ROWS,
+    **kwargs,
+) -> int:
+    """
+    Load and clean several raw feeds of one site, then stream the merged
+    timeline to CSV.
+
+    Each feed is read through the typed chunked loader (`iter_raw`) and its
+    timestamps parsed with its own format from `timestamp_formats`
+    (the raw export format by default), so only compact typed columns are
+    ever held in memory. Every output row is tagged with `location_id`
+    (default: the station name found in the feeds) and the station position
+    when a feed carries one. Merged chunks are appended as they are produced,
+    so the output never has to be held in memory as a whole. Returns the
+    number of rows written.
+    """
+    timestamp_formats = timestamp_formats or {}
+    station = {"location_id": location_id}
+    sources = {
+        name: _load_source(
+            path,
+            timestamp_formats.get(name, RAW_TIMESTAMP_FORMAT),
+            station,
+            chunk_rows,
+        )
+        for name, path in raw_paths.items()
+    }
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for chunk in iter_merged_chunks(sources, **kwargs):
+        for i, col in enumerate(STATION_SCHEMA, start=1):
+            value = station.get(col)
+            chunk.insert(i, col, np.nan if value is None else value)
+        chunk.to_csv(
+            out_path,
+            mode="w" if written == 0 else "a",
+            header=written == 0,
+            index=False,
+            date_format=PROCESSED_TIMESTAMP_FORMAT,
+        )
+        written += len(chunk)
+    return written
+
+
+# --- Threat Rollups ---
+# Pyramid levels, finest first; each is built from the one before it
+ROLLUP_FREQS = ("1min", "10min", "1h", "1D")
+ROLLUP_KEYS = ["bucket", "location_id"]
+# Every column combines associatively, so buckets can be merged in any order
+ROLLUP_AGG = {
+    "count": "sum",
+    "score_sum": "sum",
+    "score_max": "max",
+    "level_max": "max",
+    **{f"{col}_max": "max" for col in PROCESSED_SCHEMA},
+}
+
+
+def _aggregate_rollup(frame: pd.DataFrame) -> pd.DataFrame:
+    # Sorted by bucket first, so a time range is one contiguous slice
+    return frame.groupby(ROLLUP_KEYS, sort=True).agg(ROLLUP_AGG).reset_index()
+
+
+def rollup_readings(
+    df: pd.DataFrame, scores: np.ndarray, freq: str = ROLLUP_FREQS[0]
+) -> pd.DataFrame:
+    """
+    Aggregate scored readings into `freq` buckets per location.
+
+    Each bucket holds the reading count, score sum (for the mean), max
+    score, worst level and the maximum of every measurement.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if "location_id" in df:
+        locations = df["location_id"].fillna(UNKNOWN_LOCATION).to_numpy()
+    else:
+        locations = UNKNOWN_LOCATION
+    frame = pd.DataFrame(
+        {
+            "bucket": pd.to_datetime(df[TIMESTAMP_COL]).dt.floor(freq).to_numpy(),
+            "location_id": locations,
+            "count": np.ones(len(df), dtype=np.int64),
+            "score_sum": scores,
+            "score_max": scores,
+            "level_max": level_indices(scores),
+        }
+    )
+    for col, dtype in PROCESSED_SCHEMA.items():
+        values = df[col].to_numpy() if col in df else np.nan
+        frame[f"{col}_max"] = pd.Series(values, index=frame.index, dtype=dtype)
+    return _aggregate_rollup(frame)
+
+
+def coarsen_rollup(rollup: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """Re-bucket a rollup at a coarser frequency."""
+    coarse = rollup.copy()
+    coarse["bucket"] = coarse["bucket"].dt.floor(freq)
+    return _aggregate_rollup(coarse)
+
+
+def build_rollups(
+    df: pd.DataFrame, scores: Optional[np.ndarray] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Build every pyramid level from processed readings in one pass.
+
+    Only the finest level touches the raw rows; each coarser level is
+    aggregated from the level below it. `scores` defaults to the rule model.
+    """
+    if scores is None:
+        scores = RuleThreatModel().score_batch(df)
+    levels = {ROLLUP_FREQS[0]: rollup_readings(df, scores, ROLLUP_FREQS[0])}
+    for finer, freq in zip(ROLLUP_FREQS, ROLLUP_FREQS[1:]):
+        levels[freq] = coarsen_rollup(levels[finer], freq)
+    return levels
+
+
+def merge_rollups(
+    rollups: Dict[str, pd.DataFrame], new: Dict[str, pd.DataFrame]
+) -> Dict[str, pd.DataFrame]:
+    """
+    Fold freshly built rollups into existing ones.
+
+    New data is normally the most recent, so only the existing buckets from
+    the earliest new bucket onwards are re-aggregated.
+    """
+    merged = {}
+    for freq, fresh in new.items():
+        old = rollups.get(freq)
+        if old is None or old.empty:
+            merged[freq] = fresh
+            continue
+        if fresh.empty:
+            merged[freq] = old
+            continue
+        cut = int(old["bucket"].searchsorted(fresh["bucket"].iloc[0]))
+        tail = _aggregate_rollup(pd.concat([old.iloc[cut:], fresh]))
+        merged[freq] = pd.concat([old.iloc[:cut], tail], ignore_index=True)
+    return merged
+
+
+def pick_rollup_freq(resolution) -> str:
+    """
+    The coarsest pyramid level whose buckets tile `resolution` exactly.
+
+    Resolutions finer than the finest level are served from that level.
+    Raises ValueError when no level divides the resolution (e.g. 90s), since
+    re-bucketing would split level buckets across output buckets.
+    """
+    resolution = max(pd.Timedelta(resolution), pd.Timedelta(ROLLUP_FREQS[0]))
+    for freq in reversed(ROLLUP_FREQS):
+        if resolution % pd.Timedelta(freq) == pd.Timedelta(0):
+            return freq
+    raise ValueError(
+        f"Resolution {resolution} is not a multiple of any rollup level "
+        f"({', '.join(ROLLUP_FREQS)})."
+    )
+
+
+class RollupPyramid:
+    """
+    Threat rollups kept current as readings are appended.
+
+    `update()` builds rollups for the new rows only and merges them in;
+    the finished levels are swapped in as one dict, so queries running
+    concurrently always see a consistent pyramid.
+    """
+
+    def __init__(self, levels: Optional[Dict[str, pd.DataFrame]] = None):
+        self.levels = levels or {}
+        self._lock = threading.Lock()
+
+    def update(self, df: pd.DataFrame, scores: np.ndarray) -> None:
+        if df.empty:
+            return
+        with self._lock:
+            self.levels = merge_rollups(self.levels, build_rollups(df, scores))
+
+    def query(
+        self,
+        start,
+        end,
+        resolution,
+        location_id: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Buckets with start <= bucket < end at the requested resolution.
+
+        Reads from the coarsest level that divides the resolution (see
+        `pick_rollup_freq`) and re-buckets only if the resolution is a
+        multiple of it, so the work is proportional to the number of
+        buckets, not raw readings. Without a location, all stations are
+        combined per bucket.
+        """
+        freq = pick_rollup_freq(resolution)
+        resolution = max(pd.Timedelta(resolution), pd.Timedelta(freq))
+        level = self.levels.get(freq)
+        if level is None or level.empty:
+            return pd.DataFrame(columns=[*ROLLUP_KEYS, *ROLLUP_AGG, "mean_score"])
+
+        buckets = level["bucket"]
+        # From the start of the output bucket holding `start`, so it is whole
+        lo = int(buckets.searchsorted(pd.Timestamp(start).floor(resolution)))
+        hi = int(buckets.searchsorted(pd.Timestamp(end), side="left"))
+        rows = level.iloc[lo:hi]
+        if location_id is not None:
+            rows = rows[rows["location_id"] == location_id]
+
+        if location_id is None or resolution != pd.Timedelta(freq):
+            rows = rows.copy()
+            if location_id is None:
+                rows["location_id"] = "ALL"
+            rows["bucket"] = rows["bucket"].dt.floor(resolution)
+            rows = _aggregate_rollup(rows)
+        else:
+            rows = rows.reset_index(drop=True)
+        rows["mean_score"] = rows["score_sum"] / rows["count"]
+        return rows
+
+
+# --- Persisted Rollups ---
+ROLLUP_MANIFEST = "manifest.json"
+ROLLUP_DTYPES = {
+    "location_id": "object",
+    "count": "int64",
+    "score_sum": "float64",
+    "score_max": "float64",
+    "level_max": "int8",
+    **{f"{col}_max": dtype for col, dtype in PROCESSED_SCHEMA.items()},
+}
+
+
+def rollup_dir(store_path) -> Path:
+    """Where the rollups of a processed store are persisted."""
+    return Path(f"{store_path}.rollups")
+
+
+def save_rollups(
+    levels: Dict[str, pd.DataFrame], directory, rows: int, version: str
+) -> None:
+    """
+    Persist rollup levels with a manifest of what they cover.
+
+    `rows` is how many store rows (in append order) were rolled up, and
+    `version` the scoring config version their scores came from, so a
+    loader can roll in only later rows, or rebuild after a config change.
+    The manifest is written last: a half-written save is never loaded.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / ROLLUP_MANIFEST).unlink(missing_ok=True)
+    for freq, level in levels.items():
+        level.to_csv(
+            directory / f"{freq}.csv",
+            index=False,
+            date_format=PROCESSED_TIMESTAMP_FORMAT,
+        )
+    manifest = {"rows": int(rows), "version": version, "levels": list(levels)}
+    (directory / ROLLUP_MANIFEST).write_text(json.dumps(manifest))
+
+
+def load_rollups(
+    directory, version: str
+) -> Optional[Tuple[Dict[str, pd.DataFrame], int]]:
+    """
+    Rollup levels saved by `save_rollups` and the store rows they cover.
+
+    Returns None when there is nothing to load or the rollups were scored
+    under another config version.
+    """
+    try:
+        manifest = json.loads((Path(directory) / ROLLUP_MANIFEST).read_text())
+    except FileNotFoundError:
+        return None
+    if manifest["version"] != version:
+        return None
+    levels = {}
+    for freq in manifest["levels"]:
+        level = pd.read_csv(Path(directory) / f"{freq}.csv", dtype=ROLLUP_DTYPES)
+        level["bucket"] = parse_timestamps(level["bucket"], PROCESSED_TIMESTAMP_PARSE)
+        levels[freq] = level
+    return levels, manifest["rows"]
+
+
 def main():
     print("🔄 Loading raw dataset...")
-    df_raw = pd.read_csv(RAW_DATA_PATH)
+    df_raw = load_raw(RAW_DATA_PATH)
 
     print("🧹 Cleaning and processing data...")
-    df_clean_names = clean_column_names(df_raw)
-    df_processed = process_data(df_clean_names)
+    df_processed = process_data(df_raw)
 
     # Save the processed data
     PROCESSED_DATA_PATH.parent.mkdir(parents=True, exist_ok=True)
-    df_processed.to_csv(PROCESSED_DATA_PATH, index=False)
+    df_processed.to_csv(
+        PROCESSED_DATA_PATH, index=False, date_format=PROCESSED_TIMESTAMP_FORMAT
+    )
     print(f"✅ Saved {len(df_processed)} cleaned records to {PROCESSED_DATA_PATH}")
 
+    # Rollups the API loads at startup instead of rebuilding them
+    from .scoring_config import ScoringConfig  # imports this module
+
+    config = ScoringConfig()
+    print("📊 Building threat rollups...")
+    levels = build_rollups(df_processed, config.build_model().score_batch(df_processed))
+    save_rollups(
+        levels, rollup_dir(PROCESSED_DATA_PATH), len(df_processed), config.version
+    )
+    print(f"✅ Saved {len(levels)} rollup levels to {rollup_dir(PROCESSED_DATA_PATH)}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,218 @@
+"""
+ingest.py
+
+Purpose:
+--------
+Live ingest path for readings pushed by field gateways.
+
+- `ReadingIn` is the compact per-reading schema accepted by POST /readings.
+- `WriteBehindBuffer` queues scored readings in memory and flushes them to
+  the processed store in micro-batches on a background task, so request
+  handlers never wait on disk I/O.
+- `LiveFeed` keeps the latest reading per location and fans new readings
+  out to every open SSE subscriber.
+"""
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from datetime import datetime, UTC
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from .data_prep import PROCESSED_DTYPES, TIMESTAMP_COL, UNKNOWN_LOCATION
+
+# Micro-batch flush triggers
+FLUSH_MAX_ROWS = 5000
+FLUSH_INTERVAL_S = 1.0
+# Readings held in memory before POST /readings starts rejecting (backpressure)
+MAX_PENDING_ROWS = 200_000
+# Per-subscriber queue; a slow SSE client loses its oldest events, not ours
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class ReadingIn(BaseModel):
+    location_id: str = Field(
+        UNKNOWN_LOCATION, max_length=64, json_schema_extra={"example": "PORBANDAR"}
+    )
+    measurement_timestamp: Optional[datetime] = Field(
+        None, description="When the reading was taken; defaults to arrival time."
+    )
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    air_temperature: Optional[float] = None
+    humidity: Optional[float] = None
+    rain_intensity: Optional[float] = None
+    wind_speed: Optional[float] = None
+    maximum_wind_speed: Optional[float] = None
+    barometric_pressure: Optional[float] = None
+
+
+def to_stored_timestamp(
+    ts: Optional[datetime], default: Optional[datetime] = None
+) -> datetime:
+    """Naive UTC, matching the processed dataset's timestamp column."""
+    if ts is None:
+        ts = default or datetime.now(UTC)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(UTC).replace(tzinfo=None)
+    return ts
+
+
+class WriteBehindBuffer:
+    """
+    In-memory buffer flushed to the store in size- or time-triggered batches.
+
+    `add()` is cheap and never touches disk. `run()` is the background flush
+    loop; it hands each batch to `write` on a worker thread. `flush()` can
+    also be called directly (e.g. on shutdown or in tests).
+    """
+
+    def __init__(
+        self,
+        write: Callable[[pd.DataFrame], None],
+        max_rows: int = FLUSH_MAX_ROWS,
+        interval_s: float = FLUSH_INTERVAL_S,
+        max_pending: int = MAX_PENDING_ROWS,
+    ):
+        self.write = write
+        self.max_rows = max_rows
+        self.interval_s = interval_s
+        self.max_pending = max_pending
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self.flushed_rows = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def has_room(self, n: int) -> bool:
+        return len(self._pending) + n <= self.max_pending
+
+    def add(self, rows: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._pending.extend(rows)
+            full = len(self._pending) >= self.max_rows
+        if full and self._wakeup is not None:
+            self._wakeup.set()
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Hold off flushes (waiting for one in progress) while the block runs."""
+        with self._flush_lock:
+            yield
+
+    def flush(self) -> int:
+        """Write everything pending as one batch; returns the rows written."""
+        # Only one batch may be written at a time, so appends stay ordered
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                df = pd.DataFrame.from_records(batch)
+                self.write(
+                    df.astype({c: t for c, t in PROCESSED_DTYPES.items() if c in df})
+                )
+            except Exception:
+                # Put the batch back in front; backpressure kicks in if the
+                # store keeps failing
+                with self._lock:
+                    self._pending[:0] = batch
+                raise
+            self.flushed_rows += len(batch)
+            return len(batch)
+
+    async def run(self) -> None:
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.interval_s)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                try:
+                    await asyncio.to_thread(self.flush)
+                except Exception as e:
+                    print(f"❌ Failed to flush ingested readings, will retry: {e}")
+        finally:
+            self._wakeup = None
+
+
+class LiveFeed:
+    """Latest reading per location, plus fan-out to stream subscribers."""
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.latest: Dict[str, Tuple[Dict[str, Any], dict]] = {}
+        self.last_location: Optional[str] = None
+        self._subscribers: List[asyncio.Queue] = []
+
+    def publish_batch(self, events: List[Tuple[str, Dict[str, Any], dict]]) -> None:
+        """
+        Record scored readings and notify subscribers.
+
+        Subscribers get only the newest reading per location in the batch,
+        so a large gateway batch costs one event per station, not per row.
+        Must be called from the event loop.
+        """
+        newest: Dict[str, Tuple[str, Dict[str, Any], dict]] = {}
+        for location_id, reading, result in events:
+            current = newest.get(location_id)
+            if current is None or reading[TIMESTAMP_COL] >= current[1][TIMESTAMP_COL]:
+                newest[location_id] = (location_id, reading, result)
+
+        for location_id, reading, result in newest.values():
+            previous = self.latest.get(location_id)
+            if previous is None or reading[TIMESTAMP_COL] >= previous[0][TIMESTAMP_COL]:
+                self.latest[location_id] = (reading, result)
+                self.last_location = location_id
+            for queue in self._subscribers:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait((location_id, reading, result))
+
+    def seed(self, events: List[Tuple[str, Dict[str, Any], dict]]) -> None:
+        """
+        Load stored latest readings at startup, without notifying anyone.
+
+        Until a live reading arrives, the station with the newest stored
+        reading is the default location.
+        """
+        for location_id, reading, result in events:
+            previous = self.latest.get(location_id)
+            if previous is None or reading[TIMESTAMP_COL] >= previous[0][TIMESTAMP_COL]:
+                self.latest[location_id] = (reading, result)
+        if self.last_location is None and self.latest:
+            self.last_location = max(
+                self.latest, key=lambda loc: self.latest[loc][0][TIMESTAMP_COL]
+            )
+
+    def get_latest(
+        self, location_id: Optional[str] = None
+    ) -> Optional[Tuple[str, Dict[str, Any], dict]]:
+        location_id = location_id or self.last_location
+        if location_id not in self.latest:
+            return None
+        reading, result = self.latest[location_id]
+        return location_id, reading, result
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue]:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.append(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.remove(queue)
+
+    def clear(self) -> None:
+        self.latest.clear()
+        self.last_location = None
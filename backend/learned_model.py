@@ -0,0 +1,363 @@
+"""
+learned_model.py
+
+Purpose:
+--------
+A lightweight learned alternative to the rule-based threat model.
+
+- `label_storm_episodes()` derives training labels from the processed
+  history: a storm episode is a sustained run of readings where several
+  storm indicators (gusts, rain, low pressure) pass their Warning
+  thresholds at once. Readings inside an episode, or up to `lead` before
+  it starts, are labelled 1.
+- `train_logistic()` fits an L2-regularized logistic regression on the
+  measurements with NumPy (Newton/IRLS), offline.
+- `LogisticThreatModel` implements the `ThreatModel` interface. The storm
+  probability is reported as a 0–100 score. Inference is pure NumPy and
+  batched; artifacts are a directory holding `params.npy` and `model.json`,
+  loaded once per process by `load_model()` (and again if the artifact is
+  retrained in place). The per-parameter levels in `score()` explain the
+  score against the active scoring config's thresholds.
+
+Usage:
+------
+    python -m backend.learned_model --data backend/data/processed/cleaned_weather.csv \\
+        --out backend/models/storm_logistic
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+from datetime import datetime, UTC
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import THRESHOLDS
+from .data_prep import PROCESSED_SCHEMA, TIMESTAMP_COL, read_processed
+from .threat_model import (
+    RuleThreatModel,
+    ThreatModel,
+    calculate_parameter_score,
+    score_to_level,
+)
+
+FEATURES = list(PROCESSED_SCHEMA)
+PARAMS_FILE = "params.npy"
+META_FILE = "model.json"
+
+# A reading is stormy when at least MIN_STORM_INDICATORS of these pass
+# their Warning threshold. Pressure is stormy when it is *below* it.
+STORM_INDICATORS = {
+    "maximum_wind_speed": lambda v: v >= THRESHOLDS["maximum_wind_speed"][1],
+    "rain_intensity": lambda v: v >= THRESHOLDS["rain_intensity"][1],
+    "barometric_pressure": lambda v: v <= THRESHOLDS["barometric_pressure"][1],
+}
+MIN_STORM_INDICATORS = 2
+
+
+# --- Labels ---
+def stormy_readings(df: pd.DataFrame, min_indicators: int = MIN_STORM_INDICATORS):
+    """Boolean array: readings where enough storm indicators fire at once."""
+    hits = np.zeros(len(df), dtype=np.int8)
+    for col, fires in STORM_INDICATORS.items():
+        if col in df:
+            hits += fires(df[col].to_numpy(dtype=np.float64))
+    return hits >= min_indicators
+
+
+def label_storm_episodes(
+    df: pd.DataFrame,
+    merge_gap: str = "1h",
+    min_duration: str = "30min",
+    lead: str = "3h",
+    min_indicators: int = MIN_STORM_INDICATORS,
+) -> np.ndarray:
+    """
+    Label each reading 1 if it falls in a storm episode or its lead-up.
+
+    Stormy readings of one location less than `merge_gap` apart form an
+    episode; episodes shorter than `min_duration` are dropped as noise.
+    Labels are returned as int8, aligned with the rows of `df`.
+    """
+    labels = np.zeros(len(df), dtype=np.int8)
+    stormy = stormy_readings(df, min_indicators)
+    stamps = pd.to_datetime(df[TIMESTAMP_COL]).to_numpy("datetime64[ns]")
+    merge_gap, min_duration, lead = (
+        pd.Timedelta(x).to_timedelta64() for x in (merge_gap, min_duration, lead)
+    )
+
+    if "location_id" in df:
+        groups = pd.Series(np.arange(len(df))).groupby(
+            df["location_id"].fillna("").to_numpy(), sort=False
+        )
+        group_rows = [rows.to_numpy() for _, rows in groups]
+    else:
+        group_rows = [np.arange(len(df))]
+
+    for rows in group_rows:
+        rows = rows[np.argsort(stamps[rows], kind="stable")]
+        ts = stamps[rows]
+        storm_ts = ts[stormy[rows]]
+        if storm_ts.size == 0:
+            continue
+
+        # Split the stormy readings into episodes at gaps > merge_gap
+        breaks = np.flatnonzero(np.diff(storm_ts) > merge_gap) + 1
+        starts = storm_ts[np.r_[0, breaks]]
+        ends = storm_ts[np.r_[breaks - 1, storm_ts.size - 1]]
+        keep = ends - starts >= min_duration
+        starts, ends = starts[keep] - lead, ends[keep]
+
+        # Mark [start - lead, end] with a +1/-1 difference array
+        marks = np.zeros(ts.size + 1, dtype=np.int32)
+        np.add.at(marks, np.searchsorted(ts, starts, side="left"), 1)
+        np.add.at(marks, np.searchsorted(ts, ends, side="right"), -1)
+        labels[rows] = np.cumsum(marks[:-1]) > 0
+    return labels
+
+
+# --- Model ---
+def _feature_matrix(readings) -> np.ndarray:
+    """(rows, FEATURES) float64 matrix; absent columns are all-NaN."""
+    if isinstance(readings, pd.DataFrame):
+        n = len(readings)
+    else:
+        n = len(np.asarray(next(iter(readings.values()))))
+    X = np.full((n, len(FEATURES)), np.nan)
+    for j, col in enumerate(FEATURES):
+        if col in readings:
+            X[:, j] = np.asarray(readings[col], dtype=np.float64)
+    return X
+
+
+class LogisticThreatModel(ThreatModel):
+    """
+    Logistic regression over the standardized measurements.
+
+    Missing measurements are imputed with the training mean, i.e. they add
+    nothing to the logit. `thresholds` only drive the per-parameter levels
+    reported by `score()`; they do not affect the score itself.
+    """
+
+    name = "logistic"
+
+    def __init__(
+        self,
+        mean: np.ndarray,
+        scale: np.ndarray,
+        coef: np.ndarray,
+        intercept: float,
+        meta: Optional[Dict[str, Any]] = None,
+        thresholds: Mapping[str, list] = THRESHOLDS,
+    ):
+        self.mean = mean
+        self.scale = scale
+        self.coef = coef
+        self.intercept = float(intercept)
+        self.meta = meta or {}
+        self.thresholds = thresholds
+        self.version = self.meta.get("version", "dev")
+        # Standardization folded into the weights: logit = x @ w + b
+        self._weights = np.asarray(coef / scale, dtype=np.float64)
+        self._bias = self.intercept - float(np.sum(mean * self._weights))
+
+    # --- Inference ---
+    def _scores(self, X: np.ndarray) -> np.ndarray:
+        # A NaN feature gets the training mean, whose contribution is in _bias
+        missing = np.isnan(X)
+        if missing.any():
+            X = np.where(missing, self.mean, X)
+        logit = X @ self._weights + self._bias
+        return np.round(100.0 / (1.0 + np.exp(-logit)), 2)
+
+    def score_batch(self, readings) -> np.ndarray:
+        return self._scores(_feature_matrix(readings))
+
+    def score(self, reading: Mapping[str, Any]) -> Dict[str, Any]:
+        values = [reading.get(col) for col in FEATURES]
+        x = np.array([[np.nan if v is None else v for v in values]], dtype=np.float64)
+        score = float(self._scores(x)[0])
+        # Per-parameter rule levels keep the response explainable
+        parameters = {
+            param: calculate_parameter_score(reading.get(param), thresholds)
+            for param, thresholds in self.thresholds.items()
+        }
+        return {
+            "score": score,
+            "level": score_to_level(score),
+            "parameters": parameters,
+        }
+
+    def with_thresholds(self, thresholds: Mapping[str, list]) -> "LogisticThreatModel":
+        """The same model, explaining its scores against `thresholds`."""
+        model = copy.copy(self)
+        model.thresholds = thresholds
+        return model
+
+    # --- Artifacts ---
+    def save(self, directory) -> Path:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so a concurrent load never reads a partial file
+        tmp = directory / f".{PARAMS_FILE}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.stack([self.mean, self.scale, self.coef]))
+        os.replace(tmp, directory / PARAMS_FILE)
+        meta = {
+            **self.meta,
+            "model": self.name,
+            "features": FEATURES,
+            "intercept": self.intercept,
+        }
+        (directory / META_FILE).write_text(json.dumps(meta, indent=2))
+        return directory
+
+    @classmethod
+    def load(cls, directory) -> "LogisticThreatModel":
+        directory = Path(directory)
+        meta = json.loads((directory / META_FILE).read_text())
+        if meta.get("features") != FEATURES:
+            raise ValueError(
+                f"Model at {directory} was trained on {meta.get('features')}, "
+                f"expected {FEATURES}."
+            )
+        mean, scale, coef = np.load(directory / PARAMS_FILE)
+        return cls(mean, scale, coef, meta["intercept"], meta)
+
+
+def artifact_digest(directory) -> str:
+    """Content hash of a model artifact; changes whenever it is retrained."""
+    digest = hashlib.sha256()
+    for name in (META_FILE, PARAMS_FILE):
+        digest.update((Path(directory) / name).read_bytes())
+    return digest.hexdigest()[:12]
+
+
+@lru_cache(maxsize=8)
+def _load_model(directory: str, digest: str) -> LogisticThreatModel:
+    return LogisticThreatModel.load(directory)
+
+
+def load_model(directory: str) -> LogisticThreatModel:
+    """
+    Load a model artifact once per process.
+
+    The cache is keyed by the artifact's content as well as its path, so a
+    model retrained in place is loaded again instead of served stale.
+    """
+    directory = str(Path(directory).resolve())
+    return _load_model(directory, artifact_digest(directory))
+
+
+def load_threat_model(spec: str) -> ThreatModel:
+    """'rules' for the rule table, otherwise a learned-model artifact directory."""
+    if spec == RuleThreatModel.name:
+        return RuleThreatModel()
+    return load_model(spec)
+
+
+# --- Training ---
+def train_logistic(
+    df: pd.DataFrame,
+    labels: np.ndarray,
+    l2: float = 1e-2,
+    iterations: int = 25,
+    balanced: bool = True,
+) -> LogisticThreatModel:
+    """
+    Fit the logistic model with Newton's method (IRLS).
+
+    `balanced` weights storm and calm readings equally, since storms are a
+    small fraction of any history.
+    """
+    X = _feature_matrix(df)
+    y = np.asarray(labels, dtype=np.float64)
+    mean = np.nanmean(X, axis=0)
+    scale = np.nanstd(X, axis=0)
+    # Constant or all-missing features carry no signal
+    mean = np.nan_to_num(mean)
+    scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+
+    Z = np.nan_to_num((X - mean) / scale)
+    Z = np.hstack([Z, np.ones((len(Z), 1))])
+
+    weights = np.ones(len(y))
+    positives = y.sum()
+    if balanced and 0 < positives < len(y):
+        weights = np.where(
+            y == 1, len(y) / (2 * positives), len(y) / (2 * (len(y) - positives))
+        )
+
+    penalty = np.full(Z.shape[1], l2 * len(y))
+    penalty[-1] = 0.0  # the intercept is not regularized
+    theta = np.zeros(Z.shape[1])
+    for _ in range(iterations):
+        p = 1.0 / (1.0 + np.exp(-(Z @ theta)))
+        gradient = Z.T @ (weights * (p - y)) + penalty * theta
+        hessian = (Z * (weights * p * (1 - p))[:, None]).T @ Z + np.diag(penalty)
+        step = np.linalg.solve(hessian, gradient)
+        theta -= step
+        if np.max(np.abs(step)) < 1e-8:
+            break
+
+    meta = {
+        "version": datetime.now(UTC).strftime("%Y%m%d%H%M%S"),
+        "trained_rows": int(len(y)),
+        "positive_rows": int(positives),
+        "l2": l2,
+    }
+    return LogisticThreatModel(mean, scale, theta[:-1], theta[-1], meta)
+
+
+def evaluate(model: ThreatModel, df: pd.DataFrame, labels: np.ndarray) -> dict:
+    """Precision/recall of `score >= 50` (Warning or worse) against labels."""
+    predicted = model.score_batch(df) >= 50
+    actual = np.asarray(labels, dtype=bool)
+    tp = int(np.sum(predicted & actual))
+    return {
+        "rows": int(len(actual)),
+        "accuracy": round(float(np.mean(predicted == actual)), 4),
+        "precision": round(tp / max(int(predicted.sum()), 1), 4),
+        "recall": round(tp / max(int(actual.sum()), 1), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the storm logistic model.")
+    parser.add_argument("--data", required=True, help="Processed CSV to train on.")
+    parser.add_argument("--out", required=True, help="Artifact directory to write.")
+    parser.add_argument(
+        "--lead", default="3h", help="Label readings this long before a storm."
+    )
+    parser.add_argument(
+        "--holdout", type=float, default=0.2, help="Latest fraction held out."
+    )
+    parser.add_argument("--l2", type=float, default=1e-2)
+    args = parser.parse_args()
+
+    df = read_processed(args.data).sort_values(TIMESTAMP_COL, kind="stable")
+    labels = label_storm_episodes(df, lead=args.lead)
+    print(f"🔄 {len(df)} readings, {int(labels.sum())} labelled as storm")
+
+    # Hold out the most recent readings: the model is used on the future
+    split = int(len(df) * (1 - args.holdout))
+    model = train_logistic(df.iloc[:split], labels[:split], l2=args.l2)
+    model.meta["lead"] = args.lead
+    if split < len(df):
+        model.meta["holdout"] = evaluate(model, df.iloc[split:], labels[split:])
+        baseline = evaluate(RuleThreatModel(), df.iloc[split:], labels[split:])
+        print(f"Holdout (logistic): {model.meta['holdout']}")
+        print(f"Holdout (rules):    {baseline}")
+
+    path = model.save(args.out)
+    print(f"✅ Model saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""
+notify.py
+
+Purpose:
+--------
+Asynchronous alert dispatch for Warning/Danger readings.
+
+Scoring code hands scored readings to `NotificationDispatcher.submit()`,
+which only filters them and drops them on a bounded queue; it never waits
+on a sink. A background task (`run()`) then:
+
+- fans each alert out to the destinations (routes) that want it,
+- coalesces pending alerts per destination to one per location, so a
+  station stuck in Danger sends one alert per batch, not one per reading,
+- sends each destination's batch through its sink, within a per-
+  destination token-bucket rate limit and a global concurrency cap,
+- retries failed batches with exponential backoff, and after
+  `max_attempts` appends them to a JSON-lines dead-letter file.
+
+On shutdown, in-flight sends get `shutdown_grace_s` to finish; batches
+still in flight after that, and alerts never sent, are dead-lettered too.
+
+Sinks are pluggable: `FileSink` appends JSON lines (the local stand-in),
+`HttpSink` POSTs the batch as JSON to the destination URL.
+
+Routes are loaded from a JSON file (`load_routes`), a list like:
+    [{"id": "ops", "sink": "http", "address": "http://...", "min_level": "Warning",
+      "locations": ["PORBANDAR"], "rate_per_min": 30}]
+"""
+
+import asyncio
+import json
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .config import THREAT_LABELS
+from .data_prep import TIMESTAMP_COL
+
+# Readings at or above this level raise an alert
+ALERT_MIN_LEVEL = "Warning"
+# Alerts held between scoring and fan-out; oldest are dropped when full
+ALERT_QUEUE_SIZE = 10_000
+# How long alerts for one destination are collected before a send
+BATCH_INTERVAL_S = 1.0
+# Largest batch handed to a sink in one call
+MAX_BATCH_SIZE = 500
+# Concurrent sink calls across all destinations
+MAX_CONCURRENT_SENDS = 64
+# Default per-destination rate limit (batches per minute) and burst
+RATE_PER_MIN = 60
+RATE_BURST = 5
+# Retry schedule: BACKOFF_BASE_S * 2**attempt (with jitter), capped
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_S = 1.0
+BACKOFF_MAX_S = 300.0
+# How long shutdown waits for in-flight sends before cancelling them
+SHUTDOWN_GRACE_S = 2.0
+
+LEVEL_RANK = {label: rank for rank, label in THREAT_LABELS.items()}
+
+
+class SinkError(Exception):
+    """A sink failed to deliver a batch; the dispatcher will retry it."""
+
+
+# --- Sinks ---
+class Sink(ABC):
+    """Delivers a batch of alerts to one destination address."""
+
+    name = "base"
+
+    @abstractmethod
+    async def send(self, address: str, alerts: List[Dict[str, Any]]) -> None: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class FileSink(Sink):
+    """Appends each batch as JSON lines to the file at `address`."""
+
+    name = "file"
+
+    async def send(self, address: str, alerts: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(alert, default=str) + "\n" for alert in alerts)
+        try:
+            await asyncio.to_thread(_append_text, Path(address), lines)
+        except OSError as e:
+            raise SinkError(str(e)) from e
+
+
+class HttpSink(Sink):
+    """POSTs each batch as {"alerts": [...]} to the URL at `address`."""
+
+    name = "http"
+
+    def __init__(self, timeout_s: float = 5.0):
+        import httpx
+
+        self._client = httpx.AsyncClient(timeout=timeout_s)
+
+    async def send(self, address: str, alerts: List[Dict[str, Any]]) -> None:
+        import httpx
+
+        payload = json.dumps({"alerts": alerts}, default=str)
+        try:
+            response = await self._client.post(
+                address, content=payload, headers={"Content-Type": "application/json"}
+            )
+        except httpx.HTTPError as e:
+            raise SinkError(f"{type(e).__name__}: {e}") from e
+        if response.status_code >= 400:
+            raise SinkError(f"HTTP {response.status_code} from {address}")
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def _append_text(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+# --- Routes ---
+def load_routes(path) -> List[Dict[str, Any]]:
+    """Read and validate the route list from a JSON file."""
+    routes = json.loads(Path(path).read_text())
+    seen = set()
+    for route in routes:
+        missing = {"id", "sink", "address"} - set(route)
+        if missing:
+            raise ValueError(f"Route {route} is missing {sorted(missing)}")
+        if route["id"] in seen:
+            raise ValueError(f"Duplicate route id '{route['id']}'")
+        if route.get("min_level", ALERT_MIN_LEVEL) not in LEVEL_RANK:
+            raise ValueError(f"Unknown min_level in route '{route['id']}'")
+        seen.add(route["id"])
+    return routes
+
+
+class _Destination:
+    """Pending alerts, rate limit and retry state of one route."""
+
+    def __init__(self, route: Dict[str, Any]):
+        self.route = route
+        self.id = route["id"]
+        self.rate_per_s = route.get("rate_per_min", RATE_PER_MIN) / 60.0
+        self.burst = route.get("burst", RATE_BURST)
+        self.tokens = float(self.burst)
+        self.refilled_at = time.monotonic()
+        # location_id -> newest alert; the coalescing happens here
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.first_pending_at: Optional[float] = None
+        self.in_flight = False
+        self.attempts = 0
+        self.retry_at = 0.0
+
+    def add(self, alert: Dict[str, Any], now: float) -> None:
+        previous = self.pending.get(alert["location_id"])
+        if previous is not None:
+            alert = {
+                **alert,
+                "coalesced": previous.get("coalesced", 1) + alert.get("coalesced", 1),
+                "peak_score": max(previous["peak_score"], alert["peak_score"]),
+            }
+        self.pending[alert["location_id"]] = alert
+        if self.first_pending_at is None:
+            self.first_pending_at = now
+
+    def take_token(self, now: float) -> bool:
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.refilled_at) * self.rate_per_s
+        )
+        self.refilled_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class NotificationDispatcher:
+    """
+    Bounded-queue alert dispatcher; see the module docstring.
+
+    `submit()` must be called from the event loop that runs `run()`.
+    """
+
+    def __init__(
+        self,
+        routes: List[Dict[str, Any]],
+        sinks: Dict[str, Sink],
+        dead_letter_path=None,
+        queue_size: int = ALERT_QUEUE_SIZE,
+        batch_interval_s: float = BATCH_INTERVAL_S,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_concurrent_sends: int = MAX_CONCURRENT_SENDS,
+        max_attempts: int = MAX_ATTEMPTS,
+        backoff_base_s: float = BACKOFF_BASE_S,
+        backoff_max_s: float = BACKOFF_MAX_S,
+        shutdown_grace_s: float = SHUTDOWN_GRACE_S,
+    ):
+        for route in routes:
+            if route["sink"] not in sinks:
+                raise ValueError(f"Route '{route['id']}' uses unknown sink")
+        self.sinks = sinks
+        self.dead_letter_path = Path(dead_letter_path) if dead_letter_path else None
+        self.queue_size = queue_size
+        self.batch_interval_s = batch_interval_s
+        self.max_batch_size = max_batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.shutdown_grace_s = shutdown_grace_s
+        self._send_slots = asyncio.Semaphore(max_concurrent_sends)
+
+        self.destinations = {route["id"]: _Destination(route) for route in routes}
+        # Routing table: location -> destinations; "*" matches every location
+        self._by_location: Dict[str, List[_Destination]] = defaultdict(list)
+        for dest in self.destinations.values():
+            for location_id in dest.route.get("locations") or ["*"]:
+                self._by_location[location_id].append(dest)
+        self._min_rank = min(
+            (
+                LEVEL_RANK[d.route.get("min_level", ALERT_MIN_LEVEL)]
+                for d in self.destinations.values()
+            ),
+            default=len(THREAT_LABELS),
+        )
+
+        # deque(maxlen) drops the oldest alert by itself when full
+        self._queue: Deque[Dict[str, Any]] = deque(maxlen=queue_size)
+        self._running = False
+        self._sends: set = set()
+        self.stats = defaultdict(int)
+
+    # --- Producer side (scoring path) ---
+    def submit(self, events: List[Tuple[str, Dict[str, Any], dict]]) -> int:
+        """
+        Queue alerts for scored readings at or above the lowest route level.
+
+        Never blocks: when the queue is full the oldest alert is dropped.
+        Returns the number of alerts queued.
+        """
+        if not self._running:
+            return 0
+        queued = 0
+        for location_id, reading, result in events:
+            rank = LEVEL_RANK.get(result["level"], 0)
+            if rank < self._min_rank:
+                continue
+            if len(self._queue) == self.queue_size:
+                self.stats["dropped"] += 1
+            self._queue.append(
+                {
+                    "location_id": location_id,
+                    "level": result["level"],
+                    "score": result["score"],
+                    "peak_score": result["score"],
+                    "parameters": result["parameters"],
+                    TIMESTAMP_COL: reading.get(TIMESTAMP_COL),
+                    "raised_at": datetime.now(UTC).isoformat(),
+                }
+            )
+            queued += 1
+        self.stats["queued"] += queued
+        return queued
+
+    # --- Consumer side (background task) ---
+    def _route(self, alert: Dict[str, Any], now: float) -> None:
+        rank = LEVEL_RANK[alert["level"]]
+        for dest in self._by_location.get(
+            alert["location_id"], []
+        ) + self._by_location.get("*", []):
+            if rank >= LEVEL_RANK[dest.route.get("min_level", ALERT_MIN_LEVEL)]:
+                dest.add(alert, now)
+
+    def _due(self, now: float) -> List[_Destination]:
+        due = []
+        for dest in self.destinations.values():
+            if not dest.pending or dest.in_flight or now < dest.retry_at:
+                continue
+            if now - dest.first_pending_at < self.batch_interval_s:
+                continue
+            if not dest.take_token(now):
+                self.stats["rate_limited"] += 1
+                continue
+            due.append(dest)
+        return due
+
+    async def _send(self, dest: _Destination, batch: List[Dict[str, Any]]) -> None:
+        sink = self.sinks[dest.route["sink"]]
+        try:
+            async with self._send_slots:
+                await sink.send(dest.route["address"], batch)
+        except asyncio.CancelledError:
+            # Shutdown stopped waiting for this send: keep the batch on disk
+            self.stats["cancelled_sends"] += 1
+            self.stats["dead_letters"] += len(batch)
+            await self._dead_letter(dest, batch, "send cancelled at shutdown")
+            raise
+        except Exception as e:
+            dest.attempts += 1
+            if dest.attempts >= self.max_attempts:
+                self.stats["dead_letters"] += len(batch)
+                await self._dead_letter(dest, batch, e)
+                dest.attempts = 0
+            else:
+                self.stats["retries"] += 1
+                # Put the batch back under newer alerts for the same stations
+                now = time.monotonic()
+                for alert in batch:
+                    if alert["location_id"] not in dest.pending:
+                        dest.pending[alert["location_id"]] = alert
+                dest.first_pending_at = dest.first_pending_at or now
+                delay = min(
+                    self.backoff_max_s, self.backoff_base_s * 2 ** (dest.attempts - 1)
+                )
+                dest.retry_at = now + delay * random.uniform(0.8, 1.2)
+        else:
+            dest.attempts = 0
+            self.stats["sent_batches"] += 1
+            self.stats["sent_alerts"] += len(batch)
+        finally:
+            dest.in_flight = False
+
+    async def _dead_letter(self, dest: _Destination, batch, error) -> None:
+        print(f"❌ {len(batch)} alerts for '{dest.id}' not delivered: {error}")
+        if self.dead_letter_path is None:
+            return
+        record = {
+            "route": dest.id,
+            "address": dest.route["address"],
+            "error": str(error),
+            "failed_at": datetime.now(UTC).isoformat(),
+            "alerts": batch,
+        }
+        try:
+            await asyncio.to_thread(
+                _append_text,
+                self.dead_letter_path,
+                json.dumps(record, default=str) + "\n",
+            )
+        except OSError as e:
+            print(f"❌ Could not persist dead letters: {e}")
+
+    def _dispatch_due(self, now: float) -> None:
+        for dest in self._due(now):
+            alerts = sorted(
+                dest.pending.values(), key=lambda a: -LEVEL_RANK[a["level"]]
+            )
+            batch = alerts[: self.max_batch_size]
+            dest.pending = {a["location_id"]: a for a in alerts[self.max_batch_size :]}
+            dest.first_pending_at = now if dest.pending else None
+            dest.in_flight = True
+            task = asyncio.create_task(self._send(dest, batch))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    async def run(self, tick_s: Optional[float] = None) -> None:
+        """Route, batch and send alerts until cancelled."""
+        # Polling on a short tick keeps submit() a plain deque append, with
+        # no wakeup to schedule; batching adds far more delay than the tick
+        tick_s = tick_s or min(0.25, max(0.01, self.batch_interval_s))
+        self._running = True
+        try:
+            while True:
+                await asyncio.sleep(tick_s)
+                self._drain(time.monotonic())
+                self._dispatch_due(time.monotonic())
+        finally:
+            self._running = False
+            self._drain(time.monotonic())
+            await self._shutdown()
+
+    def _drain(self, now: float) -> None:
+        while self._queue:
+            self._route(self._queue.popleft(), now)
+
+    async def _shutdown(self) -> None:
+        # Let in-flight sends finish until the deadline; the ones cancelled
+        # after it dead-letter their own batch, as does anything still pending
+        if self._sends:
+            await asyncio.wait(list(self._sends), timeout=self.shutdown_grace_s)
+        for task in list(self._sends):
+            task.cancel()
+        await asyncio.gather(*self._sends, return_exceptions=True)
+        for dest in self.destinations.values():
+            if dest.pending:
+                batch = list(dest.pending.values())
+                dest.pending = {}
+                self.stats["dead_letters"] += len(batch)
+                await self._dead_letter(dest, batch, "undelivered at shutdown")
+
+    async def close(self) -> None:
+        for sink in self.sinks.values():
+            await sink.close()
@@ -0,0 +1,387 @@
+"""
+nowcast.py
+
+Purpose:
+--------
+Short-range threat nowcasts from the recent trend of each station.
+
+- `Nowcaster` keeps, per station, a sliding-window least-squares line for
+  every parameter. The window holds the readings of the last
+  `NOWCAST_WINDOW_H` hours (at most `NOWCAST_MAX_POINTS` of them), and the
+  fit is kept as running sums (n, sum t, sum y, sum t^2, sum t*y). Adding a
+  reading or evicting an old one is O(1), and so is a projection, whatever
+  the window length.
+- `project_history()` computes the same windowed fits for every row of a
+  stored history at once, and `backtest()` scores the projections against
+  the readings that actually arrived 1-3 hours later.
+
+A projection evaluates the fitted line `horizon` hours after the newest
+reading and clips it to the physical range of the parameter. Parameters
+with too few points (or no time spread) in the window persist their last
+value. The projected reading is then scored like any other reading.
+
+Usage (backtest):
+-----------------
+    python -m backend.nowcast --data backend/data/processed/cleaned_weather.csv
+"""
+
+import argparse
+import json
+import math
+import time
+from collections import deque
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_prep import (
+    PROCESSED_SCHEMA,
+    TIMESTAMP_COL,
+    UNKNOWN_LOCATION,
+    read_processed,
+)
+from .threat_model import RuleThreatModel, ThreatModel, level_indices
+
+FEATURES = list(PROCESSED_SCHEMA)
+NOWCAST_WINDOW_H = 3.0
+NOWCAST_MAX_POINTS = 36
+# Fewer points than this and the parameter persists its last value
+NOWCAST_MIN_POINTS = 3
+NOWCAST_HORIZONS_H = (1.0, 2.0, 3.0)
+NOWCAST_MAX_HORIZON_H = 6.0
+# Backtest: a forecast is checked against the first reading this close
+# after its valid time
+BACKTEST_TOLERANCE_H = 0.25
+BACKTEST_CHUNK_ROWS = 20_000
+# Projections are clipped to these (lower, upper) limits
+PHYSICAL_BOUNDS = {
+    "humidity": (0.0, 100.0),
+    "rain_intensity": (0.0, None),
+    "wind_speed": (0.0, None),
+    "maximum_wind_speed": (0.0, None),
+}
+_NS_PER_HOUR = 3_600_000_000_000
+
+
+def _bounds(params: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    lower, upper = [], []
+    for param in params:
+        lo, hi = PHYSICAL_BOUNDS.get(param, (None, None))
+        lower.append(-np.inf if lo is None else lo)
+        upper.append(np.inf if hi is None else hi)
+    return np.array(lower), np.array(upper)
+
+
+def to_hours(ts) -> float:
+    """Naive-UTC timestamp as hours since the epoch."""
+    return pd.Timestamp(ts).value / _NS_PER_HOUR
+
+
+def _fit_project(n, st, sy, stt, sty, last, horizons):
+    """
+    Evaluate least-squares lines `horizons` hours after t=0 (the newest
+    reading); falls back to `last` where the line is undetermined.
+
+    Sums are over the window with t measured from the newest reading.
+    Works elementwise, so any broadcastable shapes will do.
+    """
+    denom = n * stt - st * st
+    fitted = (n >= NOWCAST_MIN_POINTS) & (denom > 1e-9 * np.maximum(n * stt, 1e-12))
+    slope = np.divide(n * sty - st * sy, denom, np.zeros(denom.shape), where=fitted)
+    intercept = np.where(n > 0, last, np.nan)
+    np.divide(sy - slope * st, n, intercept, where=fitted)
+    return intercept + slope * horizons, np.where(fitted, slope, np.nan)
+
+
+# --- Online Trends ---
+# Which of (valid, y) each running sum is built from: n, t, y, t^2, t*y
+_USES_Y = np.array([False, False, True, False, True])[:, None]
+
+
+class _StationTrend:
+    """Running least-squares sums over one station's recent readings."""
+
+    def __init__(self, n_params: int):
+        # Rows: n, sum t, sum y, sum t^2, sum t*y; t in hours from `origin`
+        self.sums = np.zeros((5, n_params))
+        # (t, y, terms) per reading; terms are what it added to `sums`
+        self.window: deque = deque()
+        self.origin: Optional[float] = None
+        self.newest: Optional[float] = None
+        self.newest_ts = None
+        self.last = np.full(n_params, np.nan)
+
+    def _terms(self, t: float, y: np.ndarray) -> np.ndarray:
+        valid = ~np.isnan(y)
+        t = t - self.origin
+        powers = np.array([1.0, t, 1.0, t * t, t])[:, None]
+        return powers * np.where(_USES_Y, np.where(valid, y, 0.0), valid)
+
+    def _rebase(self) -> None:
+        """Move the origin to the oldest reading and recompute the sums."""
+        self.origin = self.window[0][0]
+        self.window = deque((t, y, self._terms(t, y)) for t, y, _ in self.window)
+        self.sums = np.sum([terms for _, _, terms in self.window], axis=0)
+
+    def add(self, t: float, ts, y: np.ndarray, window_h: float, max_points: int):
+        if self.origin is None:
+            self.origin = t
+        terms = self._terms(t, y)
+        self.window.append((t, y, terms))
+        self.sums += terms
+        self.newest, self.newest_ts = t, ts
+        self.last = np.where(np.isnan(y), self.last, y)
+        while self.window[0][0] <= t - window_h or len(self.window) > max_points:
+            self.sums -= self.window.popleft()[2]
+        # Keep t small so the sums don't lose precision; amortized O(1)
+        # since it happens at most once per `window_h` of readings
+        if t - self.origin > 2 * window_h:
+            self._rebase()
+
+    def project(self, horizons: np.ndarray):
+        n, st, sy, stt, sty = self.sums
+        # Shift t so the newest reading is t=0
+        shift = self.newest - self.origin
+        sty = sty - shift * sy
+        stt = stt - 2 * shift * st + n * shift * shift
+        st = st - n * shift
+        return _fit_project(n, st, sy, stt, sty, self.last, horizons[:, None])
+
+
+class Nowcaster:
+    """
+    Per-station parameter trends, updated as readings arrive.
+
+    Not thread-safe; the app calls it from the event loop only.
+    """
+
+    def __init__(
+        self,
+        window_h: float = NOWCAST_WINDOW_H,
+        max_points: int = NOWCAST_MAX_POINTS,
+        params: Sequence[str] = FEATURES,
+    ):
+        self.window_h = window_h
+        self.max_points = max_points
+        self.params = list(params)
+        self.lower, self.upper = _bounds(self.params)
+        self.stations: Dict[str, _StationTrend] = {}
+
+    def __contains__(self, location_id: str) -> bool:
+        return location_id in self.stations
+
+    def update(self, location_id: str, reading: Mapping[str, Any]) -> bool:
+        """
+        Add one reading; returns False if it is older than the station's
+        newest reading (late readings are left out of the trend).
+        """
+        ts = reading[TIMESTAMP_COL]
+        t = to_hours(ts)
+        trend = self.stations.get(location_id)
+        if trend is None:
+            trend = self.stations[location_id] = _StationTrend(len(self.params))
+        elif t < trend.newest:
+            return False
+        # Missing parameters (None) become NaN and are left out of their fit
+        y = np.array([reading.get(p) for p in self.params], dtype=np.float64)
+        trend.add(t, ts, y, self.window_h, self.max_points)
+        return True
+
+    def seed(self, df: pd.DataFrame) -> None:
+        """Load the recent window of every station from stored history."""
+        df = _sorted_history(df)
+        if df.empty:
+            return
+        recent = df.groupby("location_id", sort=False).tail(self.max_points)
+        columns = [TIMESTAMP_COL, *self.params]
+        for location_id, rows in recent.groupby("location_id", sort=False):
+            for record in rows.reindex(columns=columns).to_dict("records"):
+                self.update(location_id, record)
+
+    def project(
+        self, location_id: str, horizons: Sequence[float] = NOWCAST_HORIZONS_H
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Projected readings `horizons` hours after the station's newest
+        reading, plus the per-hour trend of each parameter.
+        """
+        trend = self.stations.get(location_id)
+        if trend is None:
+            return None
+        horizons = np.asarray(horizons, dtype=np.float64)
+        values, slopes = trend.project(horizons)
+        values = np.clip(values, self.lower, self.upper).tolist()
+        as_of = pd.Timestamp(trend.newest_ts).to_pydatetime()
+        return {
+            "as_of": as_of,
+            "points": len(trend.window),
+            "trends": {
+                p: None if math.isnan(s) else round(s, 4)
+                for p, s in zip(self.params, slopes.tolist())
+            },
+            "projections": [
+                (
+                    h,
+                    as_of + timedelta(hours=h),
+                    {p: None if math.isnan(v) else v for p, v in zip(self.params, row)},
+                )
+                for h, row in zip(horizons.tolist(), values)
+            ],
+        }
+
+    def clear(self) -> None:
+        self.stations.clear()
+
+
+# --- Vectorized Backtest ---
+def _sorted_history(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.dropna(subset=[TIMESTAMP_COL])
+    if "location_id" not in df:
+        df = df.assign(location_id=UNKNOWN_LOCATION)
+    df = df.assign(location_id=df["location_id"].fillna(UNKNOWN_LOCATION))
+    return df.sort_values(["location_id", TIMESTAMP_COL], kind="stable").reset_index(
+        drop=True
+    )
+
+
+def project_history(
+    df: pd.DataFrame,
+    horizons: Sequence[float] = NOWCAST_HORIZONS_H,
+    window_h: float = NOWCAST_WINDOW_H,
+    max_points: int = NOWCAST_MAX_POINTS,
+    params: Sequence[str] = FEATURES,
+    chunk_rows: int = BACKTEST_CHUNK_ROWS,
+) -> np.ndarray:
+    """
+    The nowcast `Nowcaster` would have made after each row of `df`.
+
+    `df` must be sorted by location and time (see `_sorted_history`).
+    Returns an array of shape (len(horizons), len(df), len(params)).
+    Each row's window is gathered as a (rows, max_points) block of
+    indices, so the cost is O(rows * max_points), processed in chunks.
+    """
+    horizons = np.asarray(horizons, dtype=np.float64)
+    n_rows = len(df)
+    out = np.empty((len(horizons), n_rows, len(params)))
+    if n_rows == 0:
+        return out
+    t = df[TIMESTAMP_COL].to_numpy("datetime64[ns]").astype(np.int64) / _NS_PER_HOUR
+    group = pd.factorize(df["location_id"])[0]
+    values = df.reindex(columns=list(params)).to_numpy(np.float64)
+    lower, upper = _bounds(params)
+    lags = np.arange(max_points)
+
+    for start in range(0, n_rows, chunk_rows):
+        rows = np.arange(start, min(start + chunk_rows, n_rows))
+        idx = rows[:, None] - lags  # column 0 is the row itself
+        clipped = np.maximum(idx, 0)
+        dt = t[clipped] - t[rows, None]
+        in_window = (
+            (idx >= 0) & (group[clipped] == group[rows, None]) & (dt > -window_h)
+        )
+        dt = np.where(in_window, dt, 0.0)
+        # (rows, max_points, params): all parameters in one pass
+        y = values[clipped]
+        mask = in_window[:, :, None] & ~np.isnan(y)
+        weight = mask.astype(np.float64)
+        y0 = np.where(mask, y, 0.0)
+        # Newest valid value in the window; columns run newest first
+        first = np.argmax(mask, axis=1)[:, None, :]
+        last = np.take_along_axis(y, first, axis=1)[:, 0, :]
+        projected, _ = _fit_project(
+            weight.sum(axis=1),
+            np.einsum("rk,rkp->rp", dt, weight),
+            y0.sum(axis=1),
+            np.einsum("rk,rkp->rp", dt * dt, weight),
+            np.einsum("rk,rkp->rp", dt, y0),
+            last,
+            horizons[:, None, None],
+        )
+        out[:, rows] = np.clip(projected, lower, upper)
+    return out
+
+
+def backtest(
+    df: pd.DataFrame,
+    model: Optional[ThreatModel] = None,
+    horizons: Sequence[float] = NOWCAST_HORIZONS_H,
+    tolerance_h: float = BACKTEST_TOLERANCE_H,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    Replay `df`, nowcasting after every reading, and compare each forecast
+    with the first reading of the same station within `tolerance_h` after
+    its valid time.
+
+    Reports, per horizon: exact and within-one level accuracy, score MAE,
+    and the level accuracy of persistence (assuming nothing changes) as a
+    baseline. Also reports rows/s for projecting and scoring.
+    """
+    model = model or RuleThreatModel()
+    df = _sorted_history(df)
+    if df.empty:
+        return {"rows": 0}
+    start = time.perf_counter()
+    projected = project_history(df, horizons, **kwargs)
+    params = kwargs.get("params", FEATURES)
+    forecast_scores = [
+        model.score_batch(dict(zip(params, block.T))) for block in projected
+    ]
+    elapsed = time.perf_counter() - start
+
+    scores = model.score_batch(df)
+    levels = level_indices(scores)
+    t = df[TIMESTAMP_COL].to_numpy("datetime64[ns]").astype(np.int64) / _NS_PER_HOUR
+    group = pd.factorize(df["location_id"])[0]
+    # One sorted key across stations: searchsorted never crosses a station
+    t = t - t.min()
+    span = t.max() + max(horizons) + tolerance_h + 1
+    key = group * span + t
+
+    results = {"rows": len(df), "rows_per_s": round(len(df) / max(elapsed, 1e-9))}
+    for h, predicted in zip(horizons, forecast_scores):
+        target = np.searchsorted(key, key + h)
+        matched = target < len(df)
+        target = np.minimum(target, len(df) - 1)
+        matched &= (group[target] == group) & (key[target] - key - h <= tolerance_h)
+        actual, now = levels[target][matched], levels[matched]
+        forecast = level_indices(predicted)[matched]
+        results[f"{h:g}h"] = {
+            "pairs": int(matched.sum()),
+            "level_accuracy": _rate(forecast == actual),
+            "within_one_level": _rate(np.abs(forecast - actual) <= 1),
+            "score_mae": _round(np.abs(predicted[matched] - scores[target][matched])),
+            "persistence_accuracy": _rate(now == actual),
+        }
+    return results
+
+
+def _rate(hits: np.ndarray) -> Optional[float]:
+    return round(float(np.mean(hits)), 4) if len(hits) else None
+
+
+def _round(errors: np.ndarray) -> Optional[float]:
+    return round(float(np.mean(errors)), 3) if len(errors) else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest threat nowcasts.")
+    parser.add_argument("--data", required=True, help="Processed CSV to replay.")
+    parser.add_argument("--window-h", type=float, default=NOWCAST_WINDOW_H)
+    parser.add_argument("--max-points", type=int, default=NOWCAST_MAX_POINTS)
+    parser.add_argument("--json", help="Write the results to this file as JSON.")
+    args = parser.parse_args()
+
+    df = read_processed(args.data)
+    print(f"🔄 Backtesting nowcasts over {len(df)} readings...")
+    results = backtest(df, window_h=args.window_h, max_points=args.max_points)
+    print(json.dumps(results, indent=2))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+scoring_config.py
+
+Purpose:
+--------
+Runtime scoring configuration that can be changed without a redeploy.
+
+- `ScoringConfig` is the validated config: which model to run ("rules" or a
+  learned-model artifact directory) plus the rule thresholds and weights.
+  Its `version` is either given in the file or derived from the content.
+- `load_scoring_config()` reads one from a JSON file.
+- `ScoringState` holds the active config and model. A new config is not
+  swapped in right away: `rescore_history()` first rescores the stored
+  history in vectorized chunks on a thread pool (reporting progress through
+  a `RescoreJob`), and the old config keeps serving until that finishes.
+- `ConfigVersionMiddleware` stamps the active version on every response as
+  the `X-Scoring-Config-Version` header.
+
+Example file:
+    {"version": "2025-09-01", "thresholds": {"wind_speed": [12, 22, 35], ...},
+     "weights": {"wind_speed": 0.2, ...}}
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field, model_validator
+
+from .config import THRESHOLDS, WEIGHTS
+from .data_prep import PROCESSED_SCHEMA
+from .learned_model import artifact_digest, load_model
+from .threat_model import RuleThreatModel, ThreatModel
+
+# Rows per rescoring chunk; big enough to amortize NumPy call overhead
+RESCORE_CHUNK_ROWS = 250_000
+VERSION_HEADER = "X-Scoring-Config-Version"
+
+
+class ScoringConfig(BaseModel):
+    version: Optional[str] = Field(
+        None, description="Defaults to a hash of the config content."
+    )
+    model: str = Field(
+        "rules", description='"rules" or the directory of a trained model artifact.'
+    )
+    thresholds: Dict[str, List[float]] = Field(
+        default_factory=lambda: deepcopy(THRESHOLDS)
+    )
+    weights: Dict[str, float] = Field(default_factory=lambda: dict(WEIGHTS))
+
+    @model_validator(mode="after")
+    def _check(self) -> "ScoringConfig":
+        unknown = set(self.thresholds) - set(PROCESSED_SCHEMA)
+        if unknown:
+            raise ValueError(f"Unknown parameters in thresholds: {sorted(unknown)}")
+        if not self.thresholds:
+            raise ValueError("At least one parameter needs thresholds.")
+        for param, values in self.thresholds.items():
+            if len(values) != 3 or not all(math.isfinite(v) for v in values):
+                raise ValueError(f"{param}: need 3 finite thresholds, got {values}")
+            ascending = values == sorted(values)
+            if not (ascending or values == sorted(values, reverse=True)):
+                raise ValueError(f"{param}: thresholds must be monotonic, got {values}")
+        if set(self.weights) != set(self.thresholds):
+            raise ValueError("weights and thresholds must cover the same parameters.")
+        if any(not math.isfinite(w) or w < 0 for w in self.weights.values()):
+            raise ValueError("Weights must be finite and non-negative.")
+        if sum(self.weights.values()) <= 0:
+            raise ValueError("Weights must not all be zero.")
+        if self.version is None:
+            content = self.model_dump(exclude={"version"})
+            if self.model != RuleThreatModel.name:
+                # A model retrained in place is a new config version
+                try:
+                    content["artifact"] = artifact_digest(self.model)
+                except OSError as e:
+                    raise ValueError(f"Cannot read model artifact: {e}") from e
+            digest = hashlib.sha256(json.dumps(content, sort_keys=True).encode())
+            self.version = digest.hexdigest()[:12]
+        return self
+
+    def build_model(self) -> ThreatModel:
+        """Instantiate the model this config describes."""
+        if self.model == RuleThreatModel.name:
+            model = RuleThreatModel(self.thresholds, self.weights)
+            model.version = self.version
+            return model
+        # Shared cached model; the copy reports levels under these thresholds
+        return load_model(self.model).with_thresholds(self.thresholds)
+
+
+def load_scoring_config(path) -> ScoringConfig:
+    """Read and validate a config file; raises ValueError if it is invalid."""
+    return ScoringConfig.model_validate_json(Path(path).read_text())
+
+
+# --- Background Rescoring ---
+class RescoreCancelled(Exception):
+    """A newer config superseded the one being rescored."""
+
+
+class RescoreJob:
+    """Progress of rescoring the stored history under a new config."""
+
+    def __init__(self, config: ScoringConfig):
+        self.config = config
+        self.state = "pending"
+        self.total_rows = 0
+        self.done_rows = 0
+        self.error: Optional[str] = None
+        self.started_at = datetime.now(UTC)
+        self.finished_at: Optional[datetime] = None
+        self.cancelled = False
+        # Batches flushed to the store after the history snapshot was taken
+        self.late_batches: List[pd.DataFrame] = []
+
+    def finish(self, state: str, error: Optional[str] = None) -> None:
+        self.state = state
+        self.error = error
+        self.finished_at = datetime.now(UTC)
+
+    def as_dict(self) -> Dict[str, Any]:
+        progress = self.done_rows / self.total_rows if self.total_rows else 0.0
+        return {
+            "version": self.config.version,
+            "state": self.state,
+            "rows": self.total_rows,
+            "rescored_rows": self.done_rows,
+            "progress": round(1.0 if self.state == "complete" else progress, 4),
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def rescore_history(
+    df: pd.DataFrame,
+    model: ThreatModel,
+    job: Optional[RescoreJob] = None,
+    chunk_rows: int = RESCORE_CHUNK_ROWS,
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Score every row of `df` with `model.score_batch`, chunk by chunk.
+
+    Chunks run on a thread pool (NumPy releases the GIL in the heavy
+    loops). Progress is recorded on `job`; setting `job.cancelled` stops
+    the work between chunks with RescoreCancelled.
+    """
+    scores = np.empty(len(df), dtype=np.float64)
+    if job is not None:
+        job.state, job.total_rows, job.done_rows = "running", len(df), 0
+    lock = threading.Lock()
+
+    def score_chunk(start: int) -> None:
+        if job is not None and job.cancelled:
+            raise RescoreCancelled()
+        stop = min(start + chunk_rows, len(df))
+        scores[start:stop] = model.score_batch(df.iloc[start:stop])
+        if job is not None:
+            with lock:
+                job.done_rows += stop - start
+
+    workers = workers or min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(score_chunk, s) for s in range(0, len(df), chunk_rows)]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return scores
+
+
+class ScoringState:
+    """
+    The active scoring config and model, plus any rescore in progress.
+
+    `lock` serializes the swap with anything that must see a consistent
+    (model, cached scores) pair, e.g. updating the rollups after a flush.
+    """
+
+    def __init__(self, config: ScoringConfig):
+        # One tuple, so readers never see a config paired with another model
+        self._active = (config, config.build_model())
+        self.job: Optional[RescoreJob] = None
+        self.lock = threading.Lock()
+
+    @property
+    def config(self) -> ScoringConfig:
+        return self._active[0]
+
+    @property
+    def model(self) -> ThreatModel:
+        return self._active[1]
+
+    @property
+    def version(self) -> str:
+        return self._active[0].version
+
+    def start_job(self, config: ScoringConfig) -> RescoreJob:
+        """Supersede any running rescore with one for `config`."""
+        if self.job is not None and self.job.state in ("pending", "running"):
+            self.job.cancelled = True
+        self.job = RescoreJob(config)
+        return self.job
+
+    def swap(self, config: ScoringConfig, model: ThreatModel) -> None:
+        self._active = (config, model)
+
+
+class ConfigVersionMiddleware:
+    """ASGI middleware adding the active config version to every response."""
+
+    def __init__(self, app, get_version: Callable[[], str]):
+        self.app = app
+        self.get_version = get_version
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_with_version(message):
+            if message["type"] == "http.response.start":
+                header = (VERSION_HEADER.lower().encode(), self.get_version().encode())
+                message["headers"] = [*message.get("headers", []), header]
+            await send(message)
+
+        await self.app(scope, receive, send_with_version)
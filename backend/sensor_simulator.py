@@ -1,8 +1,15 @@
+import argparse
+import asyncio
+import json
 import time
+import numpy as np
 import pandas as pd
-from typing import Generator, Dict, Any
+from typing import AsyncIterator, Awaitable, Callable, Generator, Dict, Any, Optional
 import os
 
+from .data_prep import PROCESSED_SCHEMA, TIMESTAMP_COL
+from .store import append_readings, load_readings, to_record
+
 # --- Using the index you discovered to create a demo "story" ---
 STORM_PEAK_INDEX = 43090
 DEMO_SEQUENCE_LENGTH = 100  # We will show 100 data points in our story
@@ -21,7 +28,7 @@ class CSVSimulatedStream:
         self.delay_s = delay_s
         self.demo_df = pd.DataFrame()
         try:
-            df = pd.read_csv(path)
+            df = load_readings(path)
             print(f"✅ Simulator loaded {len(df)} records to build demo sequence.")
             self._create_demo_sequence(df)
         except FileNotFoundError:
@@ -50,16 +57,334 @@ class CSVSimulatedStream:
             f"🌪️ Demo sequence created with {len(self.demo_df)} data points, centered on storm peak."
         )
 
-    def stream(self) -> Generator[Dict[str, Any], None, None]:
+    def readings(self) -> Generator[Dict[str, Any], None, None]:
+        """Loop over the demo sequence without pausing (for async callers)."""
         if self.demo_df.empty:
             return
 
-        current_index = 0
+        records = [to_record(row) for _, row in self.demo_df.iterrows()]
         while True:
-            row = self.demo_df.iloc[current_index]
-            yield row.to_dict()
+            yield from records  # Loop the demo sequence
+
+    def stream(self) -> Generator[Dict[str, Any], None, None]:
+        for reading in self.readings():
+            yield reading
             time.sleep(self.delay_s)
 
-            current_index += 1
-            if current_index >= len(self.demo_df):
-                current_index = 0  # Loop the demo sequence
+
+# --- Synthetic Station Network ---
+# Area the synthetic stations are scattered over (the Gujarat coast)
+SYNTH_LAT_RANGE = (20.5, 23.5)
+SYNTH_LON_RANGE = (68.5, 72.5)
+# Mean hours of simulated time between storms crossing the network
+SYNTH_STORM_EVERY_H = 72.0
+SYNTH_STORM_SPEED_KMH = 25.0
+SYNTH_STORM_RADIUS_KM = 150.0
+# Rows per append when writing a synthetic dataset to a file
+SYNTH_CHUNK_ROWS = 1_000_000
+_KM_PER_DEG = 111.2
+
+
+class SyntheticStationNetwork:
+    """
+    Seeded stand-in for `stations` live stations reporting `rate` readings
+    per second in total, i.e. each station every stations / rate seconds.
+
+    Storms arrive at random (about every `storm_every_h` hours of simulated
+    time) and cross the network along a straight track. At a station a
+    storm shows up as a pressure trough, a gust ramp that builds slowly and
+    drops sharply after the peak, and rain in bursts, all scaled by how
+    close the track passes.
+
+    `generate()` builds a batch of readings with NumPy in one go, so
+    millions per second are possible; `stream()` paces batches to the wall
+    clock. The same seed and batch sizes give the same readings.
+    """
+
+    def __init__(
+        self,
+        stations: int = 100,
+        rate: float = 100.0,
+        seed: int = 0,
+        start=None,
+        storm_every_h: float = SYNTH_STORM_EVERY_H,
+    ):
+        if stations < 1 or rate <= 0:
+            raise ValueError("Need at least one station and a positive rate.")
+        self.rate = float(rate)
+        self.storm_every_h = storm_every_h
+        # Simulated clock; by default it starts now, so streamed readings
+        # carry roughly wall-clock timestamps
+        if start is None:
+            start = pd.Timestamp.now(tz="UTC").tz_localize(None).floor("s")
+        self.start = pd.Timestamp(start)
+        self._next = 0  # index of the next reading
+
+        rng = np.random.default_rng(seed)
+        self.location_ids = np.array(
+            [f"SYN{i:04d}" for i in range(stations)], dtype=object
+        )
+        self.latitude = rng.uniform(*SYNTH_LAT_RANGE, stations)
+        self.longitude = rng.uniform(*SYNTH_LON_RANGE, stations)
+        self._climate = {
+            "air_temperature": rng.normal(28, 1.5, stations),
+            "humidity": rng.uniform(65, 80, stations),
+            "barometric_pressure": rng.normal(1010, 2, stations),
+            "wind_speed": rng.uniform(3, 8, stations),
+            "gust_factor": rng.uniform(1.3, 1.7, stations),
+        }
+        # Station positions in km east/north of the network centre
+        self._x = (self.longitude - np.mean(SYNTH_LON_RANGE)) * _KM_PER_DEG
+        self._x *= np.cos(np.radians(np.mean(SYNTH_LAT_RANGE)))
+        self._y = (self.latitude - np.mean(SYNTH_LAT_RANGE)) * _KM_PER_DEG
+        # Longest a storm takes to cross from the centre to a station
+        self._max_delay_h = np.hypot(self._x, self._y).max() / SYNTH_STORM_SPEED_KMH
+
+        self._noise = rng
+        self._storm_rng = np.random.default_rng([seed, 1])
+        # One row per storm: peak hour at the centre, peak intensity,
+        # duration scale (h), heading (rad), track offset from centre (km)
+        self._storms = np.empty((0, 5))
+
+    @property
+    def stations(self) -> int:
+        return len(self.location_ids)
+
+    def _storms_between(self, start_h: float, end_h: float) -> np.ndarray:
+        """Storms that can affect any station between the two hours."""
+        while not len(self._storms) or self._storms[-1, 0] < end_h + 100:
+            rng = self._storm_rng
+            last = self._storms[-1, 0] if len(self._storms) else 0.0
+            storm = [
+                last + rng.exponential(self.storm_every_h),
+                rng.uniform(0.5, 1.2),
+                rng.uniform(2, 6),
+                rng.uniform(0, 2 * np.pi),
+                rng.normal(0, 100),
+            ]
+            self._storms = np.vstack([self._storms, storm])
+        # A storm lasts at most ~4 duration scales either side of its peak
+        margin = self._max_delay_h + 4 * 6
+        peaks = self._storms[:, 0]
+        return self._storms[(peaks > start_h - margin) & (peaks < end_h + margin)]
+
+    def _storm_intensity(self, station: np.ndarray, hours: np.ndarray) -> np.ndarray:
+        intensity = np.zeros(len(hours))
+        if not len(hours):
+            return intensity
+        for peak_h, peak, duration_h, heading, offset in self._storms_between(
+            hours[0], hours[-1]
+        ):
+            along = self._x * np.cos(heading) + self._y * np.sin(heading)
+            across = -self._x * np.sin(heading) + self._y * np.cos(heading)
+            arrival = peak_h + along / SYNTH_STORM_SPEED_KMH
+            reach = peak * np.exp(-(((across - offset) / SYNTH_STORM_RADIUS_KM) ** 2))
+            phase = (hours - arrival[station]) / duration_h
+            # Slow build-up before the peak, quick clearance after it
+            phase /= np.where(phase < 0, 1.0, 0.4)
+            intensity += reach[station] * np.exp(-0.5 * phase * phase)
+        # Overlapping storms don't stack past a severe one
+        return np.minimum(intensity, 1.5)
+
+    def generate(self, rows: int) -> pd.DataFrame:
+        """The next `rows` readings, in time order, as processed columns."""
+        index = self._next + np.arange(rows)
+        self._next += rows
+        station = index % self.stations
+        seconds = index / self.rate
+        hours = seconds / 3600
+        storm = self._storm_intensity(station, hours)
+
+        climate = {name: values[station] for name, values in self._climate.items()}
+        noise = self._noise.standard_normal((5, rows))
+        hour_of_day = self.start.hour + self.start.minute / 60 + hours
+        diurnal = np.sin(2 * np.pi * (hour_of_day - 9) / 24)
+        wind = np.maximum(climate["wind_speed"] + 35 * storm + 1.5 * noise[3], 0)
+        bursting = self._noise.random(rows) < 0.1 + 0.6 * np.minimum(storm, 1)
+        rain = np.where(
+            bursting,
+            self._noise.exponential(1.0, rows) * (0.3 + 12 * storm * storm),
+            0.0,
+        )
+        measurements = {
+            "air_temperature": climate["air_temperature"]
+            + 2 * diurnal
+            - 3 * storm
+            + 0.3 * noise[0],
+            "humidity": np.clip(
+                climate["humidity"] - 8 * diurnal + 25 * storm + 2 * noise[1], 0, 100
+            ),
+            "rain_intensity": rain,
+            "wind_speed": wind,
+            "maximum_wind_speed": wind
+            * climate["gust_factor"]
+            * (1 + 0.1 * np.abs(noise[4])),
+            "barometric_pressure": climate["barometric_pressure"]
+            - 35 * storm
+            + 0.5 * noise[2],
+        }
+        # Whole microseconds, the precision the processed store keeps
+        micros = np.round(seconds * 1e6).astype(np.int64)
+        timestamps = self.start.value + micros * 1000
+        return pd.DataFrame(
+            {
+                TIMESTAMP_COL: timestamps.view("datetime64[ns]"),
+                "location_id": self.location_ids[station],
+                "latitude": self.latitude[station],
+                "longitude": self.longitude[station],
+                **{
+                    col: measurements[col].astype(dtype)
+                    for col, dtype in PROCESSED_SCHEMA.items()
+                },
+            }
+        )
+
+    async def stream(
+        self,
+        batch_s: float = 0.1,
+        realtime: bool = True,
+        total: Optional[int] = None,
+        clock: Optional[Callable[[], float]] = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        Yield batches of `batch_s` seconds' worth of readings.
+
+        With `realtime`, each batch is released once its newest reading is
+        due on the wall clock; otherwise batches come as fast as the caller
+        takes them. Stops after `total` readings if given. `clock` and
+        `sleep` default to the event loop's.
+        """
+        per_batch = max(1, round(self.rate * batch_s))
+        clock = clock or asyncio.get_running_loop().time
+        started, first = clock(), self._next
+        sent = 0
+        while total is None or sent < total:
+            batch = self.generate(
+                per_batch if total is None else min(per_batch, total - sent)
+            )
+            sent += len(batch)
+            if realtime:
+                due = started + (self._next - first) / self.rate
+                await sleep(max(0.0, due - clock()))
+            else:
+                await sleep(0)
+            yield batch
+
+
+def write_synthetic(
+    network: SyntheticStationNetwork,
+    path,
+    rows: int,
+    chunk_rows: int = SYNTH_CHUNK_ROWS,
+) -> int:
+    """Append `rows` synthetic readings to a processed CSV or SQLite store."""
+    written = 0
+    while written < rows:
+        batch = network.generate(min(chunk_rows, rows - written))
+        append_readings(batch, path)
+        written += len(batch)
+    return written
+
+
+def to_ingest_payload(batch: pd.DataFrame) -> list:
+    """Readings as the JSON list POST /readings accepts."""
+    measurements = {col: "float64" for col in PROCESSED_SCHEMA}
+    payload = batch.astype(measurements).round(dict.fromkeys(measurements, 2))
+    payload[TIMESTAMP_COL] = payload[TIMESTAMP_COL].dt.strftime("%Y-%m-%dT%H:%M:%S.%f")
+    return payload.to_dict("records")
+
+
+async def push_synthetic(
+    network: SyntheticStationNetwork,
+    url: str,
+    duration_s: float,
+    batch_s: float = 0.1,
+    max_in_flight: int = 8,
+    client=None,
+) -> Dict[str, Any]:
+    """
+    POST the network's readings to `url`/readings in real time for
+    `duration_s`, one request per batch, and count the outcomes.
+
+    At most `max_in_flight` requests are outstanding; when the server falls
+    behind, the push slows down instead of queueing without bound.
+    """
+    import httpx
+
+    stats = {"sent": 0, "accepted": 0, "rejected": 0, "errors": 0}
+    own_client = client is None
+    if own_client:
+        client = httpx.AsyncClient(base_url=url, timeout=10)
+    slots = asyncio.Semaphore(max_in_flight)
+    requests = set()
+
+    async def post(readings: list) -> None:
+        try:
+            response = await client.post("/readings", json=readings)
+            if response.status_code == 200:
+                stats["accepted"] += len(readings)
+            elif response.status_code == 503:
+                stats["rejected"] += len(readings)  # ingest backpressure
+            else:
+                stats["errors"] += len(readings)
+        except httpx.HTTPError:
+            stats["errors"] += len(readings)
+        finally:
+            slots.release()
+
+    started = time.perf_counter()
+    try:
+        total = round(network.rate * duration_s)
+        async for batch in network.stream(batch_s, realtime=True, total=total):
+            readings = to_ingest_payload(batch)
+            await slots.acquire()
+            stats["sent"] += len(readings)
+            request = asyncio.create_task(post(readings))
+            requests.add(request)
+            request.add_done_callback(requests.discard)
+        await asyncio.gather(*requests)
+    finally:
+        if own_client:
+            await client.aclose()
+    elapsed = time.perf_counter() - started
+    stats["readings_per_s"] = round(stats["accepted"] / elapsed, 1)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic multi-station readings.",
+        epilog="Without --out or --push, just measures generation speed.",
+    )
+    parser.add_argument("--stations", type=int, default=100)
+    parser.add_argument(
+        "--rate", type=float, default=100.0, help="Readings per second, all stations."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--out", help="Processed CSV or .db to append --rows to.")
+    parser.add_argument("--push", help="Base URL of a running API to push to.")
+    parser.add_argument("--duration", type=float, default=60.0, help="Push seconds.")
+    args = parser.parse_args()
+
+    network = SyntheticStationNetwork(args.stations, args.rate, args.seed)
+    if args.push:
+        print(f"🔄 Pushing {args.rate:g} readings/s to {args.push}...")
+        stats = asyncio.run(push_synthetic(network, args.push, args.duration))
+        print(json.dumps(stats, indent=2))
+    elif args.out:
+        count = write_synthetic(network, args.out, args.rows)
+        print(f"✅ Wrote {count} synthetic readings to {args.out}")
+    else:
+        start = time.perf_counter()
+        network.generate(args.rows)
+        elapsed = time.perf_counter() - start
+        print(
+            f"Generated {args.rows} readings in {elapsed:.3f}s "
+            f"({args.rows / elapsed:,.0f} readings/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+spatial.py
+
+Purpose:
+--------
+In-memory spatial index over sensor station coordinates.
+
+Stations are bucketed into a fixed lat/lon grid (a geohash-style grid of
+`cell_deg` x `cell_deg` cells). A radius or bounding-box query only visits
+the cells overlapping the query area, so its cost depends on how many
+stations are nearby, not on how many stations exist. Adding or moving a
+station touches a single cell, so the index is updated incrementally as
+readings arrive. Queries do not wrap around the antimeridian.
+"""
+
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+# Roughly 55 km cells: a typical "nearby" query touches only a few of them
+DEFAULT_CELL_DEG = 0.5
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; works on scalars or NumPy arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class StationIndex:
+    """Grid index mapping station ids to (lat, lon)."""
+
+    def __init__(self, cell_deg: float = DEFAULT_CELL_DEG):
+        self.cell_deg = cell_deg
+        self.stations: Dict[str, Tuple[float, float]] = {}
+        self._cells: Dict[Tuple[int, int], Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def __contains__(self, station_id: str) -> bool:
+        return station_id in self.stations
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def add(self, station_id: str, lat: float, lon: float) -> bool:
+        """Insert or move a station; returns True if the index changed."""
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError(f"Invalid coordinates for {station_id}: ({lat}, {lon})")
+        position = (float(lat), float(lon))
+        previous = self.stations.get(station_id)
+        if previous == position:
+            return False
+        if previous is not None:
+            self._remove_from_cell(station_id, previous)
+        self.stations[station_id] = position
+        self._cells.setdefault(self._cell(*position), set()).add(station_id)
+        return True
+
+    def remove(self, station_id: str) -> None:
+        position = self.stations.pop(station_id, None)
+        if position is not None:
+            self._remove_from_cell(station_id, position)
+
+    def clear(self) -> None:
+        self.stations.clear()
+        self._cells.clear()
+
+    def _remove_from_cell(self, station_id: str, position: Tuple[float, float]):
+        cell = self._cell(*position)
+        members = self._cells.get(cell)
+        if members is not None:
+            members.discard(station_id)
+            if not members:
+                del self._cells[cell]
+
+    def _candidates(self, min_lat, min_lon, max_lat, max_lon) -> List[str]:
+        lo_y, lo_x = self._cell(min_lat, min_lon)
+        hi_y, hi_x = self._cell(max_lat, max_lon)
+        # A huge query area can have more cells than occupied ones
+        if (hi_y - lo_y + 1) * (hi_x - lo_x + 1) > len(self._cells):
+            return [
+                sid
+                for (y, x), members in self._cells.items()
+                if lo_y <= y <= hi_y and lo_x <= x <= hi_x
+                for sid in members
+            ]
+        found = []
+        for y in range(lo_y, hi_y + 1):
+            for x in range(lo_x, hi_x + 1):
+                found.extend(self._cells.get((y, x), ()))
+        return found
+
+    def within_bbox(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float
+    ) -> List[str]:
+        """Station ids inside the box, ordered by id."""
+        return sorted(
+            sid
+            for sid in self._candidates(min_lat, min_lon, max_lat, max_lon)
+            if min_lat <= self.stations[sid][0] <= max_lat
+            and min_lon <= self.stations[sid][1] <= max_lon
+        )
+
+    def nearby(
+        self, lat: float, lon: float, radius_km: float, limit: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """(station id, distance km) within `radius_km`, nearest first."""
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        # Longitude degrees shrink towards the poles; clamp to avoid cos(90°)
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + dlat, 89.9))), 1e-6)
+        dlon = min(180.0, dlat / cos_lat)
+        candidates = self._candidates(
+            max(-90.0, lat - dlat),
+            max(-180.0, lon - dlon),
+            min(90.0, lat + dlat),
+            min(180.0, lon + dlon),
+        )
+        if not candidates:
+            return []
+
+        coords = np.array([self.stations[sid] for sid in candidates])
+        distances = haversine_km(lat, lon, coords[:, 0], coords[:, 1])
+        inside = np.flatnonzero(distances <= radius_km)
+        order = inside[np.argsort(distances[inside], kind="stable")]
+        if limit is not None:
+            order = order[:limit]
+        return [(candidates[i], float(distances[i])) for i in order]
@@ -0,0 +1,461 @@
+"""
+store.py
+
+Purpose:
+--------
+Data-access layer for the processed sensor dataset.
+
+The API, the simulator and the ingest pipeline read and write processed
+readings only through these functions, so the storage format can change
+without touching the callers.
+
+Two backends sit behind the same functions, chosen by the path:
+- a flat CSV (the default, written by data_prep.py)
+- an embedded SQLite database (paths ending in .db / .sqlite / .sqlite3)
+  in WAL mode, indexed on (location_id, measurement_timestamp), so latest,
+  range and aggregate queries use the index instead of a full scan and
+  readers never block the writer.
+
+Convert an existing CSV with:
+    python -m backend.store data/processed/cleaned_weather.csv readings.db
+"""
+
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_prep import (
+    PROCESSED_COLUMNS,
+    PROCESSED_DATA_PATH,
+    PROCESSED_DTYPES,
+    PROCESSED_SCHEMA,
+    PROCESSED_TIMESTAMP_FORMAT,
+    PROCESSED_TIMESTAMP_PARSE,
+    TIMESTAMP_COL,
+    UNKNOWN_LOCATION,
+    parse_timestamps,
+    read_processed,
+)
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+# Connections kept open per database
+SQLITE_POOL_SIZE = 8
+# Rows per executemany() batch when importing a CSV
+SQLITE_IMPORT_CHUNK = 100_000
+# Rows per chunk when rewriting a CSV store under a wider header
+CSV_MIGRATE_CHUNK = 100_000
+
+# CSV appends and reads in this process don't interleave mid-line
+_csv_lock = threading.Lock()
+
+
+def _fill_locations(df: pd.DataFrame) -> pd.DataFrame:
+    """Missing station ids (NaN in a CSV, '' in older databases) as UNKNOWN."""
+    if "location_id" in df.columns:
+        ids = df["location_id"]
+        df["location_id"] = ids.where(ids.notna() & (ids != ""), UNKNOWN_LOCATION)
+    return df
+
+
+def to_record(row: pd.Series) -> Dict[str, Any]:
+    """Convert a processed row to plain Python values for JSON responses."""
+    record = {}
+    for key, value in row.items():
+        if isinstance(value, np.floating):
+            # str() gives the shortest repr, so float32 992.3 stays 992.3
+            value = float(str(value))
+        elif isinstance(value, np.integer):
+            value = int(value)
+        record[key] = value
+    return record
+
+
+def is_sqlite_path(path) -> bool:
+    return str(path).endswith(SQLITE_SUFFIXES)
+
+
+# --- SQLite Backend ---
+class SQLiteStore:
+    """
+    Readings table in an embedded SQLite database with pooled connections.
+
+    Statements are fixed strings with bound parameters, so each pooled
+    connection prepares them once and reuses them from its statement cache.
+    Writes are serialised by a lock and run in one IMMEDIATE transaction per
+    batch; WAL mode lets readers continue while a batch is written.
+    """
+
+    COLUMNS = PROCESSED_COLUMNS
+    # Columns added after the first release; older databases are migrated
+    ADDED_COLUMNS = {"latitude": "REAL", "longitude": "REAL"}
+
+    def __init__(self, path, pool_size: int = SQLITE_POOL_SIZE):
+        self.path = str(path)
+        self.pool_size = pool_size
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._write_lock = threading.Lock()
+
+        measurements = ", ".join(f"{col} REAL" for col in PROCESSED_SCHEMA)
+        cols = ", ".join(self.COLUMNS)
+        self._insert_sql = (
+            f"INSERT INTO readings ({cols}) "
+            f"VALUES ({', '.join('?' for _ in self.COLUMNS)})"
+        )
+        self._select = f"SELECT {cols} FROM readings"
+        self._aggregate = ", ".join(
+            f"MIN({col}), MAX({col}), AVG({col})" for col in PROCESSED_SCHEMA
+        )
+
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with self.connection() as conn:
+            conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS readings (
+                    id INTEGER PRIMARY KEY,
+                    location_id TEXT NOT NULL DEFAULT '{UNKNOWN_LOCATION}',
+                    {TIMESTAMP_COL} TEXT,
+                    latitude REAL,
+                    longitude REAL,
+                    {measurements}
+                );
+                CREATE INDEX IF NOT EXISTS idx_readings_location_time
+                    ON readings (location_id, {TIMESTAMP_COL});
+                CREATE INDEX IF NOT EXISTS idx_readings_time
+                    ON readings ({TIMESTAMP_COL});
+                """)
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(readings)")}
+            for col, sql_type in self.ADDED_COLUMNS.items():
+                if col not in existing:
+                    conn.execute(f"ALTER TABLE readings ADD COLUMN {col} {sql_type}")
+            # Older databases stored a missing station id as ''
+            conn.execute(
+                "UPDATE readings SET location_id = ? WHERE location_id = ''",
+                (UNKNOWN_LOCATION,),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=30,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            if self._pool.qsize() < self.pool_size:
+                self._pool.put(conn)
+            else:
+                conn.close()
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    @staticmethod
+    def _where(location_id: Optional[str], start=None, end=None):
+        clauses, params = [], []
+        if location_id is not None:
+            clauses.append("location_id = ?")
+            params.append(location_id)
+        if start is not None:
+            clauses.append(f"{TIMESTAMP_COL} >= ?")
+            params.append(_to_sql_time(start))
+        if end is not None:
+            clauses.append(f"{TIMESTAMP_COL} < ?")
+            params.append(_to_sql_time(end))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def _query(self, sql: str, params) -> pd.DataFrame:
+        with self.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        df = pd.DataFrame.from_records(rows, columns=self.COLUMNS)
+        df = df.astype(PROCESSED_DTYPES)
+        _fill_locations(df)
+        df[TIMESTAMP_COL] = parse_timestamps(
+            df[TIMESTAMP_COL], PROCESSED_TIMESTAMP_PARSE
+        ).astype("datetime64[ns]")
+        return df
+
+    def load(self, location_id: Optional[str] = None) -> pd.DataFrame:
+        where, params = self._where(location_id)
+        return self._query(f"{self._select}{where} ORDER BY {TIMESTAMP_COL}", params)
+
+    def latest(self, location_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        # Single indexed row: build the record directly, skipping pandas
+        where, params = self._where(location_id)
+        with self.connection() as conn:
+            row = conn.execute(
+                f"{self._select}{where} ORDER BY {TIMESTAMP_COL} DESC LIMIT 1", params
+            ).fetchone()
+        if row is None:
+            return None
+        record = dict(zip(self.COLUMNS, row))
+        record[TIMESTAMP_COL] = pd.Timestamp(record[TIMESTAMP_COL])
+        for col in PROCESSED_SCHEMA:
+            if record[col] is not None:
+                # Same value a float32 frame would give, e.g. 992.3 not 992.2999877
+                record[col] = float(str(np.float32(record[col])))
+        return record
+
+    def latest_per_location(self) -> pd.DataFrame:
+        cols = ", ".join(f"r.{col}" for col in self.COLUMNS)
+        # The grouped MAX is answered from the (location_id, time) index
+        sql = (
+            f"SELECT {cols} FROM readings r JOIN ("
+            f"SELECT location_id, MAX({TIMESTAMP_COL}) AS latest "
+            f"FROM readings GROUP BY location_id) m "
+            f"ON r.location_id = m.location_id AND r.{TIMESTAMP_COL} = m.latest "
+            f"ORDER BY r.id"
+        )
+        df = self._query(sql, [])
+        return df.drop_duplicates("location_id", keep="last").reset_index(drop=True)
+
+    def appended_after(self, rows: int) -> pd.DataFrame:
+        return self._query(f"{self._select} ORDER BY id LIMIT -1 OFFSET ?", [rows])
+
+    def between(self, start, end, location_id: Optional[str] = None) -> pd.DataFrame:
+        where, params = self._where(location_id, start, end)
+        return self._query(f"{self._select}{where} ORDER BY {TIMESTAMP_COL}", params)
+
+    def aggregate(self, start, end, location_id: Optional[str] = None) -> Dict:
+        where, params = self._where(location_id, start, end)
+        with self.connection() as conn:
+            row = conn.execute(
+                f"SELECT COUNT(*), {self._aggregate} FROM readings{where}", params
+            ).fetchone()
+        result = {"count": row[0]}
+        for i, col in enumerate(PROCESSED_SCHEMA):
+            lo, hi, mean = row[1 + 3 * i : 4 + 3 * i]
+            result[col] = {"min": lo, "max": hi, "mean": mean}
+        return result
+
+    def append(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        df = df.reindex(columns=self.COLUMNS)
+        _fill_locations(df)
+        df[TIMESTAMP_COL] = pd.to_datetime(df[TIMESTAMP_COL]).dt.strftime(
+            PROCESSED_TIMESTAMP_FORMAT
+        )
+        # NaN -> NULL, numpy scalars -> Python values
+        values = df.astype(object).where(df.notna(), None)
+        rows = values.itertuples(index=False, name=None)
+        with self._write_lock, self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(self._insert_sql, rows)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+
+def _to_sql_time(value) -> str:
+    # Whole-second bounds drop the fraction: "...:00" sorts before both
+    # "...:00.000000" and rows stored without microseconds, so >= and <
+    # bounds stay exact for either kind of row
+    text = pd.Timestamp(value).strftime(PROCESSED_TIMESTAMP_FORMAT)
+    return text.removesuffix(".000000")
+
+
+_sqlite_stores: Dict[str, SQLiteStore] = {}
+_sqlite_stores_lock = threading.Lock()
+
+
+def get_sqlite_store(path) -> SQLiteStore:
+    """Shared store (and connection pool) per database file."""
+    key = os.path.abspath(str(path))
+    with _sqlite_stores_lock:
+        if key not in _sqlite_stores:
+            _sqlite_stores[key] = SQLiteStore(key)
+        return _sqlite_stores[key]
+
+
+# --- CSV Backend ---
+def _read_csv_store(path, skip_rows: int = 0) -> pd.DataFrame:
+    with _csv_lock:
+        return _fill_locations(read_processed(path, skip_rows=skip_rows))
+
+
+def _migrate_csv_header(path: str, header: pd.Index) -> pd.Index:
+    """
+    Rewrite a CSV store that lacks some processed columns (e.g. one written
+    before the station fields existed) under the full header.
+
+    Existing rows keep their text and their order, with the new columns
+    left empty; the file is replaced only once the copy is complete.
+    """
+    columns = [*PROCESSED_COLUMNS, *(c for c in header if c not in PROCESSED_COLUMNS)]
+    tmp = f"{path}.migrating"
+    chunks = pd.read_csv(
+        path, dtype=str, keep_default_na=False, chunksize=CSV_MIGRATE_CHUNK
+    )
+    with open(tmp, "w", newline="") as out:
+        pd.DataFrame(columns=columns).to_csv(out, index=False)
+        for chunk in chunks:
+            chunk.reindex(columns=columns).to_csv(out, header=False, index=False)
+    os.replace(tmp, path)
+    print(f"🔧 Added {sorted(set(columns) - set(header))} to the header of {path}")
+    return pd.Index(columns)
+
+
+def _filter(df: pd.DataFrame, location_id=None, start=None, end=None):
+    mask = pd.Series(True, index=df.index)
+    if location_id is not None:
+        if "location_id" not in df.columns:
+            return df.iloc[0:0]
+        mask &= df["location_id"] == location_id
+    if start is not None:
+        mask &= df[TIMESTAMP_COL] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df[TIMESTAMP_COL] < pd.Timestamp(end)
+    return df[mask]
+
+
+# --- Data-Access Functions ---
+def load_readings(
+    path=PROCESSED_DATA_PATH, location_id: Optional[str] = None
+) -> pd.DataFrame:
+    """Load all processed readings, oldest first."""
+    if is_sqlite_path(path):
+        return get_sqlite_store(path).load(location_id)
+    return _filter(_read_csv_store(path), location_id)
+
+
+def latest_reading(
+    path=PROCESSED_DATA_PATH, location_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Most recent processed reading, or None if there is none."""
+    if is_sqlite_path(path):
+        return get_sqlite_store(path).latest(location_id)
+    df = load_readings(path, location_id)
+    if df.empty:
+        return None
+    return to_record(df.iloc[-1])
+
+
+def latest_per_location(path=PROCESSED_DATA_PATH) -> pd.DataFrame:
+    """Most recent reading of every location, one row each."""
+    if is_sqlite_path(path):
+        return get_sqlite_store(path).latest_per_location()
+    df = _read_csv_store(path)
+    if "location_id" not in df.columns:
+        return df.iloc[0:0]
+    latest = df.sort_values(TIMESTAMP_COL, kind="stable").groupby("location_id").tail(1)
+    return latest.reset_index(drop=True)
+
+
+def readings_appended_after(rows: int, path=PROCESSED_DATA_PATH) -> pd.DataFrame:
+    """Readings after the first `rows` ever appended, in append order."""
+    if is_sqlite_path(path):
+        return get_sqlite_store(path).appended_after(rows)
+    return _read_csv_store(path, skip_rows=rows)
+
+
+def readings_between(
+    start, end, path=PROCESSED_DATA_PATH, location_id: Optional[str] = None
+) -> pd.DataFrame:
+    """Readings with start <= timestamp < end, oldest first."""
+    if is_sqlite_path(path):
+        return get_sqlite_store(path).between(start, end, location_id)
+    return _filter(_read_csv_store(path), location_id, start, end)
+
+
+def aggregate_readings(
+    start, end, path=PROCESSED_DATA_PATH, location_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Count plus min/max/mean of each measurement over [start, end).
+
+    Returns {"count": n, "<measurement>": {"min", "max", "mean"}, ...}.
+    """
+    if is_sqlite_path(path):
+        return get_sqlite_store(path).aggregate(start, end, location_id)
+    df = readings_between(start, end, path, location_id)
+    result = {"count": len(df)}
+    for col in PROCESSED_SCHEMA:
+        values = df[col].dropna()
+        if values.empty:
+            result[col] = {"min": None, "max": None, "mean": None}
+        else:
+            result[col] = {
+                "min": float(values.min()),
+                "max": float(values.max()),
+                "mean": float(values.astype("float64").mean()),
+            }
+    return result
+
+
+def append_readings(df: pd.DataFrame, path=PROCESSED_DATA_PATH) -> None:
+    """
+    Append readings to the processed dataset.
+
+    Columns are aligned to the existing file header (or the processed
+    schema for a new file), so callers may pass extra fields (they are
+    dropped) or omit some (they are left empty). A CSV whose header lacks
+    processed columns is migrated first, so station fields are never
+    dropped.
+    """
+    if is_sqlite_path(path):
+        get_sqlite_store(path).append(df)
+        return
+
+    path = str(path)
+    with _csv_lock:
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            header = pd.read_csv(path, nrows=0).columns
+            if not set(PROCESSED_COLUMNS) <= set(header):
+                header = _migrate_csv_header(path, header)
+            df.reindex(columns=header).to_csv(
+                path,
+                mode="a",
+                header=False,
+                index=False,
+                date_format=PROCESSED_TIMESTAMP_FORMAT,
+            )
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            df.reindex(columns=PROCESSED_COLUMNS).to_csv(
+                path, index=False, date_format=PROCESSED_TIMESTAMP_FORMAT
+            )
+
+
+def import_csv(csv_path, db_path, chunksize: int = SQLITE_IMPORT_CHUNK) -> int:
+    """Copy a processed CSV into a SQLite store; returns the rows imported."""
+    imported = 0
+    for chunk in pd.read_csv(csv_path, dtype=PROCESSED_DTYPES, chunksize=chunksize):
+        chunk[TIMESTAMP_COL] = parse_timestamps(
+            chunk[TIMESTAMP_COL], PROCESSED_TIMESTAMP_PARSE
+        )
+        append_readings(chunk, db_path)
+        imported += len(chunk)
+    return imported
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or not is_sqlite_path(sys.argv[2]):
+        print("Usage: python -m backend.store <processed.csv> <store.db>")
+        sys.exit(1)
+    count = import_csv(sys.argv[1], sys.argv[2])
+    print(f"✅ Imported {count} readings into {sys.argv[2]}")
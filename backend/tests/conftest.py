@@ -0,0 +1,26 @@
+"""
+Shared pytest fixtures for the backend tests.
+"""
+
+import pytest
+
+from backend import app as app_module
+
+
+def _reset_live_state():
+    app_module.live_feed.clear()
+    app_module.station_index.clear()
+    app_module.nowcaster.clear()
+    app_module.rollups.levels = {}
+
+
+@pytest.fixture
+def processed_path(tmp_path, monkeypatch):
+    """Point the app at an empty processed store and reset live state."""
+    path = tmp_path / "processed.csv"
+    monkeypatch.setattr(app_module, "PROCESSED_DATA_PATH", str(path))
+    _reset_live_state()
+    yield path
+    # Still pointed at the temporary store, so pending readings land there
+    app_module.ingest_buffer.flush()
+    _reset_live_state()
@@ -0,0 +1,190 @@
+"""
+Pytest tests for the typed processing schema in data_prep.
+"""
+
+import numpy as np
+import pandas as pd
+
+from backend import data_prep
+
+
+def test_process_data_applies_schema():
+    """Measurements come out as float32 and timestamps as datetime64."""
+    raw = pd.DataFrame(
+        {
+            "measurement_timestamp": [
+                "05/22/2015 03:00:00 PM",
+                "05/22/2015 02:00:00 PM",
+            ],
+            "humidity": [88, 80],
+            "rain_intensity": [5.0, 0.0],
+            "wind_speed": [25.0, 4.0],
+            "maximum_wind_speed": [35.0, 6.0],
+            "barometric_pressure": [992.0, 1010.0],
+        }
+    )
+    df = data_prep.process_data(raw)
+
+    assert list(df.columns) == data_prep.PROCESSED_COLUMNS
+    assert pd.api.types.is_datetime64_any_dtype(df["measurement_timestamp"])
+    for col in data_prep.PROCESSED_SCHEMA:
+        assert df[col].dtype == np.float32
+    # Sorted by timestamp
+    assert df["measurement_timestamp"].iloc[0] == pd.Timestamp("2015-05-22 14:00:00")
+    # Missing column is filled with NaN instead of None
+    assert df["air_temperature"].isna().all()
+
+
+def test_parse_timestamps_falls_back_for_odd_rows():
+    """Rows that don't match the explicit format are still parsed."""
+    values = pd.Series(["05/22/2015 03:00:00 PM", "2015-05-22T16:00:00", None])
+    parsed = data_prep.parse_timestamps(values)
+
+    assert parsed.iloc[0] == pd.Timestamp("2015-05-22 15:00:00")
+    assert parsed.iloc[1] == pd.Timestamp("2015-05-22 16:00:00")
+    assert pd.isna(parsed.iloc[2])
+
+
+def test_parse_timestamps_converts_offsets_to_naive_utc():
+    """Offset strings come back as naive UTC in a datetime64[ns] column."""
+    values = pd.Series(
+        ["2015-05-22T16:00:00Z", "2015-05-22T16:00:00+02:00", "05/22/2015 03:00 PM"]
+    )
+    for fmt in (data_prep.RAW_TIMESTAMP_FORMAT, "%Y-%m-%dT%H:%M:%S%z"):
+        parsed = data_prep.parse_timestamps(values, fmt)
+        assert parsed.dtype == "datetime64[ns]"
+        assert list(parsed) == [
+            pd.Timestamp("2015-05-22 16:00"),
+            pd.Timestamp("2015-05-22 14:00"),
+            pd.Timestamp("2015-05-22 15:00"),
+        ]
+
+
+def test_processed_round_trip(tmp_path):
+    """Processed CSVs read back with the same schema."""
+    raw_path = tmp_path / "raw.csv"
+    pd.DataFrame(
+        {
+            "Measurement Timestamp": ["05/22/2015 03:00:00 PM"],
+            "Station Name": ["Oak Street Weather Station"],
+            "Humidity": [88],
+            "Rain Intensity": [5.0],
+            "Wind Speed": [25.0],
+            "Maximum Wind Speed": [35.0],
+            "Barometric Pressure": [992.3],
+        }
+    ).to_csv(raw_path, index=False)
+
+    df = data_prep.process_data(data_prep.load_raw(raw_path))
+    out_path = tmp_path / "processed.csv"
+    df.to_csv(out_path, index=False, date_format=data_prep.PROCESSED_TIMESTAMP_FORMAT)
+    back = data_prep.read_processed(out_path)
+
+    pd.testing.assert_frame_equal(df, back)
+
+
+def _feeds():
+    weather = pd.DataFrame(
+        {
+            "measurement_timestamp": pd.date_range("2025-08-30", periods=24, freq="h"),
+            "wind_speed": np.arange(24, dtype="float32"),
+        }
+    )
+    # Tide gauge every 6 minutes, offset by 2 minutes, with a 3-hour outage
+    tide_stamps = pd.date_range("2025-08-30 00:02", periods=230, freq="6min")
+    tide = pd.DataFrame(
+        {"measurement_timestamp": tide_stamps, "tide_level": np.ones(230)}
+    )
+    tide = tide[
+        (tide_stamps < "2025-08-30 10:00") | (tide_stamps >= "2025-08-30 13:00")
+    ]
+    return {"weather": weather, "tide": tide}
+
+
+def test_merge_sources_aligns_feeds_on_fixed_cadence():
+    """Feeds are matched within tolerance and short gaps interpolated."""
+    merged = data_prep.merge_sources(
+        _feeds(), freq="30min", tolerance="5min", max_gap="1h"
+    )
+
+    assert list(merged.columns) == [
+        "measurement_timestamp",
+        "wind_speed",
+        "tide_level",
+    ]
+    assert (
+        merged["measurement_timestamp"].diff().dropna() == pd.Timedelta("30min")
+    ).all()
+    # Half-hour points between hourly weather readings are interpolated
+    half = merged.set_index("measurement_timestamp").loc["2025-08-30 00:30"]
+    assert half["wind_speed"] == 0.5
+    # The 3-hour tide outage is longer than max_gap, so it stays empty
+    outage = merged.set_index("measurement_timestamp").loc[
+        "2025-08-30 10:30":"2025-08-30 12:30", "tide_level"
+    ]
+    assert outage.isna().all()
+
+
+def test_merge_sources_is_chunk_invariant():
+    """Chunk boundaries don't change the merged result."""
+    kwargs = dict(freq="10min", tolerance="5min", max_gap="1h")
+    whole = data_prep.merge_sources(_feeds(), chunk="30D", **kwargs)
+    chunked = data_prep.merge_sources(_feeds(), chunk="50min", **kwargs)
+
+    pd.testing.assert_frame_equal(whole, chunked)
+
+
+def test_merge_sources_suffixes_clashing_columns():
+    """Columns present in several feeds are kept apart per source."""
+    feeds = _feeds()
+    feeds["buoy"] = feeds["weather"].copy()
+    merged = data_prep.merge_sources(feeds, freq="1h", tolerance="5min")
+
+    assert "wind_speed" in merged.columns
+    assert "wind_speed_buoy" in merged.columns
+
+
+def test_preprocess_sources_streams_typed_feeds_per_site(tmp_path):
+    """Feeds in their own timestamp formats merge into one tagged timeline."""
+    stamps = pd.date_range("2025-08-30", periods=47, freq="30min")
+    pd.DataFrame(
+        {
+            "Station Name": "Oak Street Weather Station",
+            "Measurement Timestamp": stamps.strftime(data_prep.RAW_TIMESTAMP_FORMAT),
+            "Wind Speed": np.arange(47.0),
+            "Battery Life": 12.0,
+        }
+    ).to_csv(tmp_path / "weather.csv", index=False)
+    pd.DataFrame(
+        {
+            "measurement_timestamp": stamps.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "lat": 41.9,
+            "lon": -87.6,
+            "barometric_pressure": np.linspace(1010, 990, 47),
+        }
+    ).to_csv(tmp_path / "buoy.csv", index=False)
+
+    out_path = tmp_path / "merged.csv"
+    written = data_prep.preprocess_sources(
+        {"weather": tmp_path / "weather.csv", "buoy": tmp_path / "buoy.csv"},
+        out_path,
+        timestamp_formats={"buoy": "%Y-%m-%dT%H:%M:%S%z"},
+        chunk_rows=10,
+        freq="1h",
+        tolerance="5min",
+    )
+    merged = data_prep.read_processed(out_path)
+
+    assert written == len(merged) == 24
+    assert list(merged.columns) == [
+        "measurement_timestamp",
+        "location_id",
+        "latitude",
+        "longitude",
+        "wind_speed",
+        "barometric_pressure",
+    ]
+    assert (merged["location_id"] == "Oak Street Weather Station").all()
+    assert (merged["latitude"] == 41.9).all()
+    assert merged["wind_speed"].tolist() == list(np.arange(0.0, 47.0, 2))
+    assert merged["barometric_pressure"].notna().all()
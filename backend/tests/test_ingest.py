@@ -0,0 +1,84 @@
+"""
+Pytest tests for the live ingest endpoint and write-behind buffer.
+"""
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.data_prep import read_processed
+from backend.ingest import WriteBehindBuffer
+from backend.threat_model import calculate_threat_score
+
+
+STORM_READING = {
+    "location_id": "PORBANDAR",
+    "measurement_timestamp": "2025-08-30T12:00:00Z",
+    "humidity": 96,
+    "rain_intensity": 20,
+    "wind_speed": 40,
+    "maximum_wind_speed": 50,
+    "barometric_pressure": 980,
+}
+
+
+def test_ingest_single_reading_feeds_latest(processed_path):
+    """An ingested reading is scored and served by /threat/latest at once."""
+    with TestClient(app) as client:
+        response = client.post("/readings", json=STORM_READING)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["accepted"] == 1
+        assert data["max_level"] == calculate_threat_score(STORM_READING)["level"]
+
+        latest = client.get("/threat/latest", params={"location_id": "PORBANDAR"})
+        assert latest.status_code == 200
+        assert latest.json()["location_id"] == "PORBANDAR"
+        assert latest.json()["raw"]["wind_speed"] == 40
+
+
+def test_ingest_batch_is_flushed_to_store(processed_path):
+    """Batches are written behind to the processed store."""
+    batch = [
+        {**STORM_READING, "measurement_timestamp": f"2025-08-30T12:0{i}:00Z"}
+        for i in range(5)
+    ]
+    with TestClient(app) as client:
+        response = client.post("/readings", json=batch)
+        assert response.json()["accepted"] == 5
+    # Leaving the client runs the shutdown flush
+
+    df = read_processed(processed_path)
+    assert len(df) == 5
+    assert df["measurement_timestamp"].iloc[-1] == pd.Timestamp("2025-08-30 12:04:00")
+    assert df["wind_speed"].dtype == "float32"
+
+
+def test_latest_unknown_location_is_404(processed_path):
+    with TestClient(app) as client:
+        response = client.get("/threat/latest", params={"location_id": "NOWHERE"})
+    assert response.status_code == 404
+
+
+def test_buffer_flushes_on_size_and_keeps_failed_batches():
+    """A failed write keeps the batch pending for the next flush."""
+    written = []
+
+    def flaky_write(df):
+        if not written:
+            written.append(None)
+            raise OSError("disk full")
+        written.append(df)
+
+    buffer = WriteBehindBuffer(write=flaky_write, max_rows=2, max_pending=3)
+    buffer.add([dict(STORM_READING, measurement_timestamp=pd.Timestamp(0))] * 2)
+    assert not buffer.has_room(2)
+
+    with pytest.raises(OSError):
+        buffer.flush()
+    assert buffer.pending == 2
+
+    assert buffer.flush() == 2
+    assert buffer.pending == 0
+    assert len(written[-1]) == 2
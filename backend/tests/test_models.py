@@ -0,0 +1,177 @@
+"""
+Pytest tests for the threat model interface, the vectorized rule scorer and
+the learned logistic model.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.benchmarks.datasets import synthetic_storm_history
+from backend.config import THRESHOLDS
+from backend.learned_model import (
+    LogisticThreatModel,
+    label_storm_episodes,
+    load_model,
+    load_threat_model,
+    train_logistic,
+)
+from backend.scoring_config import ScoringConfig
+from backend.threat_model import (
+    RuleThreatModel,
+    THREAT_LABELS,
+    ThreatModel,
+    calculate_threat_score,
+    level_indices,
+)
+
+
+def test_rule_batch_matches_single_scoring():
+    """score_batch gives exactly calculate_threat_score for every level combo."""
+    values = {
+        param: [t[0] - 0.5, t[0], t[1], t[2], np.nan] for param, t in THRESHOLDS.items()
+    }
+    df = pd.DataFrame(list(itertools.product(*values.values())), columns=list(values))
+    expected = [calculate_threat_score(row)["score"] for _, row in df.iterrows()]
+    expected_levels = [calculate_threat_score(row)["level"] for _, row in df.iterrows()]
+
+    scores = RuleThreatModel().score_batch(df)
+    np.testing.assert_array_equal(scores, expected)
+    assert [THREAT_LABELS[i] for i in level_indices(scores)] == expected_levels
+
+
+def test_models_must_implement_both_scoring_methods():
+    class SingleOnly(ThreatModel):
+        def score(self, reading):
+            return calculate_threat_score(reading)
+
+    with pytest.raises(TypeError):
+        ThreatModel()
+    with pytest.raises(TypeError):
+        SingleOnly()
+
+
+def test_missing_value_scores_as_safe():
+    """NaN from the processed data counts as missing, same as None."""
+    reading = {"wind_speed": np.nan, "maximum_wind_speed": None}
+    result = calculate_threat_score(reading)
+    assert result["parameters"]["wind_speed"] == 0
+    assert result["parameters"]["maximum_wind_speed"] == 0
+
+
+def _frame(stamps, stormy, location="A"):
+    """Readings at `stamps`; stormy ones pass every storm indicator."""
+    stormy = np.asarray(stormy, dtype=bool)
+    return pd.DataFrame(
+        {
+            "location_id": location,
+            "measurement_timestamp": pd.to_datetime(stamps),
+            "maximum_wind_speed": np.where(stormy, 50.0, 10.0),
+            "rain_intensity": np.where(stormy, 20.0, 0.0),
+            "barometric_pressure": np.where(stormy, 980.0, 1010.0),
+        }
+    )
+
+
+def test_storm_episode_labels_include_lead_up():
+    """Sustained storms are labelled with their lead-up; short blips are not."""
+    stamps = pd.date_range("2025-08-30", periods=24, freq="h")
+    stormy = np.zeros(24, dtype=bool)
+    stormy[10:14] = True  # a four-hour storm
+    stormy[20] = True  # a single stormy reading
+    labels = label_storm_episodes(_frame(stamps, stormy), lead="3h")
+
+    expected = np.zeros(24, dtype=np.int8)
+    expected[7:14] = 1
+    np.testing.assert_array_equal(labels, expected)
+
+
+def test_storm_episodes_are_per_location():
+    """One station's storm does not label another station's readings."""
+    stamps = pd.date_range("2025-08-30", periods=6, freq="h")
+    df = pd.concat(
+        [
+            _frame(stamps, [0, 0, 1, 1, 1, 0], "A"),
+            _frame(stamps, [0] * 6, "B"),
+        ],
+        ignore_index=True,
+    ).sample(frac=1, random_state=0)
+
+    labels = pd.Series(label_storm_episodes(df, lead="1h"), index=df.index)
+    assert labels[df["location_id"] == "B"].sum() == 0
+    assert labels[df["location_id"] == "A"].sum() == 4
+
+
+@pytest.fixture(scope="module")
+def trained(tmp_path_factory):
+    history = synthetic_storm_history(20_000)
+    labels = label_storm_episodes(history)
+    model = train_logistic(history, labels)
+    path = model.save(tmp_path_factory.mktemp("models") / "storm_logistic")
+    return history, labels, path
+
+
+def test_logistic_model_separates_storms(trained):
+    """The learned score ranks storm readings above calm ones."""
+    history, labels, path = trained
+    scores = load_model(str(path)).score_batch(history)
+    assert scores[labels == 1].mean() > 50 > scores[labels == 0].mean()
+
+
+def test_logistic_artifact_is_cached(trained):
+    """Artifacts load once per process."""
+    _, _, path = trained
+    model = load_threat_model(str(path))
+    assert model is load_threat_model(str(path))
+    assert isinstance(load_threat_model("rules"), RuleThreatModel)
+
+
+def test_logistic_levels_follow_the_config_thresholds(trained):
+    """A learned model explains its score with the active config's thresholds."""
+    _, _, path = trained
+    reading = {"wind_speed": 5.0, "humidity": 70.0}
+    thresholds = {**THRESHOLDS, "wind_speed": [0.1, 0.5, 1.0]}
+    model = ScoringConfig(model=str(path), thresholds=thresholds).build_model()
+    result = model.score(reading)
+    assert result["parameters"]["wind_speed"] == 3
+    assert result["score"] == load_threat_model(str(path)).score(reading)["score"]
+    # The shared cached model keeps the built-in thresholds
+    assert load_threat_model(str(path)).score(reading)["parameters"]["wind_speed"] == 0
+
+
+def test_artifact_retrained_in_place_is_reloaded(trained, tmp_path):
+    """The load cache follows the artifact's content, not just its path."""
+    history, labels, _ = trained
+    path = train_logistic(history, labels).save(tmp_path / "model")
+    first = load_threat_model(str(path))
+
+    train_logistic(history, labels, l2=1.0).save(path)
+    second = load_threat_model(str(path))
+    assert second is not first
+    assert not np.allclose(second.coef, first.coef)
+    assert second is load_threat_model(str(path))
+
+
+def test_config_version_follows_retrained_artifact(trained, tmp_path):
+    history, labels, _ = trained
+    path = train_logistic(history, labels).save(tmp_path / "model")
+    before = ScoringConfig(model=str(path)).version
+    assert ScoringConfig(model=str(path)).version == before
+    train_logistic(history, labels, l2=1.0).save(path)
+    assert ScoringConfig(model=str(path)).version != before
+
+
+def test_logistic_single_matches_batch(trained):
+    """score() and score_batch() agree, including missing measurements."""
+    history, _, path = trained
+    model = LogisticThreatModel.load(path)
+    rows = history.iloc[::997].copy()
+    rows.iloc[0, rows.columns.get_loc("humidity")] = np.nan
+
+    batch = model.score_batch(rows)
+    single = [model.score(row.to_dict()) for _, row in rows.iterrows()]
+    np.testing.assert_allclose([r["score"] for r in single], batch)
+    assert single[0]["level"] in THREAT_LABELS.values()
+    assert set(single[0]["parameters"]) == set(THRESHOLDS)
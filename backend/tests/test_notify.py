@@ -0,0 +1,298 @@
+"""
+Pytest tests for the background alert dispatcher and its sinks.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import app as app_module
+from backend.app import app
+from backend.notify import FileSink, HttpSink, NotificationDispatcher, Sink, SinkError
+
+
+def _event(location_id, level, score=80.0, ts="2025-08-30 12:00:00"):
+    return (
+        location_id,
+        {"measurement_timestamp": ts},
+        {"score": score, "level": level, "parameters": {}},
+    )
+
+
+class RecordingSink(Sink):
+    """Keeps every batch in memory; fails the first `failures` sends."""
+
+    name = "memory"
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.batches = []
+        self.sent_at = []
+
+    async def send(self, address, alerts):
+        if self.failures > 0:
+            self.failures -= 1
+            raise SinkError("unavailable")
+        self.batches.append((address, alerts))
+        self.sent_at.append(time.monotonic())
+
+
+async def _run_for(dispatcher, seconds, events=()):
+    task = asyncio.create_task(dispatcher.run(tick_s=0.01))
+    await asyncio.sleep(0)
+    dispatcher.submit(list(events))
+    await asyncio.sleep(seconds)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def _dispatcher(routes, sink, **kwargs):
+    kwargs.setdefault("batch_interval_s", 0.05)
+    return NotificationDispatcher(routes, {"memory": sink}, **kwargs)
+
+
+def test_routes_by_level_and_location_and_coalesces():
+    """Each route gets one alert per location, at or above its level."""
+    sink = RecordingSink()
+    routes = [
+        {"id": "all", "sink": "memory", "address": "all"},
+        {
+            "id": "porbandar-danger",
+            "sink": "memory",
+            "address": "pb",
+            "min_level": "Danger",
+            "locations": ["PORBANDAR"],
+        },
+    ]
+    events = [
+        _event("PORBANDAR", "Warning", 60),
+        _event("PORBANDAR", "Danger", 90),
+        _event("PORBANDAR", "Warning", 55),
+        _event("DWARKA", "Caution", 30),
+        _event("VERAVAL", "Danger", 85),
+    ]
+    dispatcher = _dispatcher(routes, sink)
+    asyncio.run(_run_for(dispatcher, 0.3, events))
+
+    by_address = {address: alerts for address, alerts in sink.batches}
+    assert sorted(a["location_id"] for a in by_address["all"]) == [
+        "PORBANDAR",
+        "VERAVAL",
+    ]
+    porbandar = next(a for a in by_address["all"] if a["location_id"] == "PORBANDAR")
+    assert porbandar["level"] == "Warning"  # newest reading wins
+    assert porbandar["peak_score"] == 90
+    assert porbandar["coalesced"] == 3
+    # Only the Danger reading reached the Danger-only route
+    assert [a["score"] for a in by_address["pb"]] == [90]
+
+
+def test_retries_with_backoff_then_delivers():
+    """A failing sink is retried with growing delays until it accepts."""
+    sink = RecordingSink(failures=2)
+    dispatcher = _dispatcher(
+        [{"id": "r", "sink": "memory", "address": "r"}], sink, backoff_base_s=0.05
+    )
+    asyncio.run(_run_for(dispatcher, 0.6, [_event("PORBANDAR", "Danger")]))
+
+    assert len(sink.batches) == 1
+    assert dispatcher.stats["retries"] == 2
+    assert dispatcher.stats["sent_alerts"] == 1
+
+
+def test_exhausted_retries_go_to_dead_letters(tmp_path):
+    """Batches that keep failing are persisted, not lost."""
+    dead_letters = tmp_path / "dead.jsonl"
+    dispatcher = _dispatcher(
+        [{"id": "r", "sink": "memory", "address": "r"}],
+        RecordingSink(failures=100),
+        dead_letter_path=dead_letters,
+        max_attempts=3,
+        backoff_base_s=0.01,
+    )
+    asyncio.run(_run_for(dispatcher, 0.5, [_event("PORBANDAR", "Danger")]))
+
+    records = [json.loads(line) for line in dead_letters.read_text().splitlines()]
+    assert records[0]["route"] == "r"
+    assert records[0]["alerts"][0]["location_id"] == "PORBANDAR"
+
+
+def test_rate_limit_spaces_out_batches():
+    """A destination never gets more batches than its token bucket allows."""
+    sink = RecordingSink()
+    dispatcher = _dispatcher(
+        [
+            {
+                "id": "r",
+                "sink": "memory",
+                "address": "r",
+                "rate_per_min": 600,
+                "burst": 1,
+            }
+        ],
+        sink,
+        batch_interval_s=0.0,
+    )
+
+    async def scenario():
+        task = asyncio.create_task(dispatcher.run(tick_s=0.01))
+        await asyncio.sleep(0)
+        for i in range(3):
+            dispatcher.submit([_event(f"S{i}", "Danger")])
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.4)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    gaps = [b - a for a, b in zip(sink.sent_at, sink.sent_at[1:])]
+    assert sum(len(alerts) for _, alerts in sink.batches) == 3
+    assert all(gap >= 0.09 for gap in gaps)  # 600/min -> one batch per 0.1 s
+
+
+class StuckSink(Sink):
+    """Never finishes a send, like a destination that stopped responding."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.started = 0
+
+    async def send(self, address, alerts):
+        self.started += 1
+        await asyncio.Event().wait()
+
+
+def test_submit_never_blocks_and_drops_oldest():
+    """A full queue costs the oldest alerts, never the caller's time."""
+    sink = StuckSink()
+    dispatcher = _dispatcher(
+        [{"id": "r", "sink": "memory", "address": "r"}],
+        sink,
+        queue_size=10,
+        batch_interval_s=0.0,
+        shutdown_grace_s=0.0,
+    )
+
+    async def scenario():
+        task = asyncio.create_task(dispatcher.run(tick_s=0.01))
+        await asyncio.sleep(0)
+        dispatcher.submit([_event("S", "Danger")])
+        while not sink.started:
+            await asyncio.sleep(0.01)
+        # The sink is stuck; submit is plain synchronous code regardless
+        queued = dispatcher.submit([_event(f"S{i}", "Danger") for i in range(1000)])
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return queued
+
+    assert asyncio.run(scenario()) == 1000
+    assert dispatcher.stats["dropped"] == 990
+
+
+def test_sends_cancelled_at_shutdown_go_to_dead_letters(tmp_path):
+    """A send still in flight after the grace period is dead-lettered."""
+    dead_letters = tmp_path / "dead.jsonl"
+    sink = StuckSink()
+    dispatcher = _dispatcher(
+        [{"id": "r", "sink": "memory", "address": "r"}],
+        sink,
+        dead_letter_path=dead_letters,
+        batch_interval_s=0.0,
+        shutdown_grace_s=0.05,
+    )
+
+    async def scenario():
+        task = asyncio.create_task(dispatcher.run(tick_s=0.01))
+        await asyncio.sleep(0)
+        dispatcher.submit([_event("PORBANDAR", "Danger"), _event("DWARKA", "Danger")])
+        while not sink.started:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    records = [json.loads(line) for line in dead_letters.read_text().splitlines()]
+    assert len(records) == 1
+    assert records[0]["error"] == "send cancelled at shutdown"
+    assert {a["location_id"] for a in records[0]["alerts"]} == {"PORBANDAR", "DWARKA"}
+    assert dispatcher.stats["cancelled_sends"] == 1
+    assert dispatcher.stats["dead_letters"] == 2
+
+
+def test_http_and_file_sinks(tmp_path):
+    """The HTTP sink posts JSON batches; the file sink appends JSON lines."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append(json.loads(body))
+            self.send_response(200 if len(received) > 1 else 503)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/alerts"
+    alerts = [{"location_id": "PORBANDAR", "level": "Danger"}]
+
+    async def scenario():
+        sink = HttpSink()
+        with pytest.raises(SinkError):
+            await sink.send(url, alerts)
+        await sink.send(url, alerts)
+        await sink.close()
+        await FileSink().send(str(tmp_path / "alerts.jsonl"), alerts * 2)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        server.shutdown()
+    assert received[-1] == {"alerts": alerts}
+    assert len((tmp_path / "alerts.jsonl").read_text().splitlines()) == 2
+
+
+def test_ingested_danger_reading_raises_alert(tmp_path, monkeypatch):
+    """POST /readings hands Warning/Danger readings to the dispatcher."""
+    outbox = tmp_path / "outbox.jsonl"
+    monkeypatch.setattr(app_module, "PROCESSED_DATA_PATH", str(tmp_path / "p.csv"))
+    monkeypatch.setattr(
+        app_module,
+        "dispatcher",
+        NotificationDispatcher(
+            [{"id": "ops", "sink": "file", "address": str(outbox)}],
+            {"file": FileSink()},
+            batch_interval_s=0.05,
+        ),
+    )
+    storm = {
+        "location_id": "PORBANDAR",
+        "measurement_timestamp": "2025-08-30T12:00:00Z",
+        "humidity": 96,
+        "rain_intensity": 20,
+        "wind_speed": 40,
+        "maximum_wind_speed": 50,
+        "barometric_pressure": 1010,
+    }
+    with TestClient(app) as client:
+        response = client.post("/readings", json=[storm, {**storm, "wind_speed": 1}])
+        assert response.json()["max_level"] == "Danger"
+        for _ in range(100):
+            if outbox.exists():
+                break
+            time.sleep(0.02)
+        status = client.get("/alerts/status").json()
+    app_module.live_feed.clear()
+
+    alerts = [json.loads(line) for line in outbox.read_text().splitlines()]
+    assert [a["location_id"] for a in alerts] == ["PORBANDAR"]
+    assert alerts[0]["coalesced"] == 2
+    assert status["stats"]["sent_alerts"] == 1
@@ -0,0 +1,144 @@
+"""
+Pytest tests for the online nowcaster, its backtest and /threat/nowcast.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import app as app_module
+from backend.app import app
+from backend.benchmarks.datasets import synthetic_storm_history
+from backend.data_prep import PROCESSED_TIMESTAMP_FORMAT, TIMESTAMP_COL
+from backend.nowcast import Nowcaster, _sorted_history, backtest, project_history
+
+
+def _ramp(minutes, **slopes_per_h):
+    """Readings every 10 minutes whose values change linearly."""
+    start = pd.Timestamp("2025-08-30 09:00")
+    return [
+        {
+            TIMESTAMP_COL: start + pd.Timedelta(minutes=m),
+            **{
+                param: base + per_h * m / 60
+                for param, (base, per_h) in slopes_per_h.items()
+            },
+        }
+        for m in minutes
+    ]
+
+
+def test_linear_trend_is_extrapolated_and_clipped():
+    """A clean linear ramp projects exactly; physical limits still hold."""
+    nowcaster = Nowcaster()
+    for reading in _ramp(
+        range(0, 130, 10), barometric_pressure=(1000, -2), humidity=(90, 4)
+    ):
+        nowcaster.update("S", reading)
+
+    nowcast = nowcaster.project("S", [1, 3])
+    assert nowcast["as_of"] == pd.Timestamp("2025-08-30 11:00")
+    assert nowcast["trends"]["barometric_pressure"] == pytest.approx(-2)
+    assert nowcast["trends"]["wind_speed"] is None
+    (_, valid_at, one), (_, _, three) = nowcast["projections"]
+    assert valid_at == pd.Timestamp("2025-08-30 12:00")
+    assert one["barometric_pressure"] == pytest.approx(1000 - 2 * 3)
+    assert three["barometric_pressure"] == pytest.approx(1000 - 2 * 5)
+    assert three["humidity"] == 100  # 118% clipped
+    assert three["wind_speed"] is None
+
+
+def test_window_is_bounded_and_late_readings_are_ignored():
+    """Old readings drop out of the window; out-of-order ones are skipped."""
+    nowcaster = Nowcaster(window_h=1.0, max_points=100)
+    for reading in _ramp(range(0, 600, 10), wind_speed=(10, 1)):
+        assert nowcaster.update("S", reading)
+    assert nowcaster.project("S")["points"] == 6  # the last hour only
+    assert not nowcaster.update("S", _ramp([0], wind_speed=(50, 0))[0])
+
+    # Too few points to fit a line: the last value persists
+    nowcaster.update("T", _ramp([0], wind_speed=(12, 0))[0])
+    assert nowcaster.project("T", [2])["projections"][0][2]["wind_speed"] == 12
+
+
+def test_online_updates_match_vectorized_history():
+    """The backtest projects exactly what the live nowcaster would have."""
+    df = synthetic_storm_history(3000).assign(location_id="A")
+    df.loc[df.index % 3 == 0, "location_id"] = "B"
+    df.loc[df.index % 7 == 0, "humidity"] = np.nan
+    df = _sorted_history(df)
+    projected = project_history(df)
+
+    nowcaster = Nowcaster()
+    for i, reading in enumerate(df.to_dict("records")):
+        nowcaster.update(reading["location_id"], reading)
+        if i % 37 == 0:
+            live = nowcaster.project(reading["location_id"])["projections"]
+            for k, (_, _, values) in enumerate(live):
+                values = [np.nan if v is None else v for v in values.values()]
+                np.testing.assert_allclose(values, projected[k, i], atol=1e-8)
+
+
+def test_backtest_beats_persistence_on_storm_history():
+    parts = [
+        synthetic_storm_history(4000, seed=i).assign(location_id=f"S{i}")
+        for i in range(3)
+    ]
+    results = backtest(pd.concat(parts, ignore_index=True))
+    assert results["rows"] == 12_000
+    assert results["rows_per_s"] > 0
+    one_hour = results["1h"]
+    assert one_hour["pairs"] == 12_000 - 3 * 6  # the last hour has no outcome
+    assert one_hour["level_accuracy"] > one_hour["persistence_accuracy"]
+
+
+def test_nowcast_endpoint_projects_rising_wind(processed_path):
+    """Ingested readings feed the nowcast; the threat escalates with the trend."""
+    readings = [
+        {
+            "location_id": "PORBANDAR",
+            **{k: str(v) if k == TIMESTAMP_COL else v for k, v in r.items()},
+        }
+        for r in _ramp(
+            range(0, 130, 10), wind_speed=(0.5, 7), maximum_wind_speed=(16, 7)
+        )
+    ]
+    with TestClient(app) as client:
+        client.post("/readings", json=readings)
+        response = client.get("/threat/nowcast", params={"location_id": "PORBANDAR"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["window_points"] == 13
+        assert data["trends"]["wind_speed"] == pytest.approx(7)
+        assert [f["horizon_h"] for f in data["forecasts"]] == [1, 2, 3]
+        assert [f["parameters"]["wind_speed"] for f in data["forecasts"]] == [1, 2, 3]
+        scores = [f["score"] for f in data["forecasts"]]
+        assert scores == sorted(scores) and scores[0] < scores[-1]
+        assert data["config_version"] == app_module.scoring.version
+
+    # The stored history seeds the trends (and the default station) after
+    # a restart
+    app_module.live_feed.clear()
+    app_module.nowcaster.clear()
+    with TestClient(app) as client:
+        restarted = client.get("/threat/nowcast")
+        assert restarted.status_code == 200
+        assert restarted.json()["location_id"] == "PORBANDAR"
+        assert restarted.json()["window_points"] == 13
+        bad = client.get("/threat/nowcast", params={"horizon": 12})
+        assert bad.status_code == 422
+        missing = client.get("/threat/nowcast", params={"location_id": "NOWHERE"})
+        assert missing.status_code == 404
+
+
+def test_startup_seeds_from_history_without_location_ids(processed_path):
+    """A single-station CSV with no location_id column seeds as UNKNOWN."""
+    synthetic_storm_history(100).to_csv(
+        processed_path, index=False, date_format=PROCESSED_TIMESTAMP_FORMAT
+    )
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        response = client.get("/threat/nowcast", params={"location_id": "UNKNOWN"})
+        assert response.status_code == 200
+        assert response.json()["window_points"] == 18
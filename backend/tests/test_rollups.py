@@ -0,0 +1,213 @@
+"""
+Pytest tests for the threat rollup pyramid and the /threat/history endpoint.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import app as app_module
+from backend.app import app
+from backend import store
+from backend.data_prep import (
+    ROLLUP_FREQS,
+    RollupPyramid,
+    build_rollups,
+    load_rollups,
+    merge_rollups,
+    pick_rollup_freq,
+    rollup_dir,
+    save_rollups,
+)
+from backend.threat_model import RuleThreatModel
+
+
+def _history(rows: int = 3000, seed: int = 0) -> pd.DataFrame:
+    """Irregular readings from two stations over about four days."""
+    rng = np.random.default_rng(seed)
+    stamps = pd.Timestamp("2025-08-28") + pd.to_timedelta(
+        np.sort(rng.uniform(0, 4 * 86400, rows)), unit="s"
+    )
+    return pd.DataFrame(
+        {
+            "measurement_timestamp": stamps.floor("s"),
+            "location_id": rng.choice(["PORBANDAR", "DWARKA"], rows),
+            "air_temperature": rng.normal(28, 2, rows),
+            "humidity": rng.uniform(60, 100, rows),
+            "rain_intensity": rng.exponential(4, rows),
+            "wind_speed": rng.gamma(2, 8, rows),
+            "maximum_wind_speed": rng.gamma(2, 12, rows),
+            "barometric_pressure": rng.normal(1000, 10, rows),
+        }
+    ).astype({"humidity": "float32", "wind_speed": "float32"})
+
+
+def _brute_force(df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    scores = RuleThreatModel().score_batch(df)
+    return (
+        df.assign(score=scores, bucket=df["measurement_timestamp"].dt.floor(freq))
+        .groupby(["bucket", "location_id"])
+        .agg(
+            count=("score", "size"),
+            score_max=("score", "max"),
+            score_mean=("score", "mean"),
+            wind_max=("wind_speed", "max"),
+        )
+        .reset_index()
+    )
+
+
+@pytest.mark.parametrize("freq", ROLLUP_FREQS)
+def test_every_level_matches_raw_aggregation(freq):
+    """Each pyramid level equals aggregating the raw readings directly."""
+    df = _history()
+    level = build_rollups(df)[freq]
+    expected = _brute_force(df, freq)
+
+    assert list(level["bucket"]) == list(expected["bucket"])
+    assert list(level["count"]) == list(expected["count"])
+    np.testing.assert_allclose(level["score_max"], expected["score_max"])
+    np.testing.assert_allclose(
+        level["score_sum"] / level["count"], expected["score_mean"]
+    )
+    np.testing.assert_allclose(level["wind_speed_max"], expected["wind_max"])
+
+
+def test_incremental_updates_match_full_build():
+    """Merging rollups batch by batch gives the same pyramid as one build."""
+    df = _history()
+    full = build_rollups(df)
+
+    pyramid = RollupPyramid()
+    scores = RuleThreatModel().score_batch(df)
+    for batch in np.array_split(np.arange(len(df)), 7):
+        pyramid.update(df.iloc[batch], scores[batch])
+
+    for freq in ROLLUP_FREQS:
+        pd.testing.assert_frame_equal(pyramid.levels[freq], full[freq])
+
+
+def test_late_data_is_merged_into_old_buckets():
+    """A batch older than the newest bucket still lands in the right place."""
+    df = _history()
+    late = df.iloc[::50]
+    on_time = df.drop(late.index)
+    merged = merge_rollups(build_rollups(on_time), build_rollups(late))
+    pd.testing.assert_frame_equal(merged["1h"], build_rollups(df)["1h"])
+
+
+def test_query_picks_coarsest_dividing_level():
+    """Zoomed-out queries read the daily level; other widths re-bucket."""
+    assert pick_rollup_freq("30s") == "1min"
+    assert pick_rollup_freq("10min") == "10min"
+    assert pick_rollup_freq("90min") == "10min"
+    assert pick_rollup_freq("45min") == "1min"
+    assert pick_rollup_freq("6h") == "1h"
+    assert pick_rollup_freq("7D") == "1D"
+    with pytest.raises(ValueError):
+        pick_rollup_freq("90s")
+
+    df = _history()
+    pyramid = RollupPyramid(build_rollups(df))
+    for resolution in ("6h", "90min"):
+        rows = pyramid.query("2025-08-28", "2025-09-01", resolution, "DWARKA")
+        expected = _brute_force(df, resolution)
+        expected = expected[expected["location_id"] == "DWARKA"]
+        assert list(rows["bucket"]) == list(expected["bucket"])
+        assert list(rows["count"]) == list(expected["count"])
+        np.testing.assert_allclose(rows["mean_score"], expected["score_mean"])
+
+    daily = pyramid.query("2025-08-29", "2025-08-31", "1D")
+    assert list(daily["bucket"]) == list(pd.to_datetime(["2025-08-29", "2025-08-30"]))
+    assert daily["count"].sum() == (
+        df["measurement_timestamp"].between("2025-08-29", "2025-08-31", "left").sum()
+    )
+
+
+def test_rollups_round_trip_and_check_the_config_version(tmp_path):
+    levels = build_rollups(_history())
+    save_rollups(levels, tmp_path / "rollups", rows=3000, version="v1")
+
+    loaded, rows = load_rollups(tmp_path / "rollups", "v1")
+    assert rows == 3000
+    for freq in ROLLUP_FREQS:
+        pd.testing.assert_frame_equal(loaded[freq], levels[freq])
+    assert load_rollups(tmp_path / "rollups", "v2") is None
+    assert load_rollups(tmp_path / "missing", "v1") is None
+
+
+def test_startup_loads_persisted_rollups(processed_path, monkeypatch):
+    """Only readings appended after the saved rollups are scored at startup."""
+    df = _history()
+    prepped, appended = df.iloc[:2000], df.iloc[2000:]
+    store.append_readings(prepped, processed_path)
+    save_rollups(
+        build_rollups(prepped),
+        rollup_dir(processed_path),
+        rows=len(prepped),
+        version=app_module.scoring.version,
+    )
+    store.append_readings(appended, processed_path)
+
+    model = app_module.scoring.model
+    scored = []
+    score_batch = model.score_batch
+
+    def counting_score_batch(readings):
+        scored.append(len(readings))
+        return score_batch(readings)
+
+    monkeypatch.setattr(model, "score_batch", counting_score_batch)
+    with TestClient(app):
+        assert scored == [len(appended)]
+        pd.testing.assert_frame_equal(
+            app_module.rollups.levels["1h"], build_rollups(df)["1h"]
+        )
+
+
+def test_history_endpoint_includes_flushed_readings(processed_path):
+    """Ingested readings show up in /threat/history once they are flushed."""
+    batch = [
+        {
+            "location_id": "PORBANDAR",
+            "measurement_timestamp": f"2025-08-30T{hour:02d}:{minute:02d}:00Z",
+            "wind_speed": 10 + hour,
+            "maximum_wind_speed": 20,
+        }
+        for hour in range(3)
+        for minute in (0, 30)
+    ]
+    with TestClient(app) as client:
+        client.post("/readings", json=batch)
+        app_module.ingest_buffer.flush()
+
+        response = client.get(
+            "/threat/history",
+            params={
+                "start": "2025-08-30T00:00:00Z",
+                "end": "2025-08-31T00:00:00Z",
+                "resolution": "1h",
+                "location_id": "PORBANDAR",
+            },
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["rollup"] == "1h"
+        assert [b["count"] for b in data["buckets"]] == [2, 2, 2]
+        assert [b["parameter_maxima"]["wind_speed"] for b in data["buckets"]] == [
+            10,
+            11,
+            12,
+        ]
+
+        bad = client.get(
+            "/threat/history",
+            params={"start": "2025-08-30", "end": "2025-08-31", "resolution": "soon"},
+        )
+        assert bad.status_code == 422
+        uneven = client.get(
+            "/threat/history",
+            params={"start": "2025-08-30", "end": "2025-08-31", "resolution": "90s"},
+        )
+        assert uneven.status_code == 422
@@ -0,0 +1,186 @@
+"""
+Pytest tests for the hot-reloadable scoring config and background rescoring.
+"""
+
+import json
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from backend import app as app_module
+from backend.app import app
+from backend.benchmarks.datasets import synthetic_storm_history
+from backend.config import THRESHOLDS, WEIGHTS
+from backend.scoring_config import (
+    RescoreCancelled,
+    RescoreJob,
+    ScoringConfig,
+    ScoringState,
+    rescore_history,
+)
+from backend.threat_model import RuleThreatModel
+
+# Every wind reading above 1 m/s is Danger under this config
+TWITCHY = {
+    "version": "twitchy",
+    "thresholds": {**THRESHOLDS, "wind_speed": [0.1, 0.5, 1.0]},
+    "weights": WEIGHTS,
+}
+
+
+def test_config_validation():
+    """Bad thresholds or weights are rejected; versions follow the content."""
+    with pytest.raises(ValidationError):
+        ScoringConfig(thresholds={**THRESHOLDS, "wind_speed": [12, 40, 35]})
+    with pytest.raises(ValidationError):
+        ScoringConfig(thresholds={**THRESHOLDS, "wind_speed": [12, 22]})
+    with pytest.raises(ValidationError):
+        ScoringConfig(thresholds={"tide": [1, 2, 3]}, weights={"tide": 1})
+    with pytest.raises(ValidationError):
+        ScoringConfig(weights={**WEIGHTS, "humidity": -1})
+
+    assert ScoringConfig().version == ScoringConfig().version
+    assert (
+        ScoringConfig().version != ScoringConfig(**{**TWITCHY, "version": None}).version
+    )
+    assert ScoringConfig(**TWITCHY).version == "twitchy"
+
+
+def test_rescore_history_matches_batch_and_reports_progress():
+    """Chunked pool rescoring equals one score_batch call."""
+    df = synthetic_storm_history(10_000)
+    model = ScoringConfig(**TWITCHY).build_model()
+    job = RescoreJob(ScoringConfig(**TWITCHY))
+
+    scores = rescore_history(df, model, job, chunk_rows=999, workers=3)
+    np.testing.assert_array_equal(scores, model.score_batch(df))
+    assert job.as_dict()["rescored_rows"] == 10_000
+
+    job.cancelled = True
+    with pytest.raises(RescoreCancelled):
+        rescore_history(df, model, job, chunk_rows=999)
+
+
+def test_state_swaps_config_and_model_together():
+    state = ScoringState(ScoringConfig())
+    new = ScoringConfig(**TWITCHY)
+    state.swap(new, new.build_model())
+    assert state.version == "twitchy"
+    assert state.model.thresholds["wind_speed"] == [0.1, 0.5, 1.0]
+
+
+ADMIN = {"X-Admin-Token": "s3cret"}
+
+
+@pytest.fixture
+def fresh_app(processed_path, monkeypatch):
+    """App with an empty store, the built-in scoring config and an admin token."""
+    monkeypatch.setattr(app_module, "scoring", ScoringState(ScoringConfig()))
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", ADMIN["X-Admin-Token"])
+    return processed_path.parent
+
+
+def _wait_for_rescore(client, timeout_s=10):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        status = client.get("/admin/scoring-config", headers=ADMIN).json()
+        if status["rescore"]["state"] not in ("pending", "running"):
+            return status
+        time.sleep(0.02)
+    raise AssertionError("rescore did not finish")
+
+
+READING = {
+    "location_id": "PORBANDAR",
+    "measurement_timestamp": "2025-08-30T12:00:00Z",
+    "wind_speed": 5,
+}
+
+
+def test_put_config_rescores_then_swaps(fresh_app):
+    """The new config goes live after rescoring, on responses and history."""
+    builtin = app_module.scoring.version
+    history = {
+        "start": "2025-08-30T00:00:00Z",
+        "end": "2025-08-31T00:00:00Z",
+        "resolution": "1D",
+    }
+    with TestClient(app) as client:
+        client.post("/readings", json=READING)
+        app_module.ingest_buffer.flush()
+        before = client.get("/threat/history", params=history).json()
+        assert before["config_version"] == builtin
+        assert before["buckets"][0]["worst_level"] == "Safe"
+
+        response = client.put("/admin/scoring-config", json=TWITCHY, headers=ADMIN)
+        assert response.status_code == 202
+        status = _wait_for_rescore(client)
+        assert status["rescore"]["state"] == "complete"
+        assert status["rescore"]["rows"] == 1
+        assert status["active"]["version"] == "twitchy"
+
+        latest = client.get("/threat/latest", params={"location_id": "PORBANDAR"})
+        assert latest.headers["X-Scoring-Config-Version"] == "twitchy"
+        assert latest.json()["config_version"] == "twitchy"
+        assert latest.json()["parameters"]["wind_speed"] == 3
+
+        after = client.get("/threat/history", params=history).json()
+        assert after["buckets"][0]["max_score"] > before["buckets"][0]["max_score"]
+
+
+def test_invalid_config_keeps_serving_old_version(fresh_app):
+    version = app_module.scoring.version
+    with TestClient(app) as client:
+        bad = {**TWITCHY, "weights": {"wind_speed": 1}}
+        response = client.put("/admin/scoring-config", json=bad, headers=ADMIN)
+        assert response.status_code == 422
+        assert client.get("/health").headers["X-Scoring-Config-Version"] == version
+
+
+def test_admin_token_is_enforced(fresh_app):
+    with TestClient(app) as client:
+        assert client.get("/admin/scoring-config").status_code == 403
+        wrong = client.get("/admin/scoring-config", headers={"X-Admin-Token": "no"})
+        assert wrong.status_code == 403
+        ok = client.get("/admin/scoring-config", headers=ADMIN)
+        assert ok.status_code == 200
+
+
+def test_admin_endpoints_are_closed_without_a_token(fresh_app, monkeypatch):
+    """With no ADMIN_TOKEN configured, nobody can change the scoring config."""
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", None)
+    version = app_module.scoring.version
+    with TestClient(app) as client:
+        responses = [
+            client.get("/admin/scoring-config"),
+            client.put("/admin/scoring-config", json=TWITCHY),
+            client.post("/admin/scoring-config/reload"),
+            client.put("/admin/scoring-config", json=TWITCHY, headers=ADMIN),
+        ]
+        assert [r.status_code for r in responses] == [403] * 4
+        assert "ADMIN_TOKEN" in responses[0].json()["detail"]
+    assert app_module.scoring.version == version
+
+
+def test_config_file_is_watched(fresh_app, monkeypatch):
+    """Editing the config file hot-reloads it; invalid edits are ignored."""
+    path = fresh_app / "scoring.json"
+    path.write_text(json.dumps({"version": "v1"}))
+    monkeypatch.setattr(app_module, "SCORING_CONFIG_PATH", str(path))
+    monkeypatch.setattr(app_module, "SCORING_WATCH_INTERVAL_S", 0.02)
+
+    with TestClient(app) as client:
+        time.sleep(0.1)
+        path.write_text("{not json")
+        time.sleep(0.1)
+        assert app_module.scoring.version != "v2"
+
+        path.write_text(json.dumps({**TWITCHY, "version": "v2"}))
+        deadline = time.monotonic() + 10
+        while app_module.scoring.version != "v2" and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert client.get("/health").headers["X-Scoring-Config-Version"] == "v2"
+        assert isinstance(app_module.scoring.model, RuleThreatModel)
@@ -0,0 +1,147 @@
+"""
+Pytest tests for the synthetic multi-station sensor network.
+"""
+
+import asyncio
+
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend import app as app_module
+from backend import store
+from backend.data_prep import PROCESSED_COLUMNS, TIMESTAMP_COL
+from backend.sensor_simulator import (
+    SyntheticStationNetwork,
+    push_synthetic,
+    write_synthetic,
+)
+
+
+def _network(**kwargs):
+    kwargs.setdefault("start", "2025-08-30")
+    return SyntheticStationNetwork(**kwargs)
+
+
+def test_readings_are_seeded_and_paced_by_rate():
+    """Same seed, same readings; each station reports every stations/rate s."""
+    first = _network(stations=20, rate=10, seed=3)
+    second = _network(stations=20, rate=10, seed=3)
+    batches = [first.generate(n) for n in (50, 150)]
+    pd.testing.assert_frame_equal(
+        pd.concat(batches, ignore_index=True),
+        pd.concat([second.generate(50), second.generate(150)], ignore_index=True),
+    )
+    assert not _network(stations=20, rate=10, seed=4).generate(200).equals(batches[0])
+
+    df = pd.concat(batches, ignore_index=True)
+    assert list(df.columns) == PROCESSED_COLUMNS
+    assert df["location_id"].nunique() == 20
+    assert df[TIMESTAMP_COL].is_monotonic_increasing
+    assert df[TIMESTAMP_COL].iloc[-1] - df[TIMESTAMP_COL].iloc[0] == pd.Timedelta(
+        seconds=199 / 10
+    )
+    station = df[df["location_id"] == "SYN0007"]
+    assert (station[TIMESTAMP_COL].diff().dropna() == pd.Timedelta(seconds=2)).all()
+
+
+def test_storms_bring_pressure_troughs_gusts_and_rain():
+    """At a station, the lowest-pressure hours are the windy, rainy ones."""
+    network = _network(stations=10, rate=10 / 600, storm_every_h=24)
+    df = network.generate(10 * 6 * 24 * 10)  # ten days of ten-minute readings
+    station = df[df["location_id"] == "SYN0000"]
+    stormy = station["barometric_pressure"] < station["barometric_pressure"].quantile(
+        0.05
+    )
+
+    assert station["barometric_pressure"].min() < 995
+    assert station["wind_speed"][stormy].mean() > 3 * station["wind_speed"].median()
+    assert (station["rain_intensity"][stormy] > 0).mean() > 0.5
+    assert (station["maximum_wind_speed"] >= station["wind_speed"]).all()
+    assert station["humidity"].between(0, 100).all()
+
+
+def test_stream_is_paced_to_the_wall_clock():
+    """Real-time batches wait until their newest reading is due."""
+    network = _network(stations=5, rate=2000)
+    now = [100.0]
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    async def collect(realtime):
+        stream = network.stream(
+            0.05,
+            realtime=realtime,
+            total=400,
+            clock=lambda: now[0],
+            sleep=fake_sleep,
+        )
+        return [b async for b in stream]
+
+    batches = asyncio.run(collect(realtime=True))
+    assert [len(b) for b in batches] == [100] * 4
+    # 400 readings at 2000/s, released 0.05 s apart
+    assert sleeps == pytest.approx([0.05] * 4)
+    assert now[0] == pytest.approx(100.2)
+
+    sleeps.clear()
+    assert sum(len(b) for b in asyncio.run(collect(realtime=False))) == 400
+    assert sleeps == [0] * 4
+
+
+@pytest.mark.parametrize("name", ["synthetic.csv", "synthetic.db"])
+def test_file_writer_fills_a_store(tmp_path, name):
+    path = tmp_path / name
+    assert write_synthetic(_network(stations=7), path, 1000, chunk_rows=300) == 1000
+    stored = store.load_readings(path)
+    assert len(stored) == 1000
+    assert stored["location_id"].nunique() == 7
+    assert store.latest_per_location(path)["latitude"].notna().all()
+
+
+@pytest.mark.parametrize("name", ["synthetic.csv", "synthetic.db"])
+def test_sub_second_readings_round_trip(tmp_path, name):
+    """Stations reporting several times a second keep distinct timestamps."""
+    path = tmp_path / name
+    network = _network(stations=4, rate=40, seed=1)
+    expected = _network(stations=4, rate=40, seed=1).generate(400)
+    write_synthetic(network, path, 400)
+
+    stored = store.load_readings(path)
+    assert not stored.duplicated(["location_id", TIMESTAMP_COL]).any()
+    pd.testing.assert_series_equal(
+        stored[TIMESTAMP_COL].reset_index(drop=True),
+        expected[TIMESTAMP_COL],
+        check_names=False,
+    )
+    # 40 readings per second; range bounds are exact to the microsecond
+    second = store.readings_between("2025-08-30 00:00:01", "2025-08-30 00:00:02", path)
+    assert len(second) == 40
+    half = store.readings_between("2025-08-30 00:00:01.5", "2025-08-30 00:00:02", path)
+    assert len(half) == 20
+
+
+def test_http_pusher_feeds_the_ingest_endpoint(processed_path):
+    """Pushed readings are accepted and show up as live stations."""
+    network = SyntheticStationNetwork(stations=25, rate=1000)
+
+    async def push():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://api"
+        ) as client:
+            return await push_synthetic(network, "http://api", 0.2, client=client)
+
+    stats = asyncio.run(push())
+    assert stats["sent"] == stats["accepted"] == 200
+    assert stats["errors"] == stats["rejected"] == 0
+    assert len(app_module.live_feed.latest) == 25
+    assert len(app_module.station_index) == 25
+    assert app_module.ingest_buffer.pending == 200
+    assert np.isclose(
+        app_module.live_feed.latest["SYN0003"][0]["latitude"], network.latitude[3]
+    )
@@ -0,0 +1,197 @@
+"""
+Pytest tests for the station spatial index and the nearby/bbox endpoints.
+"""
+
+import random
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import app as app_module
+from backend.app import app
+from backend.data_prep import (
+    PROCESSED_COLUMNS,
+    PROCESSED_SCHEMA,
+    TIMESTAMP_COL,
+    read_processed,
+)
+from backend.spatial import StationIndex, haversine_km
+from backend.threat_model import calculate_threat_score
+
+STATIONS = {
+    "PORBANDAR": (21.64, 69.61),
+    "DWARKA": (22.24, 68.97),
+    "VERAVAL": (20.91, 70.37),
+    "MUMBAI": (18.94, 72.84),
+}
+
+
+def _reading(location_id, **values):
+    lat, lon = STATIONS[location_id]
+    return {
+        "location_id": location_id,
+        "measurement_timestamp": "2025-08-30T12:00:00Z",
+        "latitude": lat,
+        "longitude": lon,
+        **values,
+    }
+
+
+def test_nearby_matches_brute_force():
+    """Grid lookups return exactly the stations a full scan would, nearest first."""
+    rng = random.Random(7)
+    index = StationIndex()
+    points = {f"S{i}": (rng.uniform(5, 35), rng.uniform(60, 95)) for i in range(2000)}
+    for sid, (lat, lon) in points.items():
+        index.add(sid, lat, lon)
+
+    for _ in range(20):
+        lat, lon = rng.uniform(5, 35), rng.uniform(60, 95)
+        radius = rng.choice([10, 100, 400])
+        expected = sorted(
+            (float(haversine_km(lat, lon, p[0], p[1])), sid)
+            for sid, p in points.items()
+            if haversine_km(lat, lon, p[0], p[1]) <= radius
+        )
+        found = index.nearby(lat, lon, radius)
+        assert [sid for sid, _ in found] == [sid for _, sid in expected]
+
+
+def test_index_moves_and_removes_stations():
+    """Re-adding a station moves it; unchanged positions are no-ops."""
+    index = StationIndex()
+    assert index.add("A", 21.6, 69.6)
+    assert not index.add("A", 21.6, 69.6)
+    assert index.add("A", 18.9, 72.8)
+    assert index.within_bbox(21, 69, 22, 70) == []
+    assert index.within_bbox(18, 72, 19, 73) == ["A"]
+    index.remove("A")
+    assert len(index) == 0
+    with pytest.raises(ValueError):
+        index.add("B", 95, 0)
+
+
+def test_nearby_query_only_visits_nearby_cells():
+    """A 50 km query over 10k stations reads a few cells, not every station."""
+    rng = random.Random(3)
+    index = StationIndex()
+    for i in range(10_000):
+        index.add(f"S{i}", rng.uniform(-60, 60), rng.uniform(-180, 180))
+
+    visited = []
+    candidates = index._candidates
+
+    def counting_candidates(*box):
+        found = candidates(*box)
+        visited.append(len(found))
+        return found
+
+    index._candidates = counting_candidates
+    for _ in range(200):
+        index.nearby(rng.uniform(-60, 60), rng.uniform(-180, 180), 50)
+    # ~0.06 stations per 0.5° cell; a full scan would read all 10k
+    assert len(visited) == 200 and max(visited) < 20
+
+
+def test_nearby_endpoint_returns_latest_threat(processed_path):
+    """/threat/nearby lists stations in range with their latest scores."""
+    storm = _reading(
+        "PORBANDAR",
+        humidity=96,
+        rain_intensity=20,
+        wind_speed=40,
+        maximum_wind_speed=50,
+    )
+    with TestClient(app) as client:
+        client.post(
+            "/readings",
+            json=[storm, _reading("DWARKA", wind_speed=5), _reading("MUMBAI")],
+        )
+        response = client.get(
+            "/threat/nearby", params={"lat": 21.64, "lon": 69.61, "radius": 150}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [s["location_id"] for s in data] == ["PORBANDAR", "DWARKA"]
+        assert data[0]["distance_km"] == 0
+        assert data[0]["score"] == calculate_threat_score(storm)["score"]
+        assert data[1]["distance_km"] > 0
+
+        limited = client.get(
+            "/threat/nearby",
+            params={"lat": 21.64, "lon": 69.61, "radius": 150, "limit": 1},
+        )
+        assert len(limited.json()) == 1
+
+        assert (
+            client.get("/threat/nearby", params={"lat": 91, "lon": 0}).status_code
+            == 422
+        )
+
+
+def test_bbox_endpoint(processed_path):
+    """/threat/bbox returns every station inside the box."""
+    with TestClient(app) as client:
+        client.post("/readings", json=[_reading(s) for s in STATIONS])
+        response = client.get(
+            "/threat/bbox",
+            params={"min_lat": 20, "min_lon": 68, "max_lat": 23, "max_lon": 71},
+        )
+        assert response.status_code == 200
+        assert [s["location_id"] for s in response.json()] == [
+            "DWARKA",
+            "PORBANDAR",
+            "VERAVAL",
+        ]
+
+        inverted = client.get(
+            "/threat/bbox",
+            params={"min_lat": 23, "min_lon": 68, "max_lat": 20, "max_lon": 71},
+        )
+        assert inverted.status_code == 422
+
+
+def test_index_is_rebuilt_from_store_on_startup(processed_path):
+    """Stations persisted by the ingest path are indexed again after a restart."""
+    with TestClient(app) as client:
+        client.post("/readings", json=[_reading("VERAVAL", wind_speed=12)])
+    app_module.live_feed.clear()
+    app_module.station_index.clear()
+
+    with TestClient(app) as client:
+        data = client.get(
+            "/threat/nearby", params={"lat": 20.9, "lon": 70.4, "radius": 20}
+        ).json()
+        assert [s["location_id"] for s in data] == ["VERAVAL"]
+        assert data[0]["score"] is not None
+
+
+def test_legacy_csv_store_keeps_station_fields(processed_path):
+    """A store written before station columns existed is migrated on append."""
+    legacy = pd.DataFrame(
+        {TIMESTAMP_COL: ["2025-08-29 12:00:00"], **{c: [1.0] for c in PROCESSED_SCHEMA}}
+    )
+    legacy.to_csv(processed_path, index=False)
+    with TestClient(app) as client:
+        client.post("/readings", json=[_reading("VERAVAL", wind_speed=12)])
+    app_module.live_feed.clear()
+    app_module.station_index.clear()
+    app_module.nowcaster.clear()
+
+    stored = read_processed(processed_path)
+    assert list(stored.columns) == PROCESSED_COLUMNS
+    assert stored[TIMESTAMP_COL].tolist() == [
+        pd.Timestamp("2025-08-29 12:00:00"),
+        pd.Timestamp("2025-08-30 12:00:00"),
+    ]
+    assert stored["location_id"].isna().tolist() == [True, False]
+    assert stored["latitude"].iloc[1] == STATIONS["VERAVAL"][0]
+
+    with TestClient(app) as client:
+        data = client.get(
+            "/threat/nearby", params={"lat": 20.9, "lon": 70.4, "radius": 20}
+        ).json()
+        assert [s["location_id"] for s in data] == ["VERAVAL"]
+        nowcast = client.get("/threat/nowcast", params={"location_id": "VERAVAL"})
+        assert nowcast.status_code == 200
@@ -0,0 +1,142 @@
+"""
+Pytest tests for the processed-data store (CSV and SQLite backends).
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend import store
+
+
+def _readings(n=48, location_id="PORBANDAR", start="2025-08-30"):
+    return pd.DataFrame(
+        {
+            "location_id": location_id,
+            "measurement_timestamp": pd.date_range(start, periods=n, freq="h"),
+            "air_temperature": np.linspace(25, 30, n),
+            "humidity": np.full(n, 85.0),
+            "rain_intensity": np.arange(n, dtype=float),
+            "wind_speed": np.arange(n, dtype=float),
+            "maximum_wind_speed": np.arange(n, dtype=float) + 5,
+            "barometric_pressure": np.full(n, 1000.5),
+        }
+    )
+
+
+@pytest.fixture(params=["processed.csv", "processed.db"])
+def store_path(request, tmp_path):
+    path = tmp_path / request.param
+    store.append_readings(_readings(), path)
+    yield path
+    if store.is_sqlite_path(path):
+        store.get_sqlite_store(path).close()
+
+
+def test_latest_reading(store_path):
+    latest = store.latest_reading(store_path)
+    assert latest["measurement_timestamp"] == pd.Timestamp("2025-08-31 23:00")
+    assert latest["wind_speed"] == 47.0
+    assert latest["barometric_pressure"] == 1000.5
+
+
+def test_range_and_aggregate(store_path):
+    start, end = "2025-08-30 10:00", "2025-08-30 20:00"
+    df = store.readings_between(start, end, store_path)
+    assert len(df) == 10
+    assert df["wind_speed"].tolist() == list(range(10, 20))
+    assert df["wind_speed"].dtype == "float32"
+
+    agg = store.aggregate_readings(start, end, store_path)
+    assert agg["count"] == 10
+    assert agg["wind_speed"] == {"min": 10.0, "max": 19.0, "mean": 14.5}
+
+
+def test_sqlite_filters_by_location(tmp_path):
+    path = tmp_path / "readings.db"
+    store.append_readings(_readings(location_id="DWARKA"), path)
+    store.append_readings(_readings(n=3, location_id="OKHA"), path)
+
+    assert store.latest_reading(path, "OKHA")["wind_speed"] == 2.0
+    assert store.latest_reading(path, "DWARKA")["wind_speed"] == 47.0
+    assert store.latest_reading(path, "NOWHERE") is None
+    assert len(store.load_readings(path, "OKHA")) == 3
+
+
+def test_sqlite_queries_use_index(tmp_path):
+    """The store's own latest/range/aggregate queries never scan the table."""
+    path = tmp_path / "readings.db"
+    sqlite_store = store.get_sqlite_store(path)
+    sqlite_store.append(_readings(n=5))
+    executed = []
+    # The pool is LIFO, so the calls below reuse this traced connection
+    with sqlite_store.connection() as conn:
+        conn.set_trace_callback(executed.append)
+
+    sqlite_store.latest("PORBANDAR")
+    sqlite_store.latest_per_location()
+    sqlite_store.between("2025-08-30", "2025-08-31", "PORBANDAR")
+    sqlite_store.between("2025-08-30", "2025-08-31")
+    sqlite_store.aggregate("2025-08-30", "2025-08-31", "PORBANDAR")
+    with sqlite_store.connection() as conn:
+        conn.set_trace_callback(None)
+        plans = [
+            [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            for sql in executed
+            if sql.startswith("SELECT")
+        ]
+
+    assert len(plans) == 5
+    for plan in plans:
+        assert any("USING" in step and "INDEX idx_readings_" in step for step in plan)
+        scans = [step for step in plan if step.startswith("SCAN r")]
+        assert all("USING COVERING INDEX" in step for step in scans), plan
+
+
+def test_missing_location_reads_back_the_same_from_both_backends(tmp_path):
+    """A reading without a station id is UNKNOWN whichever backend stores it."""
+    readings = _readings(n=3)
+    readings["location_id"] = [None, "OKHA", None]
+    for name in ("processed.csv", "processed.db"):
+        path = tmp_path / name
+        store.append_readings(readings, path)
+        loaded = store.load_readings(path)
+        assert loaded["location_id"].tolist() == ["UNKNOWN", "OKHA", "UNKNOWN"]
+        latest = store.latest_per_location(path).set_index("location_id")
+        assert sorted(latest.index) == ["OKHA", "UNKNOWN"]
+        assert latest.loc["UNKNOWN", "wind_speed"] == 2.0
+        assert store.latest_reading(path, "UNKNOWN")["wind_speed"] == 2.0
+
+
+def test_sqlite_concurrent_read_and_append(tmp_path):
+    """Readers always see whole batches while a writer appends."""
+    path = tmp_path / "readings.db"
+    batch = 50
+    errors = []
+
+    def writer():
+        for i in range(20):
+            start = pd.Timestamp("2025-09-01") + pd.Timedelta(days=i)
+            store.append_readings(_readings(n=batch, start=start), path)
+
+    def reader():
+        try:
+            for _ in range(50):
+                count = store.aggregate_readings("2000", "2100", path)["count"]
+                assert count % batch == 0
+        except Exception as e:
+            errors.append(e)
+
+    store.get_sqlite_store(path)
+    threads = [threading.Thread(target=writer)] + [
+        threading.Thread(target=reader) for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert store.aggregate_readings("2000", "2100", path)["count"] == 20 * batch
@@ -1,117 +1,3 @@
-# """
-# Threat model v0 (rule-based).
-# Contains calculate_threat_score() which accepts a dict of sensor values and
-# returns a dictionary:
-# {
-#   "score": int,               # 0-100
-#   "threat_level": "SAFE"|"WATCH"|...,
-#   "components": {...},        # normalized component contributions
-#   "anomaly_flags": {...},     # optional zscores or flags
-#   "explanation": str,
-#   "raw_params": {...}
-# }
-# This is intended to be simple and interpretable.
-# """
-
-# from typing import Dict, Any
-# import numpy as np
-# from .config import WEIGHTS, CLIPS, THRESHOLDS
-
-
-# def _clip_and_norm(value: float, key: str) -> float:
-#     """Clip a sensor value to domain and normalize to 0-1 (linear)."""
-#     if value is None or (isinstance(value, float) and np.isnan(value)):
-#         return 0.0
-#     lo, hi = CLIPS.get(key, (0.0, 1.0))
-#     v = float(value)
-#     v_clipped = max(lo, min(hi, v))
-#     # protect against division by zero
-#     denom = hi - lo if hi - lo != 0 else 1.0
-#     return (v_clipped - lo) / denom
-
-
-# def _map_score_to_level(score: int) -> str:
-#     """Map integer 0-100 to threat level string."""
-#     for level, (lo, hi) in THRESHOLDS.items():
-#         if lo <= score <= hi:
-#             return level
-#     # fallback
-#     if score < 0:
-#         return "SAFE"
-#     return "DANGER"
-
-
-# def calculate_threat_score(sensor_payload: Dict[str, Any]) -> Dict[str, Any]:
-#     """
-#     Compute a 0-100 threat score for a single timestamp/location.
-
-#     sensor_payload: expected keys (some optional)
-#         - wind_speed_m_s, wave_height_m, tide_level_m, turbidity_ntu,
-#           chlorophyll, sst (sea surface temp)
-#     """
-#     # Normalize inputs to 0-1
-#     norm = {
-#         "wind": _clip_and_norm(sensor_payload.get("wind_speed_m_s"), "wind_speed_m_s"),
-#         "wave": _clip_and_norm(sensor_payload.get("wave_height_m"), "wave_height_m"),
-#         "tide": _clip_and_norm(sensor_payload.get("tide_level_m"), "tide_level_m"),
-#         "turbidity": _clip_and_norm(
-#             sensor_payload.get("turbidity_ntu"), "turbidity_ntu"
-#         ),
-#         "chlorophyll": _clip_and_norm(sensor_payload.get("chlorophyll"), "chlorophyll"),
-#         "sst": _clip_and_norm(sensor_payload.get("sst"), "sst"),
-#     }
-
-#     # Physical and environmental aggregates using configured weights
-#     phys_w = WEIGHTS["physical_components"]
-#     env_w = WEIGHTS["env_components"]
-
-#     physical_score = (
-#         phys_w["wind"] * norm["wind"]
-#         + phys_w["wave"] * norm["wave"]
-#         + phys_w["tide"] * norm["tide"]
-#     )
-#     env_score = (
-#         env_w["turbidity"] * norm["turbidity"]
-#         + env_w["chlorophyll"] * norm["chlorophyll"]
-#         + env_w["sst"] * norm["sst"]
-#     )
-
-#     base = WEIGHTS["physical"] * physical_score + WEIGHTS["env"] * env_score
-
-#     # Simple anomaly boost: check rapid increases using available keys (placeholder)
-#     # For initial commit, we use a naive boost: if any normalized value > 0.9, add small boost
-#     anomaly_indicator = max(list(norm.values()))
-#     anomaly_boost = WEIGHTS["anomaly"] * (
-#         1.0 if anomaly_indicator > 0.95 else (anomaly_indicator / 3.0)
-#     )
-
-#     raw_score = base + anomaly_boost
-#     # Ensure between 0 and 1
-#     raw_score = max(0.0, min(1.0, raw_score))
-#     score100 = int(round(raw_score * 100))
-
-#     comp = {
-#         "physical_score": round(float(physical_score), 4),
-#         "env_score": round(float(env_score), 4),
-#         "anomaly_indicator": round(float(anomaly_indicator), 4),
-#     }
-
-#     level = _map_score_to_level(score100)
-
-#     explanation = (
-#         f"{level}: Physical factors (wind/wave/tide) contribute {comp['physical_score']:.2f}, "
-#         f"environmental factors {comp['env_score']:.2f}. Anomaly indicator {comp['anomaly_indicator']:.2f}."
-#     )
-
-#     return {
-#         "score": score100,
-#         "threat_level": level,
-#         "components": comp,
-#         "anomaly_flags": {"simple_peak": anomaly_indicator > 0.95},
-#         "explanation": explanation,
-#         "raw_params": sensor_payload,
-#     }
-
 """
 threat_model.py
 
@@ -122,13 +8,25 @@ Coastal Threat Alert System.
 
 Uses thresholds and weights defined in config.py to
 calculate a threat score (0–100) and map it to a threat level.
+
+`ThreatModel` is the interface every scoring model implements: `score()`
+for a single reading and `score_batch()` for NumPy-vectorized scoring of
+many readings at once. `RuleThreatModel` wraps the rule table below; the
+learned alternative lives in learned_model.py.
 """
 
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Mapping
+
+import numpy as np
 import pandas as pd
 from .config import THRESHOLDS, WEIGHTS, THREAT_LABELS
 
 # from backend.config import THRESHOLDS, WEIGHTS, THREAT_LABELS
 
+# Score cut-offs between consecutive THREAT_LABELS
+LEVEL_CUTOFFS = (25, 50, 75)
+
 
 def calculate_parameter_score(value: float, thresholds: list) -> int:
     """
@@ -146,7 +44,8 @@ def calculate_parameter_score(value: float, thresholds: list) -> int:
     int
         Risk level (0=Safe, 1=Caution, 2=Warning, 3=Danger).
     """
-    if value is None:
+    # A NaN from the processed data is a missing value, not a Danger reading
+    if value is None or pd.isna(value):
         return 0
     if value < thresholds[0]:
         return 0
@@ -158,7 +57,22 @@ def calculate_parameter_score(value: float, thresholds: list) -> int:
         return 3
 
 
-def calculate_threat_score(row: pd.Series) -> dict:
+def score_to_level(score: float) -> str:
+    """Map a 0–100 score to its threat label."""
+    for index, cutoff in enumerate(LEVEL_CUTOFFS):
+        if score < cutoff:
+            return THREAT_LABELS[index]
+    return THREAT_LABELS[len(LEVEL_CUTOFFS)]
+
+
+def level_indices(scores: np.ndarray) -> np.ndarray:
+    """Vectorized score_to_level: THREAT_LABELS keys (0–3) for each score."""
+    return np.searchsorted(LEVEL_CUTOFFS, scores, side="right").astype(np.int8)
+
+
+def calculate_threat_score(
+    row: pd.Series, thresholds: dict = THRESHOLDS, weights: dict = WEIGHTS
+) -> dict:
     """
     Compute overall threat score for a single sensor reading.
 
@@ -166,6 +80,8 @@ def calculate_threat_score(row: pd.Series) -> dict:
     ----------
     row : pd.Series
         A row from the processed dataset.
+    thresholds, weights : dict
+        Rule table to score with; defaults to config.py.
 
     Returns
     -------
@@ -178,25 +94,89 @@ def calculate_threat_score(row: pd.Series) -> dict:
     """
     parameter_scores = {}
     weighted_sum = 0
-    total_weight = sum(WEIGHTS.values())
+    total_weight = sum(weights.values())
 
-    for param, thresholds in THRESHOLDS.items():
+    for param, param_thresholds in thresholds.items():
         value = row.get(param)
-        risk_level = calculate_parameter_score(value, thresholds)
+        risk_level = calculate_parameter_score(value, param_thresholds)
         parameter_scores[param] = risk_level
 
-        weighted_sum += (risk_level / 3) * WEIGHTS[param] * 100
+        weighted_sum += (risk_level / 3) * weights[param] * 100
 
     # Normalize
     score = weighted_sum / total_weight
     # Map to threat level
-    if score < 25:
-        level = THREAT_LABELS[0]
-    elif score < 50:
-        level = THREAT_LABELS[1]
-    elif score < 75:
-        level = THREAT_LABELS[2]
-    else:
-        level = THREAT_LABELS[3]
+    level = score_to_level(score)
 
     return {"score": round(score, 2), "level": level, "parameters": parameter_scores}
+
+
+def batch_parameter_levels(values, thresholds: list) -> np.ndarray:
+    """
+    Vectorized calculate_parameter_score over a whole column.
+
+    Missing values (NaN) score 0, like None in the scalar version.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    levels = np.zeros(values.shape, dtype=np.int8)
+    # Same comparison chain as calculate_parameter_score, one step at a time
+    reached = ~np.isnan(values)
+    for level, threshold in enumerate(thresholds, 1):
+        reached &= values >= threshold
+        levels[reached] = level
+    return levels
+
+
+# --- Model Interface ---
+class ThreatModel(ABC):
+    """
+    Interface for threat scoring models.
+
+    `score()` takes one reading (a dict or pd.Series) and returns the same
+    {"score", "level", "parameters"} dict as calculate_threat_score.
+    `score_batch()` takes a DataFrame (or a mapping of column -> array) and
+    returns a float64 array of 0–100 scores, one per row; use
+    `level_indices()` to turn those into levels.
+    """
+
+    name = "base"
+    version = "0"
+
+    @abstractmethod
+    def score(self, reading: Mapping[str, Any]) -> Dict[str, Any]: ...
+
+    @abstractmethod
+    def score_batch(self, readings) -> np.ndarray: ...
+
+
+class RuleThreatModel(ThreatModel):
+    """The threshold/weight rule table from config.py."""
+
+    name = "rules"
+    version = "1"
+
+    def __init__(self, thresholds=THRESHOLDS, weights=WEIGHTS):
+        self.thresholds = thresholds
+        self.weights = weights
+
+    def score(self, reading: Mapping[str, Any]) -> Dict[str, Any]:
+        return calculate_threat_score(reading, self.thresholds, self.weights)
+
+    def score_batch(self, readings) -> np.ndarray:
+        total_weight = sum(self.weights.values())
+        weighted = None
+        for param, thresholds in self.thresholds.items():
+            if param in readings:
+                levels = batch_parameter_levels(readings[param], thresholds)
+            else:
+                levels = np.zeros(_batch_length(readings), dtype=np.int8)
+            # Same operation order as calculate_threat_score, for equal results
+            contribution = (levels / 3) * self.weights[param] * 100
+            weighted = contribution if weighted is None else weighted + contribution
+        return np.round(weighted / total_weight, 2)
+
+
+def _batch_length(readings) -> int:
+    if isinstance(readings, pd.DataFrame):
+        return len(readings)
+    return len(np.asarray(next(iter(readings.values()))))
@@ -15,7 +15,7 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 sys.path.append(str(PROJECT_ROOT))
 
 # Now that the path is set, we can use absolute imports
-from backend.threat_model import calculate_threat_score
+from backend.threat_model import RuleThreatModel
 
 
 def find_peak_threat_index():
@@ -28,15 +28,14 @@ def find_peak_threat_index():
 
     if not processed_csv_path.exists():
         print(f"❌ Error: Processed data not found at {processed_csv_path}")
-        print("Please run `python backend/data_prep.py` first.")
+        print("Please run `python -m backend.data_prep` first.")
         return None
 
     df = pd.read_csv(processed_csv_path)
 
     print(f"Analysing {len(df)} records to find peak threat...")
 
-    scores = df.apply(calculate_threat_score, axis=1)
-    df["threat_score"] = scores.apply(lambda x: x["score"])
+    df["threat_score"] = RuleThreatModel().score_batch(df)
 
     peak_index = df["threat_score"].idxmax()
     peak_score = df["threat_score"].max()